@@ -1,19 +1,121 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+from langchain_core.messages import AIMessage
 from langgraph.prebuilt import create_react_agent
 
 from src.prompts import apply_prompt_template
+from src.prompts.context import condense_tool_results
 from src.llms.llm import get_llm_by_type
-from src.config.agents import AGENT_LLM_MAP
+from src.config.agents import (
+    AGENT_DEADLINES,
+    AGENT_LLM_MAP,
+    AGENT_TOOL_RESULT_POLICY,
+)
+from src.tools.decorators import with_deadline
+from src.utils.token_utils import count_message_tokens
+
+logger = logging.getLogger(__name__)
+
+# Cache for compiled agents, keyed by agent config, LLM instance and tool set
+_agent_cache: OrderedDict[tuple, tuple] = OrderedDict()
+_agent_cache_lock = threading.Lock()
+_AGENT_CACHE_MAX_SIZE = 32
+
+
+def _build_tool_result_hook(agent_name: str, policy: dict):
+    """Build a pre-model hook that condenses older tool results before each LLM call."""
+    keep_recent = policy.get("keep_recent", 2)
+    summary_chars = policy.get("summary_chars", 600)
+
+    def pre_model_hook(state):
+        messages = state["messages"]
+        llm_input_messages = condense_tool_results(messages, keep_recent, summary_chars)
+        iteration = sum(isinstance(m, AIMessage) for m in messages) + 1
+        logger.info(
+            f"{agent_name} react iteration {iteration}: "
+            f"{count_message_tokens(messages)} -> "
+            f"{count_message_tokens(llm_input_messages)} tokens"
+        )
+        # Only the LLM input is condensed, the full results stay in the state
+        return {"llm_input_messages": llm_input_messages}
+
+    return pre_model_hook
+
+
+def get_tools_fingerprint(tools: list) -> str:
+    """
+    Compute a fingerprint of a tool set that changes whenever a tool's
+    class, name, description or configuration changes.
+    """
+    parts = []
+    for tool in tools:
+        try:
+            fields = tool.model_dump(
+                exclude={"callbacks", "callback_manager", "metadata", "tags"}
+            )
+        except Exception:
+            fields = id(tool)
+        parts.append(
+            f"{type(tool).__module__}.{type(tool).__qualname__}:"
+            f"{tool.name}:{tool.description}:{fields!r}"
+        )
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+def clear_agent_cache():
+    """Clear the compiled agent cache to force rebuilding agents."""
+    with _agent_cache_lock:
+        _agent_cache.clear()
 
 
 # Create agents using configured LLM types
 def create_agent(agent_name: str, agent_type: str, tools: list, prompt_template: str):
-    """Factory function to create agents with consistent configuration."""
-    return create_react_agent(
+    """Factory function to create agents with consistent configuration.
+
+    Compiled agents are cached and reused while the LLM instance and the tool
+    set are unchanged. Reloading the LLMs creates new instances, so agents
+    built on the old ones are never returned again. Tool calls are cancelled
+    after the `tool_call_seconds` deadline of the agent type.
+    """
+    llm = get_llm_by_type(AGENT_LLM_MAP[agent_type])
+    tool_call_seconds = AGENT_DEADLINES.get(agent_type, {}).get("tool_call_seconds")
+    cache_key = (
+        agent_name,
+        agent_type,
+        prompt_template,
+        id(llm),
+        get_tools_fingerprint(tools),
+        tool_call_seconds,
+    )
+    with _agent_cache_lock:
+        if cached := _agent_cache.get(cache_key):
+            _agent_cache.move_to_end(cache_key)
+            logger.debug(f"Reusing cached {agent_type} agent")
+            return cached[1]
+
+    pre_model_hook = None
+    if policy := AGENT_TOOL_RESULT_POLICY.get(agent_type):
+        pre_model_hook = _build_tool_result_hook(agent_name, policy)
+    if tool_call_seconds:
+        # wrapped after the cache lookup, the fingerprint is of the original tools
+        tools = [with_deadline(tool, tool_call_seconds) for tool in tools]
+    agent = create_react_agent(
         name=agent_name,
-        model=get_llm_by_type(AGENT_LLM_MAP[agent_type]),
+        model=llm,
         tools=tools,
         prompt=lambda state: apply_prompt_template(prompt_template, state),
+        pre_model_hook=pre_model_hook,
     )
+
+    with _agent_cache_lock:
+        # keep a reference to the LLM so its id cannot be reused while cached
+        _agent_cache[cache_key] = (llm, agent)
+        if len(_agent_cache) > _AGENT_CACHE_MAX_SIZE:
+            _agent_cache.popitem(last=False)
+    return agent
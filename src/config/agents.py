@@ -13,7 +13,45 @@ AGENT_LLM_MAP: dict[str, LLMType] = {
     "researcher": "basic",
     "coder": "basic",
     "reporter": "basic",
+    "sufficiency_checker": "basic",
+    "fast_answer": "basic",
     "podcast_script_writer": "basic",
     "ppt_composer": "basic",
     "prose_writer": "basic",
 }
+
+# Define per-agent context policies applied to the state messages of a prompt.
+# Agents without an entry see the full message history.
+#   - "window": keep only the most recent `max_messages` messages
+#   - "summarize": keep user messages and the `keep_recent` latest agent outputs
+#     verbatim, condensing older agent outputs to `summary_chars` characters
+AGENT_CONTEXT_POLICY: dict[str, dict] = {
+    "coordinator": {"strategy": "window", "max_messages": 6},
+    "fast_answer": {"strategy": "window", "max_messages": 6},
+    "planner": {"strategy": "summarize", "keep_recent": 3, "summary_chars": 800},
+}
+
+# Define how tool results are condensed inside the react loop of each agent.
+# The `keep_recent` latest tool results are sent in full, older ones are
+# reduced to summaries of at most `summary_chars` characters with source URLs.
+AGENT_TOOL_RESULT_POLICY: dict[str, dict] = {
+    "researcher": {"keep_recent": 2, "summary_chars": 600},
+}
+
+# Define the deadlines of the agents that execute plan steps. A step stopped by
+# `step_seconds` ends with the findings gathered so far, a tool call stopped by
+# `tool_call_seconds` returns a timeout message to the agent. 0 disables a deadline.
+AGENT_DEADLINES: dict[str, dict] = {
+    "researcher": {"step_seconds": 300, "tool_call_seconds": 60},
+    "coder": {"step_seconds": 300, "tool_call_seconds": 120},
+}
+
+# Define the agents whose LLM responses are reused for identical calls, with the
+# maximum age in seconds of a reused response. Responses are only cached when
+# LLM_RESPONSE_CACHE is enabled.
+AGENT_RESPONSE_CACHE_TTL: dict[str, float] = {
+    "coordinator": 3600,
+    "planner": 3600,
+    "podcast_script_writer": 86400,
+    "ppt_composer": 86400,
+}
@@ -21,6 +21,42 @@ class Configuration:
     max_step_num: int = 3  # Maximum number of steps in a plan
     max_search_results: int = 3  # Maximum number of search results
     mcp_settings: dict = None  # MCP settings, including dynamic loaded tools
+    reporter_mode: str = "single"  # "single" or "sectioned" (parallel section drafts)
+    speculative_investigation: bool = (
+        False  # Run the background investigation concurrently with the coordinator
+    )
+    step_cache_ttl: int = 0  # Seconds a research step result is reused, 0 disables
+    step_cache_similarity: float = (
+        0.0  # Word overlap to reuse near-duplicate steps, 0 for exact matches only
+    )
+    max_run_tokens: int = 0  # Total tokens of a run across all agents, 0 for unlimited
+    max_run_seconds: int = 0  # Wall-clock seconds of a run, 0 for unlimited
+    max_run_tool_calls: int = 0  # Tool calls of a run, 0 for unlimited
+    early_termination: bool = (
+        False  # Check after each step whether the remaining steps can be skipped
+    )
+    max_step_retries: int = 2  # Retries of a failed step before it is marked failed
+    step_merge_similarity: float = (
+        0.0  # Similarity above which pending steps are merged, 0 disables merging
+    )
+    coordinator_fast_path: bool = (
+        False  # Classify obvious greetings and research requests without the LLM
+    )
+    pipelined_planning: bool = (
+        False  # Start the first research step while the plan is still streaming
+    )
+    fast_escalation: bool = (
+        False  # Let fast answers hand off to the full research when context is lacking
+    )
+    plan_cache_ttl: int = (
+        0  # Seconds an accepted plan is reused for queries of the same template, 0 disables
+    )
+    plan_cache_min_confirmations: int = (
+        1  # Times users must accept a plan of a template before it is reused
+    )
+    distributed_steps: bool = (
+        False  # Run researcher and coder steps on step workers through the step broker
+    )
 
     @classmethod
     def from_runnable_config(
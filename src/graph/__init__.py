@@ -1,9 +1,16 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
-from .builder import build_graph_with_memory, build_graph
+from .builder import (
+    build_fast_graph,
+    build_fast_graph_with_memory,
+    build_graph_with_memory,
+    build_graph,
+)
 
 __all__ = [
     "build_graph_with_memory",
     "build_graph",
+    "build_fast_graph_with_memory",
+    "build_fast_graph",
 ]
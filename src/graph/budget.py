@@ -0,0 +1,219 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.runnables import RunnableConfig
+
+from src.utils.token_utils import count_message_tokens, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Budgets of the runs in progress by thread id
+_run_budgets: OrderedDict[str, "RunBudget"] = OrderedDict()
+_run_budgets_lock = threading.Lock()
+_MAX_TRACKED_RUNS = 256
+
+
+class BudgetExceededError(Exception):
+    """Raised inside an agent step when the run budget is used up."""
+
+
+class RunBudget(BaseCallbackHandler):
+    """
+    Tracks the tokens, tool calls and active time of a run against its limits.
+
+    The budget is registered as a callback of the whole graph run, so every
+    LLM and tool call of every node and agent is counted. A limit of 0 means
+    unlimited. Tokens are taken from the provider's usage metadata and
+    estimated from the messages when it is not reported.
+    """
+
+    def __init__(
+        self, max_tokens: int = 0, max_seconds: float = 0, max_tool_calls: int = 0
+    ):
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.max_tool_calls = max_tool_calls
+        self.tokens = 0
+        self.tool_calls = 0
+        self._elapsed = 0.0
+        self._started: Optional[float] = None
+        self._input_tokens: dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start counting active time, e.g. when a request resumes the run."""
+        if self._started is None:
+            self._started = time.monotonic()
+
+    def stop(self) -> None:
+        """Stop counting active time, e.g. while waiting for plan feedback."""
+        if self._started is not None:
+            self._elapsed += time.monotonic() - self._started
+            self._started = None
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._started is None:
+            return self._elapsed
+        return self._elapsed + time.monotonic() - self._started
+
+    @property
+    def remaining_seconds(self) -> Optional[float]:
+        if not self.max_seconds:
+            return None
+        return max(self.max_seconds - self.elapsed_seconds, 0)
+
+    @property
+    def exceeded(self) -> Optional[str]:
+        """The name of the first exhausted budget, or None."""
+        if self.max_tokens and self.tokens >= self.max_tokens:
+            return "tokens"
+        if self.max_tool_calls and self.tool_calls >= self.max_tool_calls:
+            return "tool_calls"
+        if self.max_seconds and self.elapsed_seconds >= self.max_seconds:
+            return "time"
+        return None
+
+    def usage(self) -> dict[str, Any]:
+        """Return the consumption and limits of the budget."""
+        return {
+            "tokens": self.tokens,
+            "max_tokens": self.max_tokens,
+            "tool_calls": self.tool_calls,
+            "max_tool_calls": self.max_tool_calls,
+            "seconds": round(self.elapsed_seconds, 1),
+            "max_seconds": self.max_seconds,
+            "exceeded": self.exceeded,
+        }
+
+    def record(self, tokens: int = 0, tool_calls: int = 0) -> None:
+        """Add usage counted elsewhere, e.g. by a step worker."""
+        with self._lock:
+            self.tokens += tokens
+            self.tool_calls += tool_calls
+
+    def on_chat_model_start(
+        self, serialized: dict, messages: list[list], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            self._input_tokens[run_id] = sum(
+                count_message_tokens(batch) for batch in messages
+            )
+
+    def on_llm_start(
+        self, serialized: dict, prompts: list[str], *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            self._input_tokens[run_id] = sum(estimate_tokens(p) for p in prompts)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        reported = 0
+        output_tokens = 0
+        cached = False
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                # responses from the LLM response cache cost no tokens
+                if message is not None and message.response_metadata.get("cached"):
+                    cached = True
+                    continue
+                usage = getattr(message, "usage_metadata", None)
+                if usage:
+                    reported += usage.get("total_tokens", 0)
+                output_tokens += estimate_tokens(generation.text)
+        if not reported:
+            token_usage = (response.llm_output or {}).get("token_usage") or {}
+            reported = token_usage.get("total_tokens", 0)
+        with self._lock:
+            input_tokens = self._input_tokens.pop(run_id, 0)
+            if not cached:
+                self.tokens += reported or input_tokens + output_tokens
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        with self._lock:
+            self._input_tokens.pop(run_id, None)
+
+    def on_tool_start(
+        self, serialized: dict, input_str: str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        with self._lock:
+            self.tool_calls += 1
+
+
+class BudgetGuard(BaseCallbackHandler):
+    """Stops an agent before its next LLM or tool call once the budget is used up."""
+
+    raise_error = True
+
+    def __init__(self, budget: RunBudget):
+        self.budget = budget
+
+    def _check(self) -> None:
+        if reason := self.budget.exceeded:
+            raise BudgetExceededError(f"Run {reason} budget exhausted")
+
+    def on_chat_model_start(self, serialized, messages, **kwargs: Any) -> None:
+        self._check()
+
+    def on_llm_start(self, serialized, prompts, **kwargs: Any) -> None:
+        self._check()
+
+    def on_tool_start(self, serialized, input_str, **kwargs: Any) -> None:
+        self._check()
+
+
+def start_run_budget(
+    thread_id: str,
+    max_tokens: int = 0,
+    max_seconds: float = 0,
+    max_tool_calls: int = 0,
+    reset: bool = True,
+) -> Optional[RunBudget]:
+    """
+    Get the budget of a thread's run, creating a new one for a new run.
+
+    A run without any limit has no budget, so nothing is counted or reported.
+
+    Args:
+        thread_id: The thread of the run
+        max_tokens: Total token limit, 0 for unlimited
+        max_seconds: Active wall-clock time limit, 0 for unlimited
+        max_tool_calls: Total tool call limit, 0 for unlimited
+        reset: Start from zero instead of continuing an interrupted run
+
+    Returns:
+        The budget, to be passed as a callback of the graph run, or None if
+        no limit is set
+    """
+    with _run_budgets_lock:
+        if not (max_tokens or max_seconds or max_tool_calls):
+            _run_budgets.pop(thread_id, None)
+            return None
+        budget = _run_budgets.get(thread_id)
+        if budget is None or reset:
+            budget = RunBudget(max_tokens, max_seconds, max_tool_calls)
+            _run_budgets[thread_id] = budget
+        else:
+            budget.max_tokens = max_tokens
+            budget.max_seconds = max_seconds
+            budget.max_tool_calls = max_tool_calls
+        _run_budgets.move_to_end(thread_id)
+        while len(_run_budgets) > _MAX_TRACKED_RUNS:
+            _run_budgets.popitem(last=False)
+    return budget
+
+
+def get_run_budget(config: Optional[RunnableConfig]) -> Optional[RunBudget]:
+    """Return the budget of the run a node belongs to, if the run has one."""
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    with _run_budgets_lock:
+        return _run_budgets.get(thread_id)
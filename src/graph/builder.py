@@ -1,10 +1,15 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+from typing import Optional
+
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
 from src.prompts.planner_model import StepType
 
+from .budget import get_run_budget
 from .types import State
 from .nodes import (
     coordinator_node,
@@ -15,13 +20,21 @@ from .nodes import (
     coder_node,
     human_feedback_node,
     background_investigation_node,
+    fast_answer_node,
 )
 
 
-def continue_to_running_research_team(state: State):
+def continue_to_running_research_team(state: State, config: RunnableConfig = None):
+    budget = get_run_budget(config)
+    if budget is not None and budget.exceeded:
+        # skip the remaining steps and report what has been found so far
+        return "reporter"
     current_plan = state.get("current_plan")
     if not current_plan or not current_plan.steps:
         return "planner"
+    if current_plan.has_enough_context:
+        # the completed steps already answer the question
+        return "reporter"
     if all(step.execution_res for step in current_plan.steps):
         return "planner"
     for step in current_plan.steps:
@@ -34,33 +47,51 @@ def continue_to_running_research_team(state: State):
     return "planner"
 
 
-def _build_base_graph():
-    """Build and return the base state graph with all nodes and edges."""
-    builder = StateGraph(State)
-    builder.add_edge(START, "coordinator")
-    builder.add_node("coordinator", coordinator_node)
-    builder.add_node("background_investigator", background_investigation_node)
+def _add_research_nodes(builder: StateGraph):
+    """Add the planning, research and reporting nodes shared by all graphs."""
     builder.add_node("planner", planner_node)
     builder.add_node("reporter", reporter_node)
     builder.add_node("research_team", research_team_node)
     builder.add_node("researcher", researcher_node)
     builder.add_node("coder", coder_node)
     builder.add_node("human_feedback", human_feedback_node)
-    builder.add_edge("background_investigator", "planner")
     builder.add_conditional_edges(
         "research_team",
         continue_to_running_research_team,
-        ["planner", "researcher", "coder"],
+        ["planner", "researcher", "coder", "reporter"],
     )
     builder.add_edge("reporter", END)
+
+
+def _build_base_graph():
+    """Build and return the base state graph with all nodes and edges."""
+    builder = StateGraph(State)
+    builder.add_edge(START, "coordinator")
+    builder.add_node("coordinator", coordinator_node)
+    builder.add_node("background_investigator", background_investigation_node)
+    builder.add_edge("background_investigator", "planner")
+    _add_research_nodes(builder)
+    return builder
+
+
+def _build_fast_graph():
+    """Build and return the single-pass graph that answers from a web search."""
+    builder = StateGraph(State)
+    builder.add_edge(START, "background_investigator")
+    builder.add_node("background_investigator", background_investigation_node)
+    # named coordinator so clients show the answer as a direct reply
+    builder.add_node("coordinator", fast_answer_node)
+    builder.add_edge("background_investigator", "coordinator")
+    # the full research nodes are only reached when the answer is escalated
+    _add_research_nodes(builder)
     return builder
 
 
-def build_graph_with_memory():
+def build_graph_with_memory(checkpointer: Optional[BaseCheckpointSaver] = None):
     """Build and return the agent workflow graph with memory."""
     # use persistent memory to save conversation history
     # TODO: be compatible with SQLite / PostgreSQL
-    memory = MemorySaver()
+    memory = checkpointer or MemorySaver()
 
     # build state graph
     builder = _build_base_graph()
@@ -74,4 +105,24 @@ def build_graph():
     return builder.compile()
 
 
+def build_fast_graph_with_memory(checkpointer: Optional[BaseCheckpointSaver] = None):
+    """
+    Build and return the fast answer graph with memory.
+
+    Pass the checkpointer of the full graph, so a thread can be continued
+    or resumed by either graph, e.g. after the fast answer was escalated.
+    The graphs share their node names, so a checkpoint of one is a valid
+    state of the other.
+    """
+    memory = checkpointer or MemorySaver()
+    builder = _build_fast_graph()
+    return builder.compile(checkpointer=memory)
+
+
+def build_fast_graph():
+    """Build and return the fast answer graph without memory."""
+    builder = _build_fast_graph()
+    return builder.compile()
+
+
 graph = build_graph()
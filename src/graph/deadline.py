@@ -0,0 +1,80 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import logging
+from typing import Any
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import ToolMessage
+from langchain_core.outputs import LLMResult
+
+from src.prompts.context import summarize_tool_result
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of characters kept from each tool result of a stopped step
+PARTIAL_FINDING_CHARS = 1500
+
+# Number of agent steps stopped by their deadline, in total and by agent type
+step_deadline_hits: dict[str, int] = {"total": 0}
+
+
+class StepProgress(BaseCallbackHandler):
+    """
+    Collects the tool results and the latest LLM answer of an agent step while
+    it runs, so a step stopped by its deadline can still report its findings.
+    """
+
+    run_inline = True
+
+    def __init__(self):
+        self.tool_results: list[ToolMessage] = []
+        self.last_answer = ""
+        self._tool_names: dict[UUID, str] = {}
+
+    def on_tool_start(
+        self, serialized, input_str, *, run_id: UUID, **kwargs: Any
+    ) -> None:
+        self._tool_names[run_id] = (serialized or {}).get("name") or "tool"
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        name = self._tool_names.pop(run_id, "tool")
+        if not isinstance(output, ToolMessage):
+            output = ToolMessage(content=str(output), name=name, tool_call_id="")
+        self.tool_results.append(output)
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                if generation.text.strip():
+                    self.last_answer = generation.text
+
+    def partial_findings(self, deadline_seconds: float) -> str:
+        """
+        Format what the step gathered before it was stopped.
+
+        Args:
+            deadline_seconds: The deadline that stopped the step
+
+        Returns:
+            The latest answer of the agent and a summary of each tool result
+        """
+        findings = (
+            f"This step was stopped by its {deadline_seconds:g}s deadline before "
+            "it finished. Partial findings gathered so far:\n\n"
+        )
+        if self.last_answer:
+            findings += f"{self.last_answer}\n\n"
+        for message in self.tool_results:
+            summary = summarize_tool_result(message, PARTIAL_FINDING_CHARS)
+            findings += f"## {message.name or 'tool'} result\n\n{summary}\n\n"
+        if not self.last_answer and not self.tool_results:
+            findings += "No findings were gathered before the deadline."
+        return findings.strip()
+
+
+def record_step_deadline_hit(agent_name: str) -> None:
+    """Count an agent step stopped by its deadline."""
+    step_deadline_hits["total"] += 1
+    step_deadline_hits[agent_name] = step_deadline_hits.get(agent_name, 0) + 1
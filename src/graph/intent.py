@@ -0,0 +1,194 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import math
+import re
+from dataclasses import dataclass
+from typing import Literal, Optional
+
+# Minimum confidence to handle a message without the coordinator LLM
+FAST_PATH_CONFIDENCE = 0.8
+
+_HAN_PATTERN = re.compile(r"[\u4e00-\u9fff\u3400-\u4dbf]")
+_KANA_PATTERN = re.compile(r"[\u3040-\u30ff]")
+_HANGUL_PATTERN = re.compile(r"[\uac00-\ud7af]")
+# letters of any script, so accented words are not split
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+
+# English function words that are not also common words of other Latin
+# languages, e.g. "a", "do" and "me" are Portuguese and Spanish too
+ENGLISH_WORDS = {
+    "about",
+    "and",
+    "are",
+    "be",
+    "by",
+    "can",
+    "does",
+    "for",
+    "from",
+    "how",
+    "is",
+    "it",
+    "of",
+    "the",
+    "this",
+    "to",
+    "what",
+    "when",
+    "which",
+    "who",
+    "why",
+    "will",
+    "with",
+    "you",
+}
+
+GREETINGS = {
+    "hi",
+    "hello",
+    "hey",
+    "hi there",
+    "hello there",
+    "hey there",
+    "good morning",
+    "good afternoon",
+    "good evening",
+    "thanks",
+    "thank you",
+    "how are you",
+    "你好",
+    "您好",
+    "嗨",
+    "早上好",
+    "晚上好",
+    "谢谢",
+}
+
+GREETING_REPLIES = {
+    "en-US": "Hello! I'm DeerFlow, your research assistant. What would you like me to research today?",
+    "zh-CN": "你好！我是 DeerFlow，你的研究助手。今天想让我研究些什么？",
+}
+
+# Messages that the coordinator LLM must see, e.g. to reject them politely:
+# prompt extraction, harmful or illegal requests, impersonation and attempts
+# to bypass the safety guidelines
+_RISK_PATTERN = re.compile(
+    r"\b(system prompt|your instructions|ignore (all |the )?previous|jailbreak|"
+    r"developer mode|bypass|pretend (to be|you are)|impersonat|"
+    r"hack|exploit|malware|ransomware|phishing|ddos|keylog|botnet|crack|"
+    r"steal|launder|scam|fraud|rug ?pull|pump and dump|"
+    r"weapon|bomb|explosive|poison|drug|kill|suicide)|"
+    r"提示词|系统指令|黑客|入侵|破解|盗取|洗钱|诈骗|武器|炸弹|毒品",
+    re.IGNORECASE,
+)
+
+# Research requests outside these topics are left to the coordinator LLM
+_TOPIC_PATTERN = re.compile(
+    r"\b(bitcoin|btc|ethereum|eth|solana|crypto\w*|blockchain|token\w*|"
+    r"coins?|altcoins?|stablecoins?|defi|nfts?|web3|dao|layer ?2|staking|"
+    r"mining|wallets?|exchanges?|market\w*|prices?|trading|etfs?|"
+    r"halving|on-?chain)\b|比特币|以太坊|加密|区块链|代币|币|价格|市场|交易",
+    re.IGNORECASE,
+)
+
+# Weights of the lexical research-intent model, applied once per feature
+_RESEARCH_FEATURES: list[tuple[re.Pattern, float]] = [
+    (re.compile(r"^(what|how|why|when|which|who|where|is|are|does|do|can)\b"), 1.0),
+    (re.compile(r"[?？]"), 1.0),
+    (
+        re.compile(
+            r"\b(research|analy[sz]e|analysis|compare|comparison|explain|investigate|"
+            r"summari[sz]e|report|evaluate|assess|forecast|review|overview|find|"
+            r"tell me about)\b"
+        ),
+        1.5,
+    ),
+    (
+        re.compile(
+            r"\b(market|price|prices|trend|trends|history|impact|latest|news|data|"
+            r"statistics|growth|performance|adoption|regulation|technology|"
+            r"bitcoin|ethereum|crypto|blockchain|token|defi|(19|20)\d\d)\b"
+        ),
+        1.0,
+    ),
+    (
+        re.compile(
+            r"分析|研究|比较|对比|什么|如何|为什么|怎么|趋势|报告|影响|价格|市场"
+        ),
+        3.0,
+    ),
+]
+_SMALL_TALK_PATTERN = re.compile(
+    r"\b(your name|who are you|are you|about you|how are you)\b|你是谁|你叫什么"
+)
+
+
+@dataclass
+class IntentResult:
+    """The locally detected intent and locale of a user message."""
+
+    intent: Literal["greeting", "research", "unknown"]
+    locale: Optional[str]
+    confidence: float
+
+
+def detect_locale(text: str) -> Optional[str]:
+    """Detect the locale of a message from its script, or None if unsure."""
+    if _KANA_PATTERN.search(text):
+        return "ja-JP"
+    hangul = len(_HANGUL_PATTERN.findall(text))
+    han = len(_HAN_PATTERN.findall(text))
+    if hangul > han:
+        return "ko-KR"
+    if han:
+        return "zh-CN"
+    words = [w.lower() for w in _WORD_PATTERN.findall(text)]
+    # accented letters point to another Latin language
+    if not words or not all(word.isascii() for word in words):
+        return None
+    english = sum(word in ENGLISH_WORDS for word in words)
+    if english / len(words) >= 0.15:
+        return "en-US"
+    return None
+
+
+def _research_confidence(text: str) -> float:
+    lowered = text.lower()
+    score = sum(
+        weight for pattern, weight in _RESEARCH_FEATURES if pattern.search(lowered)
+    )
+    if len(lowered.split()) >= 6 or (not lowered.isascii() and len(lowered) >= 6):
+        score += 1.0
+    if _SMALL_TALK_PATTERN.search(lowered):
+        score -= 3.0
+    return 1 / (1 + math.exp(-(score - 2.0)))
+
+
+def classify_intent(text: str) -> IntentResult:
+    """
+    Classify a user message as a greeting or a research request without an LLM.
+
+    Greetings are matched against a small lexicon, research requests about
+    crypto and market topics are scored by a weighted lexical model. Messages
+    that may need a polite rejection or a clarifying question, and research
+    requests on other topics, are left to the coordinator LLM.
+
+    Args:
+        text: The user message
+
+    Returns:
+        The intent, detected locale and confidence
+    """
+    locale = detect_locale(text)
+    if _RISK_PATTERN.search(text):
+        return IntentResult("unknown", locale, 0.0)
+    normalized = re.sub(r"[\W_]+", " ", text.lower()).strip()
+    if normalized in GREETINGS:
+        if locale is None and normalized.isascii():
+            locale = "en-US"
+        return IntentResult("greeting", locale, 0.95)
+    confidence = _research_confidence(text)
+    if confidence >= 0.5 and _TOPIC_PATTERN.search(text):
+        return IntentResult("research", locale, confidence)
+    return IntentResult("unknown", locale, 1 - confidence)
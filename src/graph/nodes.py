@@ -1,18 +1,31 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import dataclasses
 import json
 import logging
 import os
+import time
 from typing import Annotated, Literal
+from uuid import uuid4
 
-from langchain_core.messages import AIMessage, HumanMessage
-from langchain_core.runnables import RunnableConfig
+from langchain_core.callbacks import BaseCallbackHandler, BaseCallbackManager
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda, ensure_config
+from langchain_core.runnables.config import get_callback_manager_for_config
 from langchain_core.tools import tool
+from langgraph.config import get_stream_writer
+from langgraph.constants import TAG_NOSTREAM
 from langgraph.types import Command, interrupt
-from langchain_mcp_adapters.client import MultiServerMCPClient
 
 from src.agents import create_agent
+from src.tools.mcp import (
+    get_mcp_tools,
+    get_result_cache_ttl,
+    mcp_result_cache,
+    with_result_cache,
+)
 from src.tools.search import LoggedTavilySearch
 from src.tools import (
     crawl_tool,
@@ -21,18 +34,70 @@ from src.tools import (
     python_repl_tool,
 )
 
-from src.config.agents import AGENT_LLM_MAP
+from src.config.agents import AGENT_DEADLINES, AGENT_LLM_MAP
 from src.config.configuration import Configuration
 from src.llms.llm import get_llm_by_type
-from src.prompts.planner_model import Plan
+from src.prompts.planner_model import Plan, Step, StepType
 from src.prompts.template import apply_prompt_template
-from src.utils.json_utils import repair_json_output
+from src.utils.json_utils import PlanStepParser, repair_json_output
+from src.utils.token_utils import count_message_tokens, estimate_tokens
+from src.workers import StepTaskError, get_step_broker
 
+from .budget import BudgetExceededError, BudgetGuard, get_run_budget
+from .deadline import StepProgress, record_step_deadline_hit
+from .intent import FAST_PATH_CONFIDENCE, GREETING_REPLIES, classify_intent
+from .plan_diff import carry_over_results
+from .plan_cache import plan_template_cache
+from .plan_optimizer import merge_overlapping_steps
+from .step_cache import step_result_cache
 from .types import State
 from ..config import SELECTED_SEARCH_ENGINE, SearchEngine
 
 logger = logging.getLogger(__name__)
 
+# Maximum estimated tokens of observations drafted into one report section
+REPORT_SECTION_TOKEN_BUDGET = 3000
+
+# Base delay of the exponential backoff between attempts of a failed step
+STEP_RETRY_BACKOFF_SECONDS = 2
+
+# Seconds to wait for a step dispatched to the step workers when the run has no time budget
+STEP_WORKER_TIMEOUT_SECONDS = float(os.getenv("STEP_WORKER_TIMEOUT_SECONDS", "1800"))
+
+# Characters of each earlier finding shown to the planner for a follow-up
+FOLLOW_UP_FINDING_CHARS = 2000
+
+# Characters of each finding shown to the sufficiency check
+SUFFICIENCY_FINDING_CHARS = 2000
+
+# Steps and estimated seconds saved by early termination since startup
+early_termination_stats = {
+    "checks": 0,
+    "terminated_runs": 0,
+    "steps_skipped": 0,
+    "seconds_saved": 0.0,
+}
+# Steps merged by plan optimization and the estimated searches and tokens saved
+plan_optimization_stats = {
+    "plans": 0,
+    "steps_merged": 0,
+    "searches_saved": 0.0,
+    "tokens_saved": 0.0,
+}
+# Moving averages of the duration, tool calls and tokens of executed steps,
+# used to estimate the savings of skipped and merged steps
+step_averages = {"seconds": 0.0, "tool_calls": 0.0, "tokens": 0.0}
+
+
+def _record_step_execution(seconds: float, tool_calls: int, tokens: int) -> None:
+    for key, value in (
+        ("seconds", seconds),
+        ("tool_calls", tool_calls),
+        ("tokens", tokens),
+    ):
+        average = step_averages[key]
+        step_averages[key] = value if not average else 0.8 * average + 0.2 * value
+
 
 @tool
 def handoff_to_planner(
@@ -45,40 +110,61 @@ def handoff_to_planner(
     return
 
 
-def background_investigation_node(state: State, config: RunnableConfig):
-    logger.info("background investigation node is running.")
-    configurable = Configuration.from_runnable_config(config)
-    query = state["messages"][-1].content
+async def _investigate(query: str, max_search_results: int) -> str:
+    """Run the background web search for a query and format its results."""
     background_investigation_results = None
     if SELECTED_SEARCH_ENGINE == SearchEngine.TAVILY.value:
-        searched_content = LoggedTavilySearch(
-            max_results=configurable.max_search_results
-        ).invoke(query)
+        searched_content = await LoggedTavilySearch(
+            max_results=max_search_results
+        ).ainvoke(query)
         if isinstance(searched_content, list):
             background_investigation_results = [
                 f"## {elem['title']}\n\n{elem['content']}" for elem in searched_content
             ]
-            return {
-                "background_investigation_results": "\n\n".join(
-                    background_investigation_results
-                )
-            }
+            return "\n\n".join(background_investigation_results)
         else:
             logger.error(
                 f"Tavily search returned malformed response: {searched_content}"
             )
     else:
-        background_investigation_results = get_web_search_tool(
-            configurable.max_search_results
-        ).invoke(query)
+        background_investigation_results = await get_web_search_tool(
+            max_search_results
+        ).ainvoke(query)
+    return json.dumps(background_investigation_results, ensure_ascii=False)
+
+
+async def background_investigation_node(state: State, config: RunnableConfig):
+    logger.info("background investigation node is running.")
+    configurable = Configuration.from_runnable_config(config)
+    query = state["messages"][-1].content
     return {
-        "background_investigation_results": json.dumps(
-            background_investigation_results, ensure_ascii=False
+        "background_investigation_results": await _investigate(
+            query, configurable.max_search_results
         )
     }
 
 
-def planner_node(
+def _format_prior_findings(plan: Plan) -> str:
+    """Format the results of an earlier plan in the thread for the planner."""
+    completed = [
+        step for step in plan.steps if step.execution_res and not step.execution_error
+    ]
+    if not completed:
+        return ""
+    findings = "# Findings From Earlier Research In This Conversation\n\n"
+    for step in completed:
+        findings += (
+            f"## {step.title}\n\n<finding>\n"
+            f"{step.execution_res[:FOLLOW_UP_FINDING_CHARS]}\n</finding>\n\n"
+        )
+    return findings + (
+        "The user is asking a follow-up question. Reuse these findings: only plan "
+        "steps for information they do not cover, and set `has_enough_context` "
+        "to true if they already answer the question."
+    )
+
+
+async def planner_node(
     state: State, config: RunnableConfig
 ) -> Command[Literal["human_feedback", "reporter"]]:
     """Planner node that generate the full plan."""
@@ -103,25 +189,56 @@ def planner_node(
             }
         ]
 
+    prior_plan = state.get("current_plan")
+    if plan_iterations == 0 and isinstance(prior_plan, Plan):
+        # a follow-up question in a thread that already has research results
+        if prior_findings := _format_prior_findings(prior_plan):
+            logger.info("Planning a follow-up with the thread's earlier findings")
+            messages += [{"role": "user", "content": prior_findings}]
+
     if AGENT_LLM_MAP["planner"] == "basic":
-        llm = get_llm_by_type(AGENT_LLM_MAP["planner"]).with_structured_output(
+        llm = get_llm_by_type(
+            AGENT_LLM_MAP["planner"], agent_name="planner"
+        ).with_structured_output(
             Plan,
             method="json_mode",
         )
     else:
-        llm = get_llm_by_type(AGENT_LLM_MAP["planner"])
+        llm = get_llm_by_type(AGENT_LLM_MAP["planner"], agent_name="planner")
 
     # if the plan iterations is greater than the max plan iterations, return the reporter node
     if plan_iterations >= configurable.max_plan_iterations:
         return Command(goto="reporter")
 
     full_response = ""
-    if AGENT_LLM_MAP["planner"] == "basic":
-        response = llm.invoke(messages)
+    prefetch = None
+    if configurable.pipelined_planning and state.get("auto_accepted_plan"):
+        # the accepted plan runs anyway, so its first step starts while the rest streams
+        plan_start = time.perf_counter()
+        if AGENT_LLM_MAP["planner"] == "basic":
+            llm = get_llm_by_type(AGENT_LLM_MAP["planner"], agent_name="planner").bind(
+                response_format={"type": "json_object"}
+            )
+        parser = PlanStepParser()
+        first_step_seen = False
+        try:
+            async for chunk in llm.astream(messages):
+                full_response += chunk.content
+                for step in parser.feed(chunk.content):
+                    if not first_step_seen:
+                        first_step_seen = True
+                        prefetch = _start_step_prefetch(state, config, step)
+        except BaseException:
+            # the plan is lost, and so is the step started for it
+            if prefetch is not None:
+                prefetch.cancel()
+            raise
+        plan_seconds = time.perf_counter() - plan_start
+    elif AGENT_LLM_MAP["planner"] == "basic":
+        response = await llm.ainvoke(messages)
         full_response = response.model_dump_json(indent=4, exclude_none=True)
     else:
-        response = llm.stream(messages)
-        for chunk in response:
+        async for chunk in llm.astream(messages):
             full_response += chunk.content
     logger.debug(f"Current state messages: {state['messages']}")
     logger.info(f"Planner response: {full_response}")
@@ -130,12 +247,20 @@ def planner_node(
         curr_plan = json.loads(repair_json_output(full_response))
     except json.JSONDecodeError:
         logger.warning("Planner response is not a valid JSON")
+        if prefetch is not None:
+            prefetch.cancel()
         if plan_iterations > 0:
             return Command(goto="reporter")
         else:
             return Command(goto="__end__")
+    # keep the results of steps the new plan did not change
+    plan_json = full_response
+    if carry_over_results(state.get("current_plan"), curr_plan):
+        plan_json = json.dumps(curr_plan, ensure_ascii=False, indent=4)
     if curr_plan.get("has_enough_context"):
         logger.info("Planner response has enough context.")
+        if prefetch is not None:
+            prefetch.cancel()
         new_plan = Plan.model_validate(curr_plan)
         return Command(
             update={
@@ -144,26 +269,145 @@ def planner_node(
             },
             goto="reporter",
         )
-    return Command(
-        update={
-            "messages": [AIMessage(content=full_response, name="planner")],
-            "current_plan": full_response,
-        },
-        goto="human_feedback",
+    update = {
+        "messages": [AIMessage(content=full_response, name="planner")],
+        "current_plan": plan_json,
+    }
+    if prefetch is not None:
+        result = await _finish_step_prefetch(prefetch, curr_plan, plan_seconds)
+        if result is not None:
+            update["current_plan"] = json.dumps(curr_plan, ensure_ascii=False, indent=4)
+            update["messages"].append(HumanMessage(content=result, name="researcher"))
+            update["observations"] = state.get("observations", []) + [result]
+    return Command(update=update, goto="human_feedback")
+
+
+def _start_step_prefetch(
+    state: State, config: RunnableConfig, step: dict
+) -> asyncio.Task | None:
+    """Start researching the first step of a plan that is still being generated."""
+    try:
+        step = Step.model_validate(step)
+    except Exception as e:
+        logger.warning(f"Cannot prefetch the first plan step: {e}")
+        return None
+    if step.step_type != StepType.RESEARCH or step.execution_res:
+        return None
+    logger.info(f"Starting step '{step.title}' while the plan is still streaming")
+    plan = Plan(
+        locale=state.get("locale", "en-US"),
+        has_enough_context=False,
+        thought="",
+        title=step.title,
+        steps=[step],
     )
+    prefetch_state = {**state, "current_plan": plan, "observations": []}
+
+    async def research(_):
+        start = time.perf_counter()
+        await researcher_node(prefetch_state, config)
+        return step, time.perf_counter() - start
+
+    # the agent runs inside the planner node, so its tokens must not be streamed as planner output
+    return asyncio.create_task(
+        RunnableLambda(research).ainvoke(None, config={"tags": [TAG_NOSTREAM]})
+    )
+
+
+async def _finish_step_prefetch(
+    prefetch: asyncio.Task, plan: dict, plan_seconds: float
+) -> str | None:
+    """
+    Wait for the prefetched first step and add its result to the parsed plan.
+
+    Args:
+        prefetch: The task started by _start_step_prefetch
+        plan: The plan parsed from the planner response, updated in place
+        plan_seconds: How long the planner took to stream the plan
+
+    Returns:
+        The result of the step, or None if it cannot be used
+    """
+    steps = plan.get("steps") or []
+    try:
+        step, step_seconds = await prefetch
+    except Exception as e:
+        logger.warning(f"Prefetching the first plan step failed: {e!r}")
+        return None
+    if (
+        not steps
+        or not isinstance(steps[0], dict)
+        or steps[0].get("execution_res")
+        or steps[0].get("title") != step.title
+        or step.execution_error
+        or not step.execution_res
+    ):
+        return None
+    steps[0]["execution_res"] = step.execution_res
+    logger.info(
+        f"Step '{step.title}' ran alongside the planner, saving "
+        f"~{min(step_seconds, plan_seconds) * 1000:.0f} ms "
+        f"(plan {plan_seconds * 1000:.0f} ms, step {step_seconds * 1000:.0f} ms)"
+    )
+    get_stream_writer()(
+        {
+            "type": "step_prefetched",
+            "step": step.title,
+            "content": step.execution_res,
+        }
+    )
+    return step.execution_res
+
+
+def _optimize_plan(plan: Plan, configurable: Configuration) -> Plan:
+    """Merge overlapping steps of an accepted plan before it is executed."""
+    if not configurable.step_merge_similarity:
+        return plan
+    plan, merged = merge_overlapping_steps(
+        plan,
+        float(configurable.step_merge_similarity),
+        int(configurable.max_step_num),
+    )
+    plan_optimization_stats["plans"] += 1
+    if not merged:
+        return plan
+    searches_saved = merged * step_averages["tool_calls"]
+    tokens_saved = merged * step_averages["tokens"]
+    plan_optimization_stats["steps_merged"] += merged
+    plan_optimization_stats["searches_saved"] += searches_saved
+    plan_optimization_stats["tokens_saved"] += tokens_saved
+    logger.info(
+        f"Merged {merged} overlapping steps, saving ~{searches_saved:.1f} searches "
+        f"and ~{tokens_saved:.0f} tokens. Totals: {plan_optimization_stats}"
+    )
+    get_stream_writer()(
+        {
+            "type": "plan_optimized",
+            "steps_merged": merged,
+            "steps": [step.title for step in plan.steps],
+        }
+    )
+    return plan
 
 
 def human_feedback_node(
-    state,
+    state, config: RunnableConfig = None
 ) -> Command[Literal["planner", "research_team", "reporter", "__end__"]]:
     current_plan = state.get("current_plan", "")
+    configurable = Configuration.from_runnable_config(config)
     # check if the plan is auto accepted
     auto_accepted_plan = state.get("auto_accepted_plan", False)
+    accepted_by_user = False
     if not auto_accepted_plan:
         feedback = interrupt("Please Review the Plan.")
 
         # if the feedback is not accepted, return the planner node
         if feedback and str(feedback).upper().startswith("[EDIT_PLAN]"):
+            if configurable.plan_cache_ttl:
+                # an edited plan means the cached plan of this template is not good enough
+                plan_template_cache.invalidate(
+                    _get_user_query(state), state.get("locale", "en-US")
+                )
             return Command(
                 update={
                     "messages": [
@@ -174,6 +418,7 @@ def human_feedback_node(
             )
         elif feedback and str(feedback).upper().startswith("[ACCEPTED]"):
             logger.info("Plan is accepted by user.")
+            accepted_by_user = True
         else:
             raise TypeError(f"Interrupt value of {feedback} is not supported.")
 
@@ -195,9 +440,17 @@ def human_feedback_node(
         else:
             return Command(goto="__end__")
 
+    accepted_plan = Plan.model_validate(new_plan)
+    if goto == "research_team":
+        # only plans a user reviewed are reused, not auto accepted ones
+        if configurable.plan_cache_ttl and accepted_by_user and plan_iterations == 1:
+            plan_template_cache.store(
+                _get_user_query(state), accepted_plan.locale, accepted_plan
+            )
+        accepted_plan = _optimize_plan(accepted_plan, configurable)
     return Command(
         update={
-            "current_plan": Plan.model_validate(new_plan),
+            "current_plan": accepted_plan,
             "plan_iterations": plan_iterations,
             "locale": new_plan["locale"],
         },
@@ -205,28 +458,169 @@ def human_feedback_node(
     )
 
 
-def coordinator_node(
+def _get_user_query(state: State) -> str:
+    """Return the latest question of the user, skipping agent outputs and feedback."""
+    for message in reversed(state.get("messages", [])):
+        if isinstance(message, HumanMessage) and not message.name:
+            return message.content if isinstance(message.content, str) else ""
+    return ""
+
+
+def _use_cached_plan(
+    state: State, configurable: Configuration, command: Command
+) -> Command:
+    """Replace a handoff to the planner by a plan from the template cache."""
+    if (
+        not configurable.plan_cache_ttl
+        or configurable.resources
+        or command.goto not in ("planner", "background_investigator")
+    ):
+        return command
+    start = time.perf_counter()
+    locale = command.update.get("locale", "en-US")
+    plan = plan_template_cache.lookup(
+        _get_user_query(state),
+        locale,
+        ttl_seconds=float(configurable.plan_cache_ttl),
+        max_step_num=int(configurable.max_step_num),
+        min_confirmations=int(configurable.plan_cache_min_confirmations),
+    )
+    if plan is None:
+        return command
+    plan_json = plan.model_dump_json(indent=4, exclude_none=True)
+    logger.info(
+        f"Instantiated a cached plan in {(time.perf_counter() - start) * 1000:.1f} ms, "
+        "skipping the planner"
+    )
+    # a planner message that was not streamed, so clients show the plan at once
+    get_stream_writer()(
+        {
+            "type": "cached_plan",
+            "agent": "planner",
+            "id": f"run-{uuid4()}",
+            "role": "assistant",
+            "content": plan_json,
+            "finish_reason": "stop",
+        }
+    )
+    # speculative investigation results are kept for a planner run after an edit
+    return Command(
+        update={
+            **command.update,
+            "messages": [AIMessage(content=plan_json, name="planner")],
+            "current_plan": plan_json,
+        },
+        goto="human_feedback",
+    )
+
+
+def _coordinate_locally(state: State, configurable: Configuration) -> Command | None:
+    """
+    Handle obvious greetings and research requests without the coordinator LLM.
+
+    Returns:
+        The coordinator's command, or None if the local classifier is not
+        confident enough and the LLM has to decide
+    """
+    start = time.perf_counter()
+    query = state["messages"][-1].content
+    if not isinstance(query, str):
+        return None
+    result = classify_intent(query)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if not result.locale or result.confidence < FAST_PATH_CONFIDENCE:
+        logger.info(f"Coordinator fast path not confident, using the LLM: {result}")
+        return None
+
+    update = {"locale": result.locale, "resources": configurable.resources}
+    if result.intent == "research":
+        logger.info(
+            f"Coordinator fast path handed off in {elapsed_ms:.1f} ms: {result}"
+        )
+        if state.get("enable_background_investigation"):
+            return Command(update=update, goto="background_investigator")
+        return Command(update=update, goto="planner")
+    if result.intent == "greeting" and result.locale in GREETING_REPLIES:
+        logger.info(f"Coordinator fast path greeted in {elapsed_ms:.1f} ms: {result}")
+        # the messages stream mode sends the finished message to the client
+        update["messages"] = AIMessage(
+            content=GREETING_REPLIES[result.locale],
+            name="coordinator",
+            id=f"run-{uuid4()}",
+            response_metadata={"finish_reason": "stop"},
+        )
+        return Command(update=update, goto="__end__")
+    return None
+
+
+async def coordinator_node(
     state: State, config: RunnableConfig
-) -> Command[Literal["planner", "background_investigator", "__end__"]]:
+) -> Command[
+    Literal["planner", "background_investigator", "human_feedback", "__end__"]
+]:
     """Coordinator node that communicate with customers."""
     logger.info("Coordinator talking.")
     configurable = Configuration.from_runnable_config(config)
     messages = apply_prompt_template("coordinator", state)
+    if configurable.coordinator_fast_path:
+        if fast_path := _coordinate_locally(state, configurable):
+            return _use_cached_plan(state, configurable, fast_path)
+
     coordinator_llm_type = AGENT_LLM_MAP["coordinator"]
     logger.info(f"Coordinator LLM type: {coordinator_llm_type}")
-    response = (
-        get_llm_by_type(coordinator_llm_type)
-        .bind_tools([handoff_to_planner])
-        .invoke(messages)
-    )
+
+    investigation = None
+    if configurable.speculative_investigation and state.get(
+        "enable_background_investigation"
+    ):
+        # The search only depends on the user's message, so it can run while
+        # the coordinator decides whether to hand off to the planner
+        async def timed_investigation():
+            investigation_start = time.perf_counter()
+            results = await _investigate(
+                state["messages"][-1].content, configurable.max_search_results
+            )
+            return results, (time.perf_counter() - investigation_start) * 1000
+
+        investigation = asyncio.create_task(timed_investigation())
+
+    start = time.perf_counter()
+    try:
+        response = (
+            await get_llm_by_type(coordinator_llm_type, agent_name="coordinator")
+            .bind_tools([handoff_to_planner])
+            .ainvoke(messages)
+        )
+    except BaseException:
+        if investigation is not None:
+            investigation.cancel()
+        raise
+    coordinator_ms = (time.perf_counter() - start) * 1000
     logger.debug(f"Current state messages: {state['messages']}")
 
     goto = "__end__"
     locale = state.get("locale", "en-US")  # Default locale if not specified
+    update = {}
 
     if len(response.tool_calls) > 0:
         goto = "planner"
-        if state.get("enable_background_investigation"):
+        if investigation is not None:
+            try:
+                results, investigation_ms = await investigation
+                update["background_investigation_results"] = results
+                saved_ms = (
+                    coordinator_ms
+                    + investigation_ms
+                    - (time.perf_counter() - start) * 1000
+                )
+                logger.info(
+                    f"Speculative background investigation saved {saved_ms:.1f} ms "
+                    "before planning"
+                )
+            except Exception as e:
+                logger.error(f"Speculative background investigation failed: {e}")
+                goto = "background_investigator"
+        elif state.get("enable_background_investigation"):
             # if the search_before_planning is True, add the web search tool to the planner agent
             goto = "background_investigator"
         try:
@@ -243,28 +637,147 @@ def coordinator_node(
             "Coordinator response contains no tool calls. Terminating workflow execution."
         )
         logger.debug(f"Coordinator response: {response}")
+        if investigation is not None:
+            logger.info("Discarding speculative background investigation")
+            investigation.cancel()
+
+    return _use_cached_plan(
+        state,
+        configurable,
+        Command(
+            update={**update, "locale": locale, "resources": configurable.resources},
+            goto=goto,
+        ),
+    )
+
+
+async def fast_answer_node(
+    state: State, config: RunnableConfig
+) -> Command[Literal["planner", "__end__"]]:
+    """Answer node of the fast graph that replies from the search results in one pass."""
+    logger.info("Fast answer node is answering.")
+    configurable = Configuration.from_runnable_config(config)
+    messages = apply_prompt_template("fast_answer", state, configurable)
+    llm = get_llm_by_type(AGENT_LLM_MAP["fast_answer"])
+    if configurable.fast_escalation:
+        # the model hands off to the planner when the search results are not enough
+        llm = llm.bind_tools([handoff_to_planner])
+    response = await llm.ainvoke(messages)
+    locale = state.get("locale", "en-US")
 
+    for tool_call in getattr(response, "tool_calls", None) or []:
+        if tool_call.get("name", "") != "handoff_to_planner":
+            continue
+        logger.info("Fast answer lacks context, escalating to the full research")
+        locale = tool_call.get("args", {}).get("locale") or locale
+        return Command(
+            update={
+                "locale": locale,
+                "resources": configurable.resources,
+                # the planner reuses the search results of the fast pass
+                "enable_background_investigation": True,
+            },
+            goto="planner",
+        )
+
+    logger.info("Fast answer completed")
     return Command(
-        update={"locale": locale, "resources": configurable.resources},
-        goto=goto,
+        update={
+            "messages": [AIMessage(content=response.content, name="coordinator")],
+            "final_report": response.content,
+            "locale": locale,
+        },
+        goto="__end__",
     )
 
 
-def reporter_node(state: State):
+async def _draft_report_sections(
+    requirements: str, observations: list[str], locale: str, message_id: str
+) -> list[str]:
+    """
+    Draft one report section per group of observations concurrently.
+
+    The drafts are sent to the client as parts of the reporter message with
+    `message_id`, until the final report replaces them.
+    """
+    groups = []
+    group_tokens = 0
+    for observation in observations:
+        tokens = estimate_tokens(observation)
+        if groups and group_tokens + tokens <= REPORT_SECTION_TOKEN_BUDGET:
+            groups[-1].append(observation)
+            group_tokens += tokens
+        else:
+            groups.append([observation])
+            group_tokens = tokens
+    logger.info(
+        f"Drafting {len(groups)} report sections from {len(observations)} observations"
+    )
+
+    llm = get_llm_by_type(AGENT_LLM_MAP["reporter"])
+    writer = get_stream_writer()
+
+    async def draft_section(index: int, group: list[str]) -> tuple[int, str]:
+        messages = apply_prompt_template(
+            "reporter_section",
+            {
+                "messages": [HumanMessage(requirements)]
+                + [
+                    HumanMessage(
+                        content=f"Below are some observations for this section:\n\n{observation}",
+                        name="observation",
+                    )
+                    for observation in group
+                ],
+                "locale": locale,
+            },
+        )
+        # Drafts are sent to the client as whole sections, not token by token
+        response = await llm.ainvoke(messages, config={"tags": [TAG_NOSTREAM]})
+        return index, response.content
+
+    drafts = [""] * len(groups)
+    for next_draft in asyncio.as_completed(
+        [draft_section(i, group) for i, group in enumerate(groups)]
+    ):
+        index, content = await next_draft
+        drafts[index] = content
+        writer(
+            {
+                "type": "report_section",
+                "agent": "reporter",
+                "id": message_id,
+                "role": "assistant",
+                "index": index,
+                "total": len(groups),
+                "content": content,
+            }
+        )
+    return drafts
+
+
+async def reporter_node(state: State, config: RunnableConfig):
     """Reporter node that write a final report."""
     logger.info("Reporter write final report")
+    configurable = Configuration.from_runnable_config(config)
     current_plan = state.get("current_plan")
+    requirements = f"# Research Requirements\n\n## Task\n\n{current_plan.title}\n\n## Description\n\n{current_plan.thought}"
     input_ = {
-        "messages": [
-            HumanMessage(
-                f"# Research Requirements\n\n## Task\n\n{current_plan.title}\n\n## Description\n\n{current_plan.thought}"
-            )
-        ],
+        "messages": [HumanMessage(requirements)],
         "locale": state.get("locale", "en-US"),
     }
     invoke_messages = apply_prompt_template("reporter", input_)
     observations = state.get("observations", [])
 
+    # the streamed report gets the message id of its run, known in advance so
+    # the section drafts are shown in the same message
+    report_run_id = uuid4()
+    # In sectioned mode the final pass only merges and polishes the section drafts
+    if configurable.reporter_mode == "sectioned" and len(observations) > 1:
+        observations = await _draft_report_sections(
+            requirements, observations, input_["locale"], f"run-{report_run_id}"
+        )
+
     # Add a reminder about the new report format, citation style, and table usage
     invoke_messages.append(
         HumanMessage(
@@ -281,23 +794,172 @@ def reporter_node(state: State):
             )
         )
     logger.debug(f"Current invoke messages: {invoke_messages}")
-    response = get_llm_by_type(AGENT_LLM_MAP["reporter"]).invoke(invoke_messages)
+    response = await get_llm_by_type(AGENT_LLM_MAP["reporter"]).ainvoke(
+        invoke_messages, config={"run_id": report_run_id}
+    )
     response_content = response.content
     logger.info(f"reporter response: {response_content}")
 
     return {"final_report": response_content}
 
 
-def research_team_node(state: State):
+async def _check_sufficiency(state: State) -> dict | None:
+    """
+    Ask a small model whether the completed steps already answer the question.
+
+    Returns:
+        A state update that ends the research early, or None to continue
+    """
+    current_plan = state.get("current_plan")
+    if not isinstance(current_plan, Plan):
+        return None
+    completed = [step for step in current_plan.steps if step.execution_res]
+    remaining = [step for step in current_plan.steps if not step.execution_res]
+    if not completed or not remaining:
+        return None
+
+    question = next(
+        (
+            m.content
+            for m in reversed(state.get("messages", []))
+            if isinstance(m, HumanMessage) and not m.name
+        ),
+        current_plan.title,
+    )
+    content = f"# Question\n\n{question}\n\n# Findings\n\n"
+    for step in completed:
+        content += (
+            f"## {step.title}\n\n<finding>\n"
+            f"{step.execution_res[:SUFFICIENCY_FINDING_CHARS]}\n</finding>\n\n"
+        )
+    content += "# Remaining Steps\n\n" + "\n".join(
+        f"- {step.title}: {step.description}" for step in remaining
+    )
+    messages = apply_prompt_template(
+        "sufficiency_check", {"messages": [HumanMessage(content=content)]}
+    )
+
+    start = time.perf_counter()
+    early_termination_stats["checks"] += 1
+    llm = get_llm_by_type(AGENT_LLM_MAP["sufficiency_checker"])
+    try:
+        response = await llm.ainvoke(messages, config={"tags": [TAG_NOSTREAM]})
+        verdict = json.loads(repair_json_output(response.content))
+    except Exception as e:
+        logger.warning(f"Sufficiency check failed, continuing the plan: {e}")
+        return None
+    logger.info(
+        f"Sufficiency check took {(time.perf_counter() - start) * 1000:.1f} ms: "
+        f"{verdict}"
+    )
+    if not isinstance(verdict, dict) or verdict.get("sufficient") is not True:
+        return None
+
+    seconds_saved = len(remaining) * step_averages["seconds"]
+    early_termination_stats["terminated_runs"] += 1
+    early_termination_stats["steps_skipped"] += len(remaining)
+    early_termination_stats["seconds_saved"] += seconds_saved
+    logger.info(
+        f"Enough context after {len(completed)} steps, skipping {len(remaining)} "
+        f"steps (~{seconds_saved:.1f}s saved). Totals: {early_termination_stats}"
+    )
+    get_stream_writer()(
+        {
+            "type": "early_termination",
+            "steps_skipped": len(remaining),
+            "reason": verdict.get("reason", ""),
+        }
+    )
+    return {
+        "current_plan": current_plan.model_copy(update={"has_enough_context": True})
+    }
+
+
+async def research_team_node(state: State, config: RunnableConfig):
     """Research team node that collaborates on tasks."""
     logger.info("Research team is collaborating on tasks.")
-    pass
+    if budget := get_run_budget(config):
+        usage = budget.usage()
+        logger.info(f"Run budget usage: {usage}")
+        get_stream_writer()({"type": "budget", **usage})
+    configurable = Configuration.from_runnable_config(config)
+    if configurable.early_termination:
+        return await _check_sufficiency(state)
+
+
+def _agent_callbacks(
+    config: RunnableConfig, *handlers: BaseCallbackHandler
+) -> BaseCallbackManager:
+    """
+    Add handlers to the callbacks the node inherited from the graph run.
+
+    The inherited callbacks stream the agent's messages to the client and
+    count its usage in the run budget, so they are kept, not replaced.
+    """
+    manager = get_callback_manager_for_config(ensure_config(config))
+    for handler in handlers:
+        manager.add_handler(handler, inherit=True)
+    return manager
+
+
+def _lookup_cached_step(
+    state: State, config: RunnableConfig, agent_name: str
+) -> Command[Literal["research_team"]] | None:
+    """
+    Reuse the cached result of an equivalent research step, if there is one.
+
+    Returns:
+        The command that completes the current step with the cached result,
+        or None if the step has to be executed
+    """
+    configurable = Configuration.from_runnable_config(config)
+    if agent_name != "researcher" or not configurable.step_cache_ttl:
+        return None
+    current_plan = state.get("current_plan")
+    current_step = next(
+        (step for step in current_plan.steps if not step.execution_res), None
+    )
+    if current_step is None:
+        return None
+    hit = step_result_cache.lookup(
+        current_step,
+        state.get("locale", "en-US"),
+        state.get("resources", []),
+        ttl_seconds=float(configurable.step_cache_ttl),
+        similarity_threshold=float(configurable.step_cache_similarity),
+    )
+    if hit is None:
+        return None
+    provenance = {
+        "source_step": hit.entry.title,
+        "source_thread_id": hit.entry.thread_id,
+        "age_seconds": round(hit.age_seconds, 1),
+        "similarity": round(hit.similarity, 3),
+    }
+    logger.info(f"Reusing cached result for step '{current_step.title}': {provenance}")
+    get_stream_writer()(
+        {
+            "type": "step_cache_hit",
+            "step": current_step.title,
+            **provenance,
+        }
+    )
+    current_step.execution_res = hit.entry.result
+    return Command(
+        update={
+            "messages": [HumanMessage(content=hit.entry.result, name=agent_name)],
+            "observations": state.get("observations", []) + [hit.entry.result],
+            "current_plan": current_plan,
+        },
+        goto="research_team",
+    )
 
 
 async def _execute_agent_step(
-    state: State, agent, agent_name: str
+    state: State, agent, agent_name: str, config: RunnableConfig = None
 ) -> Command[Literal["research_team"]]:
     """Helper function to execute a step using the specified agent."""
+    configurable = Configuration.from_runnable_config(config)
     current_plan = state.get("current_plan")
     observations = state.get("observations", [])
 
@@ -317,6 +979,9 @@ async def _execute_agent_step(
 
     logger.info(f"Executing step: {current_step.title}, agent: {agent_name}")
 
+    # Research results only depend on the step, so they are shared across threads
+    use_step_cache = agent_name == "researcher" and configurable.step_cache_ttl
+
     # Format completed steps information
     completed_steps_info = ""
     if completed_steps:
@@ -380,8 +1045,85 @@ async def _execute_agent_step(
         recursion_limit = default_recursion_limit
 
     logger.info(f"Agent input: {agent_input}")
-    result = await agent.ainvoke(
-        input=agent_input, config={"recursion_limit": recursion_limit}
+    step_start = time.perf_counter()
+    budget = get_run_budget(config)
+    # the deadline covers all attempts of the step, and so do its partial findings
+    deadline = AGENT_DEADLINES.get(agent_name, {}).get("step_seconds") or None
+    deadline_at = time.monotonic() + deadline if deadline is not None else None
+    progress = StepProgress()
+    handlers = [progress] if budget is None else [BudgetGuard(budget), progress]
+    agent_config = {
+        "recursion_limit": recursion_limit,
+        "callbacks": _agent_callbacks(config, *handlers),
+    }
+    max_retries = int(configurable.max_step_retries)
+    for attempt in range(max_retries + 1):
+        budget_seconds = budget.remaining_seconds if budget is not None else None
+        deadline_seconds = (
+            max(deadline_at - time.monotonic(), 0) if deadline_at is not None else None
+        )
+        stopped_by_deadline = deadline_seconds is not None and (
+            budget_seconds is None or deadline_seconds <= budget_seconds
+        )
+        timeout = deadline_seconds if stopped_by_deadline else budget_seconds
+        try:
+            # on timeout the agent task is cancelled with its LLM and tool calls
+            result = await asyncio.wait_for(
+                agent.ainvoke(input=agent_input, config=agent_config), timeout
+            )
+            break
+        except Exception as e:
+            if isinstance(e, BudgetExceededError) or (
+                budget is not None and budget.exceeded
+            ):
+                # the remaining steps are skipped, research_team routes to the reporter
+                logger.warning(
+                    f"Run budget exhausted during step '{current_step.title}', "
+                    f"skipping the remaining steps: {budget.usage()}"
+                )
+                current_step.execution_res = "Skipped: the run budget was exhausted."
+                return Command(
+                    update={"current_plan": current_plan}, goto="research_team"
+                )
+            if (
+                isinstance(e, asyncio.TimeoutError)
+                and stopped_by_deadline
+                and time.monotonic() >= deadline_at
+            ):
+                return _finish_step_at_deadline(
+                    current_step,
+                    current_plan,
+                    observations,
+                    agent_name,
+                    progress,
+                    deadline,
+                )
+            if attempt < max_retries:
+                delay = STEP_RETRY_BACKOFF_SECONDS * 2**attempt
+                if deadline_at is not None:
+                    # the next attempt starts at the latest when the deadline expires
+                    delay = min(delay, max(deadline_at - time.monotonic(), 0))
+                logger.warning(
+                    f"Step '{current_step.title}' failed on attempt {attempt + 1}/"
+                    f"{max_retries + 1}: {e!r}. Retrying in {delay}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            # mark the step as failed so the run continues with the next one
+            logger.error(
+                f"Step '{current_step.title}' failed after {max_retries + 1} "
+                f"attempts: {e!r}"
+            )
+            current_step.execution_error = repr(e)
+            current_step.execution_res = (
+                f"This step failed and produced no findings: {e}"
+            )
+            return Command(update={"current_plan": current_plan}, goto="research_team")
+
+    _record_step_execution(
+        time.perf_counter() - step_start,
+        sum(isinstance(m, ToolMessage) for m in result["messages"]),
+        count_message_tokens(result["messages"]),
     )
 
     # Process the result
@@ -391,6 +1133,15 @@ async def _execute_agent_step(
     # Update the step with the execution result
     current_step.execution_res = response_content
     logger.info(f"Step '{current_step.title}' execution completed by {agent_name}")
+    if use_step_cache:
+        step_result_cache.store(
+            current_step,
+            state.get("locale", "en-US"),
+            state.get("resources", []),
+            response_content,
+            agent_name,
+            thread_id=(config or {}).get("configurable", {}).get("thread_id"),
+        )
 
     return Command(
         update={
@@ -401,36 +1152,187 @@ async def _execute_agent_step(
                 )
             ],
             "observations": observations + [response_content],
+            # write the plan back so the completed step is checkpointed
+            "current_plan": current_plan,
         },
         goto="research_team",
     )
 
 
+def _finish_step_at_deadline(
+    current_step: Step,
+    current_plan: Plan,
+    observations: list[str],
+    agent_name: str,
+    progress: StepProgress,
+    deadline: float,
+) -> Command[Literal["research_team"]]:
+    """Complete a step stopped by its deadline with the findings gathered so far."""
+    record_step_deadline_hit(agent_name)
+    logger.warning(
+        f"Step '{current_step.title}' reached its {deadline}s deadline with "
+        f"{len(progress.tool_results)} tool results, continuing with partial findings"
+    )
+    get_stream_writer()(
+        {
+            "type": "step_deadline",
+            "step": current_step.title,
+            "deadline_seconds": deadline,
+            "tool_results": len(progress.tool_results),
+        }
+    )
+    findings = progress.partial_findings(deadline)
+    current_step.execution_res = findings
+    return Command(
+        update={
+            "messages": [HumanMessage(content=findings, name=agent_name)],
+            "observations": observations + [findings],
+            "current_plan": current_plan,
+        },
+        goto="research_team",
+    )
+
+
+def _serialize_configurable(config: RunnableConfig) -> dict:
+    configurable = Configuration.from_runnable_config(config)
+    values = {
+        f.name: getattr(configurable, f.name)
+        for f in dataclasses.fields(configurable)
+        if f.name != "distributed_steps"
+    }
+    values["resources"] = [resource.model_dump() for resource in values["resources"]]
+    values["thread_id"] = (config or {}).get("configurable", {}).get("thread_id")
+    return values
+
+
+async def _dispatch_agent_step(
+    state: State, config: RunnableConfig, agent_type: str
+) -> Command[Literal["research_team"]]:
+    """
+    Execute the current step on a step worker and wait for its result.
+
+    The step runs in a worker process with the run's plan, observations and
+    configuration, and what is left of the run budget. The worker's state
+    update is applied to this run as if the step had run locally.
+    """
+    current_plan = state.get("current_plan")
+    current_step = next(
+        (step for step in current_plan.steps if not step.execution_res), None
+    )
+    if current_step is None:
+        logger.warning("No unexecuted step found")
+        return Command(goto="research_team")
+
+    budget = get_run_budget(config)
+    remaining = {}
+    if budget is not None:
+        if budget.max_tokens:
+            remaining["max_tokens"] = max(budget.max_tokens - budget.tokens, 1)
+        if budget.max_tool_calls:
+            remaining["max_tool_calls"] = max(
+                budget.max_tool_calls - budget.tool_calls, 1
+            )
+        if budget.max_seconds:
+            remaining["max_seconds"] = max(budget.remaining_seconds, 1)
+    broker = get_step_broker()
+    start = time.perf_counter()
+    task_id = await asyncio.to_thread(
+        broker.enqueue,
+        agent_type,
+        {
+            "state": {
+                "current_plan": current_plan.model_dump(mode="json"),
+                "observations": state.get("observations", []),
+                "locale": state.get("locale", "en-US"),
+                "resources": [r.model_dump() for r in state.get("resources", [])],
+            },
+            "configurable": _serialize_configurable(config),
+            "budget": remaining,
+        },
+    )
+    logger.info(f"Dispatched step '{current_step.title}' as task {task_id}")
+    writer = get_stream_writer()
+    writer(
+        {
+            "type": "step_dispatched",
+            "step": current_step.title,
+            "task_id": task_id,
+        }
+    )
+    try:
+        result = await broker.wait_for_result(
+            task_id,
+            timeout=remaining.get("max_seconds", STEP_WORKER_TIMEOUT_SECONDS),
+        )
+    except (StepTaskError, TimeoutError) as e:
+        logger.error(f"Step '{current_step.title}' failed on the step workers: {e}")
+        current_step.execution_error = repr(e)
+        current_step.execution_res = f"This step failed and produced no findings: {e}"
+        return Command(update={"current_plan": current_plan}, goto="research_team")
+
+    if budget is not None:
+        budget.record(**result.get("usage", {}))
+    logger.info(
+        f"Step '{current_step.title}' finished on a step worker in "
+        f"{time.perf_counter() - start:.1f}s"
+    )
+    update = {"current_plan": Plan.model_validate(result["current_plan"])}
+    if result.get("observations") is not None:
+        update["observations"] = result["observations"]
+    if result.get("messages"):
+        update["messages"] = [
+            HumanMessage(content=content, name=agent_type)
+            for content in result["messages"]
+        ]
+        # the worker's tokens are not streamed, so clients get the finding at once
+        writer(
+            {
+                "type": "step_result",
+                "agent": agent_type,
+                "id": f"run-{task_id}",
+                "role": "assistant",
+                "step": current_step.title,
+                "content": result["messages"][-1],
+                "finish_reason": "stop",
+            }
+        )
+    return Command(update=update, goto="research_team")
+
+
 async def _setup_and_execute_agent_step(
     state: State,
     config: RunnableConfig,
     agent_type: str,
     default_tools: list,
+    dispatch: bool = True,
 ) -> Command[Literal["research_team"]]:
     """Helper function to set up an agent with appropriate tools and execute a step.
 
     This function handles the common logic for both researcher_node and coder_node:
-    1. Configures MCP servers and tools based on agent type
-    2. Creates an agent with the appropriate tools or uses the default agent
-    3. Executes the agent on the current step
+    1. Reuses the cached result of an equivalent research step, if any
+    2. Configures MCP servers and tools based on agent type
+    3. Creates an agent with the appropriate tools or uses the default agent
+    4. Executes the agent on the current step
 
     Args:
         state: The current state
         config: The runnable config
         agent_type: The type of agent ("researcher" or "coder")
         default_tools: The default tools to add to the agent
+        dispatch: Whether the step may be sent to a step worker
 
     Returns:
         Command to update state and go to research_team
     """
+    # a cached result makes the MCP sessions, the agent and the worker unnecessary
+    if cached := _lookup_cached_step(state, config, agent_type):
+        return cached
     configurable = Configuration.from_runnable_config(config)
+    if dispatch and configurable.distributed_steps:
+        return await _dispatch_agent_step(state, config, agent_type)
     mcp_servers = {}
     enabled_tools = {}
+    result_cache_settings = {}
 
     # Extract MCP server configuration for this agent type
     if configurable.mcp_settings:
@@ -446,35 +1348,87 @@ async def _setup_and_execute_agent_step(
                 }
                 for tool_name in server_config["enabled_tools"]:
                     enabled_tools[tool_name] = server_name
+                if server_config.get("result_cache"):
+                    result_cache_settings[server_name] = server_config["result_cache"]
 
     # Create and execute agent with MCP tools if available
     if mcp_servers:
-        async with MultiServerMCPClient(mcp_servers) as client:
-            loaded_tools = default_tools[:]
-            for tool in client.get_tools():
+        start = time.perf_counter()
+        loaded_tools = default_tools[:]
+        mcp_tools = await get_mcp_tools(mcp_servers)
+        for server_name, server_tools in mcp_tools.items():
+            for tool in server_tools:
                 if tool.name in enabled_tools:
-                    tool.description = (
-                        f"Powered by '{enabled_tools[tool.name]}'.\n{tool.description}"
+                    ttl_seconds = get_result_cache_ttl(
+                        result_cache_settings.get(server_name), tool.name
                     )
-                    loaded_tools.append(tool)
-            agent = create_agent(agent_type, agent_type, loaded_tools, agent_type)
-            return await _execute_agent_step(state, agent, agent_type)
+                    if ttl_seconds:
+                        tool = with_result_cache(
+                            tool, mcp_servers[server_name], ttl_seconds
+                        )
+                    # copy the shared tool so its description is not changed in place
+                    loaded_tools.append(
+                        tool.model_copy(
+                            update={
+                                "description": f"Powered by '{enabled_tools[tool.name]}'.\n{tool.description}"
+                            }
+                        )
+                    )
+        logger.info(
+            f"MCP setup for {len(mcp_servers)} servers took "
+            f"{(time.perf_counter() - start) * 1000:.1f} ms"
+        )
+        if result_cache_settings:
+            logger.info(f"MCP tool result cache: {mcp_result_cache.stats()}")
+        agent = _create_agent_timed(agent_type, loaded_tools)
+        return await _execute_agent_step(state, agent, agent_type, config)
     else:
         # Use default tools if no MCP servers are configured
-        agent = create_agent(agent_type, agent_type, default_tools, agent_type)
-        return await _execute_agent_step(state, agent, agent_type)
+        agent = _create_agent_timed(agent_type, default_tools)
+        return await _execute_agent_step(state, agent, agent_type, config)
 
 
-async def researcher_node(
-    state: State, config: RunnableConfig
-) -> Command[Literal["research_team"]]:
-    """Researcher node that do research"""
-    logger.info("Researcher node is researching.")
+def _create_agent_timed(agent_type: str, tools: list):
+    """Create (or reuse a cached) agent and log the per-step setup overhead."""
+    start = time.perf_counter()
+    agent = create_agent(agent_type, agent_type, tools, agent_type)
+    logger.info(
+        f"{agent_type} agent setup took {(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+    return agent
+
+
+def _get_default_tools(state: State, config: RunnableConfig, agent_type: str) -> list:
+    """Return the built-in tools of a researcher or coder agent."""
+    if agent_type == "coder":
+        return [python_repl_tool]
     configurable = Configuration.from_runnable_config(config)
     tools = [get_web_search_tool(configurable.max_search_results), crawl_tool]
     retriever_tool = get_retriever_tool(state.get("resources", []))
     if retriever_tool:
         tools.insert(0, retriever_tool)
+    return tools
+
+
+async def run_agent_step(
+    state: State, config: RunnableConfig, agent_type: str
+) -> Command[Literal["research_team"]]:
+    """Execute the current step in this process, used by the step workers."""
+    return await _setup_and_execute_agent_step(
+        state,
+        config,
+        agent_type,
+        _get_default_tools(state, config, agent_type),
+        dispatch=False,
+    )
+
+
+async def researcher_node(
+    state: State, config: RunnableConfig
+) -> Command[Literal["research_team"]]:
+    """Researcher node that do research"""
+    logger.info("Researcher node is researching.")
+    tools = _get_default_tools(state, config, "researcher")
     logger.info(f"Researcher tools: {tools}")
     return await _setup_and_execute_agent_step(
         state,
@@ -493,5 +1447,5 @@ async def coder_node(
         state,
         config,
         "coder",
-        [python_repl_tool],
+        _get_default_tools(state, config, "coder"),
     )
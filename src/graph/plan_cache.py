@@ -0,0 +1,340 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import copy
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from src.prompts.planner_model import Plan
+
+logger = logging.getLogger(__name__)
+
+# Full names of well-known assets and their tickers
+ASSET_TICKERS = {
+    "aave": "AAVE",
+    "aptos": "APT",
+    "arbitrum": "ARB",
+    "avalanche": "AVAX",
+    "bitcoin": "BTC",
+    "cardano": "ADA",
+    "chainlink": "LINK",
+    "dogecoin": "DOGE",
+    "ethereum": "ETH",
+    "litecoin": "LTC",
+    "monero": "XMR",
+    "polkadot": "DOT",
+    "ripple": "XRP",
+    "shiba": "SHIB",
+    "solana": "SOL",
+    "stellar": "XLM",
+    "sui": "SUI",
+    "tether": "USDT",
+    "toncoin": "TON",
+    "tron": "TRX",
+    "uniswap": "UNI",
+}
+TICKER_NAMES = {ticker: name.capitalize() for name, ticker in ASSET_TICKERS.items()}
+
+# other tickers must be written as cashtags such as $PEPE, uppercase words
+# like AI, US or ETF are no assets
+_TOKEN_PATTERN = re.compile(r"\$?\w+")
+_TICKER_PATTERN = re.compile(r"^(?=.*[A-Z])[A-Z0-9]{2,10}$")
+_YEAR_PATTERN = re.compile(r"^(19|20)\d\d$")
+_SLOT_PATTERN = re.compile(r"<<(\d+)(?::(name|ticker))?>>")
+
+
+@dataclass
+class QueryTemplate:
+    """A query reduced to its wording with numbered entity slots."""
+
+    template: str
+    entities: list[str]
+
+
+@dataclass
+class PlanTemplateEntry:
+    """A validated plan skeleton for a query template."""
+
+    template: str
+    locale: str
+    skeleton: dict
+    created_at: float
+    confirmations: int = 1
+    hits: int = 0
+
+
+def _is_known_asset(token: str) -> bool:
+    token = token.removeprefix("$")
+    return token.lower() in ASSET_TICKERS or token in TICKER_NAMES
+
+
+def _slot_type(token: str) -> Optional[str]:
+    if _is_known_asset(token):
+        return "asset"
+    if _YEAR_PATTERN.match(token):
+        return "year"
+    if token.startswith("$") and _TICKER_PATTERN.match(token[1:].upper()):
+        return "asset"
+    return None
+
+
+def extract_template(query: str) -> Optional[QueryTemplate]:
+    """
+    Reduce a query to a template such as "price analysis of <asset:0>".
+
+    Known asset names and tickers, cashtags such as $PEPE and years become
+    numbered slots, all other words are lowercased. Multi-word entities are
+    not recognized.
+
+    Returns:
+        The template and its entities in slot order, or None if the query
+        has no entity
+    """
+    words = []
+    entities: list[str] = []
+    for token in _TOKEN_PATTERN.findall(query):
+        slot_type = _slot_type(token)
+        if slot_type is None:
+            words.append(token.lower())
+            continue
+        entity = token[1:].upper() if token.startswith("$") else token
+        matches = [i for i, e in enumerate(entities) if e.lower() == entity.lower()]
+        if matches:
+            index = matches[0]
+        else:
+            index = len(entities)
+            entities.append(entity)
+        words.append(f"<{slot_type}:{index}>")
+    if not entities:
+        return None
+    return QueryTemplate(template=" ".join(words), entities=entities)
+
+
+def _aliases(entity: str) -> dict[str, str]:
+    """Return the other spellings of an asset, keyed by slot form."""
+    if entity.lower() in ASSET_TICKERS:
+        return {"ticker": ASSET_TICKERS[entity.lower()]}
+    if entity.upper() in TICKER_NAMES:
+        return {"name": TICKER_NAMES[entity.upper()]}
+    return {}
+
+
+def _replace_word(text: str, word: str, marker: str) -> str:
+    pattern = re.compile(rf"(?<!\w){re.escape(word)}(?!\w)", re.IGNORECASE)
+    return pattern.sub(marker, text)
+
+
+def _map_texts(plan: dict, fn) -> dict:
+    plan = copy.deepcopy(plan)
+    for field in ("title", "thought"):
+        plan[field] = fn(plan.get(field, ""))
+    for step in plan["steps"]:
+        for field in ("title", "description"):
+            step[field] = fn(step.get(field, ""))
+    return plan
+
+
+def make_skeleton(plan: Plan, query: QueryTemplate) -> Optional[dict]:
+    """
+    Replace the entities of the query in a plan by slot markers.
+
+    Returns:
+        The plan skeleton, or None if the plan does not mention every entity
+        or still mentions another asset, so it cannot be reused for other
+        entities
+    """
+    skeleton = plan.model_dump(
+        include={"locale", "has_enough_context", "thought", "title", "steps"},
+        exclude={"steps": {"__all__": {"execution_res", "execution_error"}}},
+        mode="json",
+    )
+
+    def replace(text: str) -> str:
+        for index, entity in enumerate(query.entities):
+            text = _replace_word(text, entity, f"<<{index}>>")
+            for form, alias in _aliases(entity).items():
+                text = _replace_word(text, alias, f"<<{index}:{form}>>")
+        return text
+
+    skeleton = _map_texts(skeleton, replace)
+    text = json.dumps(skeleton)
+    used = {int(index) for index, _ in _SLOT_PATTERN.findall(text)}
+    if used != set(range(len(query.entities))):
+        return None
+    for token in _TOKEN_PATTERN.findall(_SLOT_PATTERN.sub(" ", text)):
+        if _is_known_asset(token):
+            return None
+    return skeleton
+
+
+def fill_skeleton(skeleton: dict, entities: list[str]) -> Optional[dict]:
+    """Fill the slot markers of a skeleton, or return None if an alias is unknown."""
+    missing = False
+
+    def fill(text: str) -> str:
+        nonlocal missing
+
+        def substitute(match: re.Match) -> str:
+            nonlocal missing
+            entity = entities[int(match.group(1))]
+            if match.group(2) is None:
+                return entity
+            alias = _aliases(entity).get(match.group(2))
+            if alias is None:
+                missing = True
+                return entity
+            return alias
+
+        return _SLOT_PATTERN.sub(substitute, text)
+
+    plan = _map_texts(skeleton, fill)
+    return None if missing else plan
+
+
+class PlanTemplateCache:
+    """
+    A process-wide cache of accepted plans keyed by query template.
+
+    Recurring queries such as "price analysis of AVAX" and "price analysis of
+    SOL" share a template, so the plan accepted for one is instantiated for
+    the other without calling the planner. Only plans that mention every
+    entity of the query and no other asset are cached.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[tuple[str, str], PlanTemplateEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.rejected = 0
+        self.invalidations = 0
+
+    def lookup(
+        self,
+        query: str,
+        locale: str,
+        ttl_seconds: float,
+        max_step_num: int,
+        min_confirmations: int = 1,
+    ) -> Optional[Plan]:
+        """
+        Instantiate the cached plan of the query's template.
+
+        Args:
+            query: The user's question
+            locale: The locale of the run
+            ttl_seconds: Maximum age of a reusable plan
+            max_step_num: Maximum number of steps of a plan
+            min_confirmations: How many times the plan must have been accepted
+
+        Returns:
+            The plan for the query's entities, or None
+        """
+        template = extract_template(query)
+        if template is None:
+            return None
+        key = (template.template, locale)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.created_at < time.time() - ttl_seconds:
+                del self._entries[key]
+                entry = None
+            plan = None
+            if (
+                entry is not None
+                and entry.confirmations >= min_confirmations
+                and len(entry.skeleton["steps"]) <= max_step_num
+            ):
+                filled = fill_skeleton(entry.skeleton, template.entities)
+                if filled is not None:
+                    plan = Plan.model_validate(filled)
+            if plan is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            entry.hits += 1
+            self.hits += 1
+        logger.info(
+            f"Plan template cache hit for '{template.template}' "
+            f"with {template.entities}"
+        )
+        return plan
+
+    def store(self, query: str, locale: str, plan: Plan) -> bool:
+        """
+        Remember an accepted plan for the query's template.
+
+        Returns:
+            True if the plan was cached
+        """
+        template = extract_template(query)
+        if template is None or plan.has_enough_context or not plan.steps:
+            return False
+        skeleton = make_skeleton(plan, template)
+        key = (template.template, locale)
+        with self._lock:
+            if skeleton is None:
+                self.rejected += 1
+                return False
+            entry = self._entries.get(key)
+            if entry is not None and entry.skeleton == skeleton:
+                # the same plan was accepted again, keep its expiry
+                entry.confirmations += 1
+                return True
+            self._entries.pop(key, None)
+            self._entries[key] = PlanTemplateEntry(
+                template=template.template,
+                locale=locale,
+                skeleton=skeleton,
+                created_at=time.time(),
+            )
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.info(f"Cached the accepted plan for template '{template.template}'")
+        return True
+
+    def invalidate(self, query: str, locale: str) -> bool:
+        """Remove the cached plan of the query's template, e.g. after a plan edit."""
+        template = extract_template(query)
+        if template is None:
+            return False
+        with self._lock:
+            if self._entries.pop((template.template, locale), None) is None:
+                return False
+            self.invalidations += 1
+        logger.info(f"Invalidated the cached plan for template '{template.template}'")
+        return True
+
+    def clear(self) -> None:
+        """Remove all cached plans."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Return the size and hit-rate metrics of the cache."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "rejected": self.rejected,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+plan_template_cache = PlanTemplateCache(
+    max_entries=int(os.getenv("PLAN_CACHE_MAX_ENTRIES", "256"))
+)
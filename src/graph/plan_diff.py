@@ -0,0 +1,76 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+import logging
+
+from src.prompts.planner_model import Plan, Step
+from src.utils.json_utils import repair_json_output
+
+from .step_cache import jaccard_similarity, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Minimum word overlap of two descriptions with the same title to treat them as equivalent
+EQUIVALENT_DESCRIPTION_SIMILARITY = 0.8
+
+
+def get_executed_steps(plan: Plan | str | None) -> list[Step]:
+    """Return the successfully executed steps of a plan or of its JSON."""
+    if isinstance(plan, str):
+        try:
+            plan = Plan.model_validate(json.loads(repair_json_output(plan)))
+        except Exception:
+            return []
+    if not isinstance(plan, Plan):
+        return []
+    return [
+        step for step in plan.steps if step.execution_res and not step.execution_error
+    ]
+
+
+def _is_equivalent(old_step: Step, new_step: dict) -> bool:
+    if old_step.step_type != new_step.get("step_type"):
+        return False
+    if normalize_text(old_step.title) != normalize_text(new_step.get("title", "")):
+        return False
+    old_words = set(normalize_text(old_step.description).split())
+    new_words = set(normalize_text(new_step.get("description", "")).split())
+    return (
+        old_words == new_words
+        or jaccard_similarity(old_words, new_words) >= EQUIVALENT_DESCRIPTION_SIMILARITY
+    )
+
+
+def carry_over_results(old_plan: Plan | str | None, new_plan: dict) -> int:
+    """
+    Copy the results of executed steps into unchanged steps of a new plan.
+
+    A step is unchanged when its type and normalized title match an executed
+    step and its description is the same or nearly the same, so only new or
+    modified steps are executed again.
+
+    Args:
+        old_plan: The previous plan, as a Plan or as planner JSON
+        new_plan: The new plan parsed from the planner response, updated in place
+
+    Returns:
+        The number of steps whose results were carried over
+    """
+    executed = get_executed_steps(old_plan)
+    carried = 0
+    for new_step in new_plan.get("steps") or []:
+        if not isinstance(new_step, dict) or new_step.get("execution_res"):
+            continue
+        for old_step in executed:
+            if _is_equivalent(old_step, new_step):
+                new_step["execution_res"] = old_step.execution_res
+                executed.remove(old_step)
+                carried += 1
+                break
+    if carried:
+        logger.info(
+            f"Carried over results of {carried} of "
+            f"{len(new_plan.get('steps') or [])} steps from the previous plan"
+        )
+    return carried
@@ -0,0 +1,131 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import logging
+
+from src.prompts.planner_model import Plan, Step
+
+from .step_cache import jaccard_similarity, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Words ignored when comparing steps
+STOP_WORDS = {
+    "a",
+    "an",
+    "and",
+    "as",
+    "at",
+    "by",
+    "for",
+    "from",
+    "in",
+    "including",
+    "into",
+    "of",
+    "on",
+    "or",
+    "the",
+    "their",
+    "to",
+    "with",
+}
+
+
+def _words(text: str) -> set[str]:
+    return set(normalize_text(text).split()) - STOP_WORDS
+
+
+def step_similarity(a: Step, b: Step) -> float:
+    """
+    Lexical similarity of two steps between 0 and 1.
+
+    Titles are compared by overlap coefficient, so a short title contained in a
+    longer one ("market size" in "market growth and size trends") counts as a
+    full match. Descriptions are compared by Jaccard similarity.
+    """
+    if a.step_type != b.step_type:
+        return 0.0
+    title_a, title_b = _words(a.title), _words(b.title)
+    title_overlap = (
+        len(title_a & title_b) / min(len(title_a), len(title_b))
+        if title_a and title_b
+        else 0.0
+    )
+    description_overlap = jaccard_similarity(
+        _words(a.description), _words(b.description)
+    )
+    return 0.5 * title_overlap + 0.5 * description_overlap
+
+
+def _merge(a: Step, b: Step) -> Step:
+    title = a.title
+    if not _words(b.title) <= _words(a.title):
+        title = f"{a.title} & {b.title}"
+    description = a.description
+    if normalize_text(b.description) not in normalize_text(a.description):
+        description = f"{a.description} {b.description}"
+    return a.model_copy(
+        update={
+            "title": title,
+            "description": description,
+            "need_search": a.need_search or b.need_search,
+        }
+    )
+
+
+def merge_overlapping_steps(
+    plan: Plan, similarity_threshold: float, max_step_num: int
+) -> tuple[Plan, int]:
+    """
+    Merge near-duplicate pending steps of a plan.
+
+    The most similar pair of pending steps of the same type is merged while
+    its similarity reaches `similarity_threshold`. Unrelated steps are never
+    merged: a plan that still has more than `max_step_num` steps loses its
+    last pending steps instead. Steps that already have results are kept.
+
+    Args:
+        plan: The accepted plan
+        similarity_threshold: Minimum step similarity to merge two steps
+        max_step_num: Maximum number of steps of a plan
+
+    Returns:
+        The optimized plan and the number of merged steps
+    """
+    steps = list(plan.steps)
+    merged = 0
+    while True:
+        best = None
+        for i, a in enumerate(steps):
+            for j in range(i + 1, len(steps)):
+                b = steps[j]
+                if a.execution_res or b.execution_res:
+                    continue
+                similarity = step_similarity(a, b)
+                if similarity >= similarity_threshold and (
+                    best is None or similarity > best[0]
+                ):
+                    best = (similarity, i, j)
+        if best is None:
+            break
+        similarity, i, j = best
+        logger.info(
+            f"Merging step '{steps[j].title}' into '{steps[i].title}' "
+            f"(similarity {similarity:.2f})"
+        )
+        steps[i] = _merge(steps[i], steps[j])
+        del steps[j]
+        merged += 1
+    excess = len(steps) - max_step_num
+    if excess > 0:
+        pending = [i for i, step in enumerate(steps) if not step.execution_res]
+        dropped = set(pending[-excess:])
+        logger.warning(
+            f"Plan has {len(steps)} steps after merging, dropping the last "
+            f"{len(dropped)} pending steps to stay within {max_step_num}"
+        )
+        steps = [step for i, step in enumerate(steps) if i not in dropped]
+    if len(steps) == len(plan.steps):
+        return plan, 0
+    return plan.model_copy(update={"steps": steps}), merged
@@ -0,0 +1,171 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from src.prompts.planner_model import Step
+from src.rag import Resource
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase a text and reduce it to its words."""
+    return " ".join(_WORD_PATTERN.findall(text.lower()))
+
+
+def jaccard_similarity(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+@dataclass
+class StepCacheEntry:
+    """A cached step result and where it came from."""
+
+    title: str
+    description: str
+    locale: str
+    resources_key: str
+    result: str
+    agent_name: str
+    thread_id: Optional[str]
+    created_at: float
+
+    @property
+    def words(self) -> set[str]:
+        return set(normalize_text(f"{self.title} {self.description}").split())
+
+
+@dataclass
+class StepCacheHit:
+    """A step result reused from the cache."""
+
+    entry: StepCacheEntry
+    similarity: float
+
+    @property
+    def age_seconds(self) -> float:
+        return time.time() - self.entry.created_at
+
+
+class StepResultCache:
+    """
+    A process-wide cache of research step results shared across threads.
+
+    Results are keyed by the normalized step title and description, the
+    locale and the resource set. Lookups can also accept lexical
+    near-duplicates of a step above a similarity threshold.
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, StepCacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _resources_key(resources: list[Resource]) -> str:
+        return "\n".join(sorted(resource.uri for resource in resources or []))
+
+    def _key(self, step: Step, locale: str, resources_key: str) -> str:
+        parts = [
+            normalize_text(step.title),
+            normalize_text(step.description),
+            locale,
+            resources_key,
+        ]
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+    def lookup(
+        self,
+        step: Step,
+        locale: str,
+        resources: list[Resource],
+        ttl_seconds: float,
+        similarity_threshold: Optional[float] = None,
+    ) -> Optional[StepCacheHit]:
+        """
+        Find a fresh result for a step.
+
+        Args:
+            step: The step to execute
+            locale: The locale of the run
+            resources: The resources of the run
+            ttl_seconds: Maximum age of a reusable result
+            similarity_threshold: If set, reuse the most similar step whose
+                word overlap (Jaccard) with this step is at least this value
+
+        Returns:
+            The cached result with its provenance, or None
+        """
+        resources_key = self._resources_key(resources)
+        oldest = time.time() - ttl_seconds
+        with self._lock:
+            key = self._key(step, locale, resources_key)
+            entry = self._entries.get(key)
+            if entry is not None and entry.created_at >= oldest:
+                self._entries.move_to_end(key)
+                return StepCacheHit(entry=entry, similarity=1.0)
+            if not similarity_threshold:
+                return None
+
+            words = set(normalize_text(f"{step.title} {step.description}").split())
+            best = None
+            for entry in self._entries.values():
+                if (
+                    entry.created_at < oldest
+                    or entry.locale != locale
+                    or entry.resources_key != resources_key
+                ):
+                    continue
+                similarity = jaccard_similarity(words, entry.words)
+                if similarity >= similarity_threshold and (
+                    best is None or similarity > best.similarity
+                ):
+                    best = StepCacheHit(entry=entry, similarity=similarity)
+            return best
+
+    def store(
+        self,
+        step: Step,
+        locale: str,
+        resources: list[Resource],
+        result: str,
+        agent_name: str,
+        thread_id: Optional[str] = None,
+    ) -> None:
+        """Remember the result of an executed step."""
+        resources_key = self._resources_key(resources)
+        key = self._key(step, locale, resources_key)
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = StepCacheEntry(
+                title=step.title,
+                description=step.description,
+                locale=locale,
+                resources_key=resources_key,
+                result=result,
+                agent_name=agent_name,
+                thread_id=thread_id,
+                created_at=time.time(),
+            )
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        with self._lock:
+            self._entries.clear()
+
+
+step_result_cache = StepResultCache(
+    max_entries=int(os.getenv("STEP_CACHE_MAX_ENTRIES", "512"))
+)
@@ -0,0 +1,186 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import importlib.util
+import logging
+import os
+import threading
+import weakref
+from typing import Any, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package (pip install "httpx[http2]")
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(
+            os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")
+        ),
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "120")),
+    )
+
+
+def _use_http2() -> bool:
+    enabled = os.getenv("LLM_HTTP2", "true").lower() in ("1", "true", "yes")
+    return enabled and HTTP2_AVAILABLE
+
+
+# the defaults of the OpenAI client: long generations, fast connection failures
+_TIMEOUT = httpx.Timeout(600, connect=5)
+
+
+class _LoopBoundAsyncClient(httpx.AsyncClient):
+    """
+    An async client that sends each request through a client of the running
+    event loop.
+
+    Async connections belong to the loop that opened them, so a client used
+    from several loops, e.g. a worker thread that runs its own loop next to
+    the server's, keeps one pool per loop.
+    """
+
+    def __init__(self, factory: Callable[[], httpx.AsyncClient]):
+        super().__init__(timeout=_TIMEOUT)
+        self._factory = factory
+        self._loop_clients: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, httpx.AsyncClient
+        ] = weakref.WeakKeyDictionary()
+        self._loop_clients_lock = threading.Lock()
+
+    def loop_client(self) -> httpx.AsyncClient:
+        """Return the client of the running event loop, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        with self._loop_clients_lock:
+            client = self._loop_clients.get(loop)
+            if client is None or client.is_closed:
+                client = self._loop_clients[loop] = self._factory()
+            return client
+
+    def loop_clients(self) -> list[httpx.AsyncClient]:
+        with self._loop_clients_lock:
+            return list(self._loop_clients.values())
+
+    async def send(self, request: httpx.Request, **kwargs: Any) -> httpx.Response:
+        return await self.loop_client().send(request, **kwargs)
+
+    async def aclose(self) -> None:
+        # the clients of other loops cannot be closed from this one, their
+        # connections are released with their loop
+        loop = asyncio.get_running_loop()
+        with self._loop_clients_lock:
+            client = self._loop_clients.pop(loop, None)
+            self._loop_clients.clear()
+        if client is not None:
+            await client.aclose()
+        await super().aclose()
+
+
+class LLMHttpClients:
+    """
+    Sync and async httpx clients shared by all LLM instances.
+
+    Every ChatOpenAI gets the same clients, so the LLM types share one
+    connection pool per mode and reloading the LLMs keeps the open
+    connections instead of handshaking again. The clients honor the
+    HTTP(S)_PROXY environment variables like the OpenAI default clients.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._client: Optional[httpx.Client] = None
+        self._async_client: Optional[_LoopBoundAsyncClient] = None
+        self.requests = 0
+
+    def _count_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+    async def _acount_request(self, request: httpx.Request) -> None:
+        self.requests += 1
+
+    def get_client(self) -> httpx.Client:
+        """Return the shared sync client, creating it on first use."""
+        with self._lock:
+            if self._client is None or self._client.is_closed:
+                http2 = _use_http2()
+                self._client = httpx.Client(
+                    limits=_pool_limits(),
+                    http2=http2,
+                    timeout=_TIMEOUT,
+                    event_hooks={"request": [self._count_request]},
+                )
+                logger.info(f"Created the shared LLM HTTP client (http2={http2})")
+            return self._client
+
+    def _new_async_client(self) -> httpx.AsyncClient:
+        http2 = _use_http2()
+        logger.info(f"Created an async LLM HTTP client (http2={http2})")
+        return httpx.AsyncClient(
+            limits=_pool_limits(),
+            http2=http2,
+            timeout=_TIMEOUT,
+            event_hooks={"request": [self._acount_request]},
+        )
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        """Return the shared async client, creating it on first use."""
+        with self._lock:
+            if self._async_client is None or self._async_client.is_closed:
+                self._async_client = _LoopBoundAsyncClient(self._new_async_client)
+            return self._async_client
+
+    async def aclose(self) -> None:
+        """Close both clients and their connections, e.g. on shutdown."""
+        with self._lock:
+            client, self._client = self._client, None
+            async_client, self._async_client = self._async_client, None
+        if client is not None:
+            client.close()
+        if async_client is not None:
+            await async_client.aclose()
+
+    @staticmethod
+    def _pool_stats(clients: list[Any]) -> Optional[dict[str, int]]:
+        if not clients:
+            return None
+        # httpx does not expose its pools, read the httpcore pools of the
+        # direct transport and of the proxy transports
+        pools = [
+            transport._pool
+            for client in clients
+            for transport in [client._transport, *client._mounts.values()]
+            if getattr(transport, "_pool", None) is not None
+        ]
+        connections = [c for pool in pools for c in pool.connections]
+        requests = [r for pool in pools for r in getattr(pool, "_requests", [])]
+        return {
+            "connections": len(connections),
+            "active": sum(not c.is_idle() for c in connections),
+            "idle": sum(c.is_idle() for c in connections),
+            "http2": sum(", HTTP/2," in c.info() for c in connections),
+            "queued_requests": sum(r.connection is None for r in requests),
+        }
+
+    def stats(self) -> dict[str, Any]:
+        """Return the utilization of the shared connection pools."""
+        limits = _pool_limits()
+        client, async_client = self._client, self._async_client
+        return {
+            "requests": self.requests,
+            "max_connections": limits.max_connections,
+            "max_keepalive_connections": limits.max_keepalive_connections,
+            "http2_enabled": _use_http2(),
+            "sync": self._pool_stats([client]) if client else None,
+            "async": (
+                self._pool_stats(async_client.loop_clients()) if async_client else None
+            ),
+        }
+
+
+llm_http_clients = LLMHttpClients()
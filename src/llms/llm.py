@@ -2,7 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 import os
 import logging # Added import
 
@@ -11,8 +11,13 @@ from langchain_openai import ChatOpenAI
 from src.config import load_yaml_config
 from src.config.agents import LLMType
 
+from .http_client import llm_http_clients
+from .response_cache import CachingChatOpenAI, get_response_cache_ttl
+
 # Cache for LLM instances
 _llm_cache: dict[LLMType, ChatOpenAI] = {}
+# Copies of the LLM instances that cache the responses of an agent
+_agent_llm_cache: dict[tuple[LLMType, str], ChatOpenAI] = {}
 
 logger = logging.getLogger(__name__) # Added logger
 
@@ -62,17 +67,25 @@ def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> ChatOpenAI:
     safe_conf = {k: v if k != "api_key" else "***" for k, v in merged_conf.items()}
     logger.info(f"Final LLM configuration: {safe_conf}")
 
-    return ChatOpenAI(**merged_conf)
+    # all LLM types share the pooled HTTP clients, which outlive reloads
+    merged_conf.setdefault("http_client", llm_http_clients.get_client())
+    merged_conf.setdefault("http_async_client", llm_http_clients.get_async_client())
+
+    return CachingChatOpenAI(**merged_conf)
 
 
 def clear_llm_cache():
     """Clear the LLM cache to force reloading of configurations."""
     global _llm_cache
     _llm_cache.clear()
+    _agent_llm_cache.clear()
 
 
 def reload_all_llms():
-    """Force reload all LLM instances with current configuration."""
+    """Force reload all LLM instances with current configuration.
+
+    The shared HTTP clients are kept, so open connections are reused.
+    """
     clear_llm_cache()
     # Pre-load all LLM types to ensure they're available
     for llm_type in ["basic", "reasoning", "vision"]:
@@ -82,6 +95,7 @@ def reload_all_llms():
 def get_llm_by_type(
     llm_type: LLMType,
     force_reload: bool = False,
+    agent_name: Optional[str] = None,
 ) -> ChatOpenAI:
     """
     Get LLM instance by type. Returns cached instance if available.
@@ -89,17 +103,27 @@ def get_llm_by_type(
     Args:
         llm_type: The type of LLM to get
         force_reload: If True, forces reloading even if cached instance exists
+        agent_name: The calling agent, whose identical calls reuse earlier
+            responses when it has a response cache TTL
     """
     # Force reload if requested or if cache is empty
     if force_reload or llm_type not in _llm_cache:
         conf = load_yaml_config(
             str((Path(__file__).parent.parent.parent / "conf.yaml").resolve())
         )
-        llm = _create_llm_use_conf(llm_type, conf)
-        _llm_cache[llm_type] = llm
-        return llm
+        _llm_cache[llm_type] = _create_llm_use_conf(llm_type, conf)
+        _agent_llm_cache.clear()
+    llm = _llm_cache[llm_type]
 
-    return _llm_cache[llm_type]
+    ttl = get_response_cache_ttl(agent_name) if agent_name else 0
+    if not ttl:
+        return llm
+    key = (llm_type, agent_name)
+    cached = _agent_llm_cache.get(key)
+    if cached is None or cached.response_cache_ttl != ttl:
+        cached = llm.model_copy(update={"response_cache_ttl": ttl})
+        _agent_llm_cache[key] = cached
+    return cached
 
 
 # In the future, we will use reasoning_llm and vl_llm for different purposes
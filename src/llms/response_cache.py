@@ -0,0 +1,376 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    message_chunk_to_message,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.config.agents import AGENT_RESPONSE_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Number of characters per streamed chunk when a cached response is played back
+PLAYBACK_CHUNK_CHARS = 24
+
+# The prompts show the current time to the second, the key keeps only the day
+_CURRENT_TIME_PATTERN = re.compile(
+    r"^(CURRENT_TIME: \w{3} \w{3} \d{2} \d{4}) .*$", re.MULTILINE
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_responses (
+    key TEXT PRIMARY KEY,
+    message TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_responses_created_at ON llm_responses (created_at);
+"""
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return _CURRENT_TIME_PATTERN.sub(r"\1", content)
+    return content
+
+
+def _normalize_message(message: BaseMessage) -> dict:
+    """Keep the fields of a message the model sees, without per-run ids."""
+    data = {"type": message.type, "content": _normalize_content(message.content)}
+    if message.name:
+        data["name"] = message.name
+    if tool_calls := getattr(message, "tool_calls", None):
+        data["tool_calls"] = [
+            {"name": call["name"], "args": call["args"]} for call in tool_calls
+        ]
+    return data
+
+
+def response_cache_key(params: dict, messages: list[BaseMessage]) -> str:
+    """
+    Hash the model, the request parameters and the normalized messages of a call.
+
+    Args:
+        params: The model name and the invocation parameters, e.g. bound tools
+        messages: The prompt messages
+
+    Returns:
+        The cache key
+    """
+    payload = {
+        "params": {k: v for k, v in params.items() if k != "stream"},
+        "messages": [_normalize_message(m) for m in messages],
+    }
+    text = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    An exact-match cache of LLM responses, with an in-memory LRU tier in front
+    of an optional SQLite tier shared by the server processes of a machine.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_entries: int = 512,
+        max_age_seconds: float = 86400,
+    ):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_age_seconds = max_age_seconds
+        self._memory: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._initialized = False
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            with self._lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(_SCHEMA)
+                    self._initialized = True
+            yield conn
+        finally:
+            conn.close()
+
+    def _remember(self, key: str, message: dict, created_at: float) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            self._memory[key] = (message, created_at)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def lookup(self, key: str, ttl_seconds: float) -> Optional[AIMessage]:
+        """
+        Return the cached response of a call, or None.
+
+        Args:
+            key: The key of the call
+            ttl_seconds: Maximum age of a reusable response
+        """
+        oldest = time.time() - ttl_seconds
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and entry[1] >= oldest:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return messages_from_dict([entry[0]])[0]
+        row = None
+        if self.path:
+            try:
+                with self._connection() as conn:
+                    row = conn.execute(
+                        "SELECT message, created_at FROM llm_responses "
+                        "WHERE key = ? AND created_at >= ?",
+                        (key, oldest),
+                    ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache lookup failed: {e}")
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        message = json.loads(row[0])
+        self._remember(key, message, row[1])
+        with self._lock:
+            self.disk_hits += 1
+        return messages_from_dict([message])[0]
+
+    def store(self, key: str, message: AIMessage) -> None:
+        """Remember the response of a call."""
+        data = message_to_dict(
+            AIMessage(content=message.content, tool_calls=message.tool_calls)
+        )
+        now = time.time()
+        self._remember(key, data, now)
+        with self._lock:
+            self.stores += 1
+            prune = self.stores % 100 == 0
+        if not self.path:
+            return
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, message, created_at) "
+                    "VALUES (?, ?, ?)",
+                    (key, json.dumps(data, ensure_ascii=False), now),
+                )
+                if prune:
+                    conn.execute(
+                        "DELETE FROM llm_responses WHERE created_at < ?",
+                        (now - self.max_age_seconds,),
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"LLM response cache store failed: {e}")
+
+    async def alookup(self, key: str, ttl_seconds: float) -> Optional[AIMessage]:
+        if not self.path:
+            return self.lookup(key, ttl_seconds)
+        return await asyncio.to_thread(self.lookup, key, ttl_seconds)
+
+    async def astore(self, key: str, message: AIMessage) -> None:
+        if not self.path:
+            return self.store(key, message)
+        await asyncio.to_thread(self.store, key, message)
+
+    def clear(self) -> None:
+        """Remove all cached responses from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self.path and os.path.exists(self.path):
+            with self._connection() as conn:
+                conn.execute("DELETE FROM llm_responses")
+
+    def stats(self) -> dict:
+        """Return the size and hit-rate metrics of the cache."""
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+
+
+# cached responses cost no tokens, the flag tells the run budget to skip them
+_CACHED_USAGE = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+_CACHED_METADATA = {"finish_reason": "stop", "cached": True}
+
+
+def _as_hit(message: AIMessage) -> ChatResult:
+    """Wrap a cached response in the result of a call."""
+    message = message.model_copy(
+        update={
+            "usage_metadata": _CACHED_USAGE,
+            "response_metadata": {**message.response_metadata, **_CACHED_METADATA},
+        }
+    )
+    return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _playback(message: AIMessage) -> Iterator[ChatGenerationChunk]:
+    """Split a cached response into chunks, so streaming clients still see tokens."""
+    content = message.content
+    if isinstance(content, str) and content:
+        pieces = [
+            content[i : i + PLAYBACK_CHUNK_CHARS]
+            for i in range(0, len(content), PLAYBACK_CHUNK_CHARS)
+        ]
+    else:
+        pieces = [content]
+    for i, piece in enumerate(pieces):
+        chunk = AIMessageChunk(content=piece)
+        if i == len(pieces) - 1:
+            chunk = AIMessageChunk(
+                content=piece,
+                tool_call_chunks=[
+                    {
+                        "name": call["name"],
+                        "args": json.dumps(call["args"], ensure_ascii=False),
+                        "id": call["id"],
+                        "index": index,
+                    }
+                    for index, call in enumerate(message.tool_calls)
+                ],
+                usage_metadata=_CACHED_USAGE,
+                response_metadata=_CACHED_METADATA,
+            )
+        yield ChatGenerationChunk(message=chunk)
+
+
+def _to_message(chunks: list[ChatGenerationChunk]) -> Optional[AIMessage]:
+    if not chunks:
+        return None
+    generation = chunks[0]
+    for chunk in chunks[1:]:
+        generation += chunk
+    return message_chunk_to_message(generation.message)
+
+
+def _cacheable(message: Optional[BaseMessage]) -> bool:
+    return isinstance(message, AIMessage) and bool(
+        message.content or message.tool_calls
+    )
+
+
+class CachingChatOpenAI(ChatOpenAI):
+    """
+    A ChatOpenAI that reuses the responses of identical calls when
+    `response_cache_ttl` is set. Cached responses are returned by invoke and
+    replayed chunk by chunk when the call is streamed.
+    """
+
+    response_cache_ttl: float = 0
+
+    def _response_cache_key(
+        self, messages: list[BaseMessage], stop: Optional[list[str]], **kwargs: Any
+    ) -> str:
+        return response_cache_key(
+            self._get_invocation_params(stop=stop, **kwargs), messages
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        # a streaming model generates through _stream, which caches the response
+        if not self.response_cache_ttl or self.streaming:
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        key = self._response_cache_key(messages, stop, **kwargs)
+        if cached := llm_response_cache.lookup(key, self.response_cache_ttl):
+            return _as_hit(cached)
+        result = super()._generate(messages, stop, run_manager, **kwargs)
+        if len(result.generations) == 1 and _cacheable(result.generations[0].message):
+            llm_response_cache.store(key, result.generations[0].message)
+        return result
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        if not self.response_cache_ttl or self.streaming:
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+        key = self._response_cache_key(messages, stop, **kwargs)
+        if cached := await llm_response_cache.alookup(key, self.response_cache_ttl):
+            return _as_hit(cached)
+        result = await super()._agenerate(messages, stop, run_manager, **kwargs)
+        if len(result.generations) == 1 and _cacheable(result.generations[0].message):
+            await llm_response_cache.astore(key, result.generations[0].message)
+        return result
+
+    def _stream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> Iterator[ChatGenerationChunk]:
+        if not self.response_cache_ttl:
+            yield from super()._stream(messages, stop, run_manager, **kwargs)
+            return
+        key = self._response_cache_key(messages, stop, **kwargs)
+        if cached := llm_response_cache.lookup(key, self.response_cache_ttl):
+            yield from _playback(cached)
+            return
+        chunks = []
+        for chunk in super()._stream(messages, stop, run_manager, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        if _cacheable(message := _to_message(chunks)):
+            llm_response_cache.store(key, message)
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if not self.response_cache_ttl:
+            async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                yield chunk
+            return
+        key = self._response_cache_key(messages, stop, **kwargs)
+        if cached := await llm_response_cache.alookup(key, self.response_cache_ttl):
+            for chunk in _playback(cached):
+                yield chunk
+            return
+        chunks = []
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        if _cacheable(message := _to_message(chunks)):
+            await llm_response_cache.astore(key, message)
+
+
+def get_response_cache_ttl(agent_name: str) -> float:
+    """Return the response cache TTL of an agent, 0 if its responses are not cached."""
+    if os.getenv("LLM_RESPONSE_CACHE", "false").lower() not in ("1", "true", "yes"):
+        return 0
+    return AGENT_RESPONSE_CACHE_TTL.get(agent_name, 0)
+
+
+llm_response_cache = LLMResponseCache(
+    path=os.getenv("LLM_RESPONSE_CACHE_PATH", "llm_response_cache.sqlite3") or None,
+    max_memory_entries=int(os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", "512")),
+    max_age_seconds=max(AGENT_RESPONSE_CACHE_TTL.values(), default=86400),
+)
@@ -18,7 +18,7 @@ logger = logging.getLogger(__name__)
 def script_writer_node(state: PodcastState):
     logger.info("Generating script for podcast...")
     model = get_llm_by_type(
-        AGENT_LLM_MAP["podcast_script_writer"]
+        AGENT_LLM_MAP["podcast_script_writer"], agent_name="podcast_script_writer"
     ).with_structured_output(Script, method="json_mode")
     script = model.invoke(
         [
@@ -0,0 +1,196 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+import logging
+import re
+from typing import Any
+
+from langchain_core.messages import ToolMessage
+
+from src.config.agents import AGENT_CONTEXT_POLICY
+from src.utils.token_utils import count_message_tokens, get_message_content
+
+logger = logging.getLogger(__name__)
+
+# Message names that are authored by the user rather than by an agent
+USER_MESSAGE_NAMES = {"feedback"}
+
+_URL_PATTERN = re.compile(r"https?://[^\s'\"<>()\[\]]+")
+
+
+def _get_message_field(message: Any, field_name: str) -> Any:
+    if isinstance(message, dict):
+        return message.get(field_name)
+    return getattr(message, field_name, None)
+
+
+def is_agent_output(message: Any) -> bool:
+    """Return True if the message was produced by an agent instead of the user."""
+    role = _get_message_field(message, "role") or _get_message_field(message, "type")
+    if role in ("ai", "assistant", "tool"):
+        return True
+    name = _get_message_field(message, "name")
+    return bool(name) and name not in USER_MESSAGE_NAMES
+
+
+def condense_message(message: Any, max_chars: int) -> Any:
+    """
+    Return a copy of the message with its content cut down to `max_chars`.
+
+    Args:
+        message: A LangChain message object or a role/content dict
+        max_chars: Maximum number of characters of the original content to keep
+
+    Returns:
+        The original message if it is short enough, otherwise a condensed copy
+    """
+    content = get_message_content(message)
+    if len(content) <= max_chars:
+        return message
+    omitted = len(content) - max_chars
+    condensed = f"{content[:max_chars].rstrip()}\n\n[... condensed, {omitted} characters omitted]"
+    if isinstance(message, dict):
+        return {**message, "content": condensed}
+    return message.model_copy(update={"content": condensed})
+
+
+def _apply_window(messages: list, max_messages: int) -> list:
+    if max_messages <= 0 or len(messages) <= max_messages:
+        return list(messages)
+    return list(messages[-max_messages:])
+
+
+def _apply_summarize(messages: list, keep_recent: int, summary_chars: int) -> list:
+    agent_indexes = [i for i, m in enumerate(messages) if is_agent_output(m)]
+    condensed_indexes = set(agent_indexes[: max(len(agent_indexes) - keep_recent, 0)])
+    return [
+        condense_message(m, summary_chars) if i in condensed_indexes else m
+        for i, m in enumerate(messages)
+    ]
+
+
+def apply_context_policy(agent_name: str, messages: list) -> list:
+    """
+    Reduce the message history to what the given agent needs to see.
+
+    The policy is looked up in `AGENT_CONTEXT_POLICY`; agents without a
+    policy get the messages unchanged.
+
+    Args:
+        agent_name: Name of the agent (or prompt) the messages are sent to
+        messages: The message history from the state
+
+    Returns:
+        The list of messages to send to the agent
+    """
+    policy = AGENT_CONTEXT_POLICY.get(agent_name)
+    if not policy or not messages:
+        return list(messages)
+
+    strategy = policy.get("strategy", "full")
+    if strategy == "window":
+        result = _apply_window(messages, policy.get("max_messages", 0))
+    elif strategy == "summarize":
+        result = _apply_summarize(
+            messages, policy.get("keep_recent", 0), policy.get("summary_chars", 800)
+        )
+    elif strategy == "full":
+        result = list(messages)
+    else:
+        logger.warning(
+            f"Unknown context strategy '{strategy}' for {agent_name}, using full history"
+        )
+        result = list(messages)
+
+    logger.info(
+        f"Context policy '{strategy}' for {agent_name}: "
+        f"{count_message_tokens(messages)} -> {count_message_tokens(result)} tokens, "
+        f"{len(messages)} -> {len(result)} messages"
+    )
+    return result
+
+
+def _parse_tool_items(content: Any) -> list[dict]:
+    if isinstance(content, str):
+        try:
+            content = json.loads(content)
+        except ValueError:
+            return []
+    if isinstance(content, dict):
+        content = [content]
+    if not isinstance(content, list):
+        return []
+    return [item for item in content if isinstance(item, dict) and item.get("url")]
+
+
+def summarize_tool_result(message: ToolMessage, summary_chars: int) -> str:
+    """
+    Summarize a tool result to its sources and the beginning of its content.
+
+    Search and crawl results are reduced to their titles, URLs and a snippet of
+    each page; other results keep their URLs and the beginning of the content.
+
+    Args:
+        message: The tool message to summarize
+        summary_chars: Maximum number of content characters to keep
+
+    Returns:
+        The summary text
+    """
+    items = _parse_tool_items(message.content)
+    if items:
+        snippet_chars = max(summary_chars // len(items), 80)
+        lines = []
+        for item in items:
+            snippet = str(item.get("content") or item.get("crawled_content") or "")
+            snippet = " ".join(snippet.split())[:snippet_chars]
+            lines.append(
+                f"- {item.get('title') or item['url']} ({item['url']}): {snippet}"
+            )
+        return "\n".join(lines)
+    content = get_message_content(message)
+    urls = list(dict.fromkeys(_URL_PATTERN.findall(content)))[:5]
+    body = " ".join(content.split())[:summary_chars]
+    if urls:
+        body += "\nSources: " + ", ".join(urls)
+    return body
+
+
+def summarize_tool_message(message: ToolMessage, summary_chars: int) -> ToolMessage:
+    """
+    Replace the content of a tool result with a short summary and source pointers.
+
+    Args:
+        message: The tool message to summarize
+        summary_chars: Maximum number of content characters to keep
+
+    Returns:
+        A condensed copy of the tool message
+    """
+    body = summarize_tool_result(message, summary_chars)
+    condensed = (
+        f"[Earlier {message.name or 'tool'} result condensed, "
+        f"call the tool again for full content]\n{body}"
+    )
+    return message.model_copy(update={"content": condensed})
+
+
+def condense_tool_results(messages: list, keep_recent: int, summary_chars: int) -> list:
+    """
+    Keep the `keep_recent` latest tool results in full and summarize older ones.
+
+    Args:
+        messages: The message history of a react agent
+        keep_recent: Number of most recent tool messages to keep verbatim
+        summary_chars: Maximum number of content characters of a summary
+
+    Returns:
+        The message list with older tool results condensed
+    """
+    tool_indexes = [i for i, m in enumerate(messages) if isinstance(m, ToolMessage)]
+    condensed_indexes = set(tool_indexes[: max(len(tool_indexes) - keep_recent, 0)])
+    return [
+        summarize_tool_message(m, summary_chars) if i in condensed_indexes else m
+        for i, m in enumerate(messages)
+    ]
@@ -20,6 +20,9 @@ class Step(BaseModel):
     execution_res: Optional[str] = Field(
         default=None, description="The Step execution result"
     )
+    execution_error: Optional[str] = Field(
+        default=None, description="The error of a step that failed every attempt"
+    )
 
 
 class Plan(BaseModel):
@@ -7,6 +7,7 @@ from datetime import datetime
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 from langgraph.prebuilt.chat_agent_executor import AgentState
 from src.config.configuration import Configuration
+from src.prompts.context import apply_context_policy
 
 # Initialize Jinja2 environment
 env = Environment(
@@ -45,7 +46,8 @@ def apply_prompt_template(
         state: Current agent state containing variables to substitute
 
     Returns:
-        List of messages with the system prompt as the first message
+        List of messages with the system prompt as the first message, followed by
+        the state messages filtered through the agent's context policy
     """
     # Convert state to dict for template rendering
     state_vars = {
@@ -60,6 +62,7 @@ def apply_prompt_template(
     try:
         template = env.get_template(f"{prompt_name}.md")
         system_prompt = template.render(**state_vars)
-        return [{"role": "system", "content": system_prompt}] + state["messages"]
+        messages = apply_context_policy(prompt_name, state["messages"])
+        return [{"role": "system", "content": system_prompt}] + messages
     except Exception as e:
         raise ValueError(f"Error applying template {prompt_name}: {e}")
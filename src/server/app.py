@@ -1,6 +1,7 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import base64
 import json
 import logging
@@ -11,11 +12,19 @@ from uuid import uuid4
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import Response, StreamingResponse
-from langchain_core.messages import AIMessageChunk, ToolMessage, BaseMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage, BaseMessage
+from langgraph.checkpoint.memory import MemorySaver
 from langgraph.types import Command
 
+from src.config.configuration import Configuration
 from src.config.tools import SELECTED_RAG_PROVIDER
-from src.graph.builder import build_graph_with_memory
+from src.graph.budget import start_run_budget
+from src.graph.builder import build_fast_graph_with_memory, build_graph_with_memory
+from src.graph.deadline import step_deadline_hits
+from src.graph.nodes import early_termination_stats, plan_optimization_stats
+from src.graph.plan_cache import plan_template_cache
+from src.llms.http_client import llm_http_clients
+from src.llms.response_cache import llm_response_cache
 from src.podcast.graph.builder import build_graph as build_podcast_graph
 from src.ppt.graph.builder import build_graph as build_ppt_graph
 from src.prose.graph.builder import build_graph as build_prose_graph
@@ -30,13 +39,16 @@ from src.server.chat_request import (
     TTSRequest,
 )
 from src.server.mcp_request import MCPServerMetadataRequest, MCPServerMetadataResponse
-from src.server.mcp_utils import load_mcp_tools
+from src.server.mcp_utils import load_mcp_tools_cached
 from src.server.rag_request import (
     RAGConfigResponse,
     RAGResourceRequest,
     RAGResourcesResponse,
 )
 from src.tools import VolcengineTTS
+from src.tools.decorators import tool_deadline_hits
+from src.tools.mcp import mcp_result_cache, mcp_session_pool
+from src.workers import get_step_broker
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +76,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-graph = build_graph_with_memory()
+# both graphs use one checkpointer, so a thread can switch between them
+checkpointer = MemorySaver()
+graph = build_graph_with_memory(checkpointer)
+fast_graph = build_fast_graph_with_memory(checkpointer)
+
+
+@app.on_event("shutdown")
+async def close_mcp_sessions():
+    """Close the pooled MCP server sessions on shutdown."""
+    await mcp_session_pool.close_all()
+
+
+@app.on_event("shutdown")
+async def close_llm_http_clients():
+    """Close the shared LLM HTTP clients and their connections on shutdown."""
+    await llm_http_clients.aclose()
 
 
 @app.get("/health")
@@ -79,6 +106,27 @@ async def api_health_check():
     return {"status": "healthy", "service": "DeerFlow API"}
 
 
+@app.get("/api/metrics")
+async def metrics():
+    """Cache and pool metrics of this server process."""
+    step_broker = None
+    if Configuration.from_runnable_config().distributed_steps:
+        # queue depths of the step workers, when steps are distributed by default
+        broker = await asyncio.to_thread(get_step_broker)
+        step_broker = await asyncio.to_thread(broker.stats)
+    return {
+        "mcp_session_pool": mcp_session_pool.stats(),
+        "mcp_result_cache": mcp_result_cache.stats(),
+        "llm_http_pool": llm_http_clients.stats(),
+        "llm_response_cache": llm_response_cache.stats(),
+        "early_termination": early_termination_stats,
+        "plan_optimization": plan_optimization_stats,
+        "plan_template_cache": plan_template_cache.stats(),
+        "deadlines": {"steps": step_deadline_hits, "tool_calls": tool_deadline_hits},
+        "step_broker": step_broker,
+    }
+
+
 @app.post("/api/chat/stream")
 async def chat_stream(request: ChatRequest):
     thread_id = request.thread_id
@@ -96,6 +144,24 @@ async def chat_stream(request: ChatRequest):
             request.interrupt_feedback,
             request.mcp_settings,
             request.enable_background_investigation,
+            request.reporter_mode,
+            request.speculative_investigation,
+            request.step_cache_ttl,
+            request.step_cache_similarity,
+            request.max_run_tokens,
+            request.max_run_seconds,
+            request.max_run_tool_calls,
+            request.early_termination,
+            request.resume,
+            request.follow_up,
+            request.step_merge_similarity,
+            request.coordinator_fast_path,
+            request.pipelined_planning,
+            request.fast,
+            request.fast_escalation,
+            request.plan_cache_ttl,
+            request.plan_cache_min_confirmations,
+            request.distributed_steps,
         ),
         media_type="text/event-stream",
     )
@@ -112,6 +178,24 @@ async def _astream_workflow_generator(
     interrupt_feedback: str,
     mcp_settings: dict,
     enable_background_investigation,
+    reporter_mode: str,
+    speculative_investigation: bool,
+    step_cache_ttl: int,
+    step_cache_similarity: float,
+    max_run_tokens: int,
+    max_run_seconds: int,
+    max_run_tool_calls: int,
+    early_termination: bool,
+    resume: bool = False,
+    follow_up: bool = False,
+    step_merge_similarity: float = 0.0,
+    coordinator_fast_path: bool = False,
+    pipelined_planning: bool = False,
+    fast: bool = False,
+    fast_escalation: bool = False,
+    plan_cache_ttl: int = 0,
+    plan_cache_min_confirmations: int = 1,
+    distributed_steps: bool = False,
 ):
     input_ = {
         "messages": messages,
@@ -122,78 +206,135 @@ async def _astream_workflow_generator(
         "auto_accepted_plan": auto_accepted_plan,
         "enable_background_investigation": enable_background_investigation,
     }
+    if follow_up:
+        # keep the plan and observations of the earlier research in the thread
+        del input_["current_plan"], input_["observations"]
     if not auto_accepted_plan and interrupt_feedback:
         resume_msg = f"[{interrupt_feedback}]"
         # add the last message to the resume message
         if messages:
             resume_msg += f" {messages[-1]['content']}"
         input_ = Command(resume=resume_msg)
-    async for agent, _, event_data in graph.astream(
-        input_,
-        config={
-            "thread_id": thread_id,
-            "resources": resources,
-            "max_plan_iterations": max_plan_iterations,
-            "max_step_num": max_step_num,
-            "max_search_results": max_search_results,
-            "mcp_settings": mcp_settings,
-        },
-        stream_mode=["messages", "updates"],
-        subgraphs=True,
-    ):
-        if isinstance(event_data, dict):
-            if "__interrupt__" in event_data:
-                yield _make_event(
-                    "interrupt",
-                    {
-                        "thread_id": thread_id,
-                        "id": event_data["__interrupt__"][0].ns[0],
-                        "role": "assistant",
-                        "content": event_data["__interrupt__"][0].value,
-                        "finish_reason": "interrupt",
-                        "options": [
-                            {"text": "Edit plan", "value": "edit_plan"},
-                            {"text": "Start research", "value": "accepted"},
-                        ],
-                    },
-                )
-            continue
-        message_chunk, message_metadata = cast(
-            tuple[BaseMessage, dict[str, any]], event_data
-        )
-        event_stream_message: dict[str, any] = {
-            "thread_id": thread_id,
-            "agent": agent[0].split(":")[0],
-            "id": message_chunk.id,
-            "role": "assistant",
-            "content": message_chunk.content,
+    elif resume:
+        # continue from the last checkpoint, completed steps are not run again
+        input_ = None
+    # Budgets cover the whole run, a resumed run continues with its budget
+    limits = Configuration.from_runnable_config(
+        {
+            "configurable": {
+                "max_run_tokens": max_run_tokens,
+                "max_run_seconds": max_run_seconds,
+                "max_run_tool_calls": max_run_tool_calls,
+            }
         }
-        if message_chunk.response_metadata.get("finish_reason"):
-            event_stream_message["finish_reason"] = message_chunk.response_metadata.get(
-                "finish_reason"
+    )
+    budget = start_run_budget(
+        thread_id,
+        max_tokens=int(limits.max_run_tokens),
+        max_seconds=float(limits.max_run_seconds),
+        max_tool_calls=int(limits.max_run_tool_calls),
+        reset=input_ is not None and not isinstance(input_, Command),
+    )
+    if budget is not None:
+        budget.start()
+    try:
+        # simple questions are answered in one pass by the fast graph
+        workflow = fast_graph if fast else graph
+        async for agent, stream_mode, event_data in workflow.astream(
+            input_,
+            config={
+                "thread_id": thread_id,
+                "resources": resources,
+                "max_plan_iterations": max_plan_iterations,
+                "max_step_num": max_step_num,
+                "max_search_results": max_search_results,
+                "mcp_settings": mcp_settings,
+                "reporter_mode": reporter_mode,
+                "speculative_investigation": speculative_investigation,
+                "step_cache_ttl": step_cache_ttl,
+                "step_cache_similarity": step_cache_similarity,
+                "max_run_tokens": max_run_tokens,
+                "max_run_seconds": max_run_seconds,
+                "max_run_tool_calls": max_run_tool_calls,
+                "early_termination": early_termination,
+                "step_merge_similarity": step_merge_similarity,
+                "coordinator_fast_path": coordinator_fast_path,
+                "pipelined_planning": pipelined_planning,
+                "fast_escalation": fast_escalation,
+                "plan_cache_ttl": plan_cache_ttl,
+                "plan_cache_min_confirmations": plan_cache_min_confirmations,
+                "distributed_steps": distributed_steps,
+                "callbacks": [budget] if budget is not None else [],
+            },
+            stream_mode=["messages", "updates", "custom"],
+            subgraphs=True,
+        ):
+            if stream_mode == "custom":
+                # Events written by nodes through the stream writer, e.g. report sections
+                event_type = event_data.pop("type", "custom")
+                yield _make_event(event_type, {"thread_id": thread_id, **event_data})
+                continue
+            if isinstance(event_data, dict):
+                if "__interrupt__" in event_data:
+                    yield _make_event(
+                        "interrupt",
+                        {
+                            "thread_id": thread_id,
+                            "id": event_data["__interrupt__"][0].ns[0],
+                            "role": "assistant",
+                            "content": event_data["__interrupt__"][0].value,
+                            "finish_reason": "interrupt",
+                            "options": [
+                                {"text": "Edit plan", "value": "edit_plan"},
+                                {"text": "Start research", "value": "accepted"},
+                            ],
+                        },
+                    )
+                continue
+            message_chunk, message_metadata = cast(
+                tuple[BaseMessage, dict[str, any]], event_data
             )
-        if isinstance(message_chunk, ToolMessage):
-            # Tool Message - Return the result of the tool call
-            event_stream_message["tool_call_id"] = message_chunk.tool_call_id
-            yield _make_event("tool_call_result", event_stream_message)
-        elif isinstance(message_chunk, AIMessageChunk):
-            # AI Message - Raw message tokens
-            if message_chunk.tool_calls:
-                # AI Message - Tool Call
-                event_stream_message["tool_calls"] = message_chunk.tool_calls
-                event_stream_message["tool_call_chunks"] = (
-                    message_chunk.tool_call_chunks
-                )
-                yield _make_event("tool_calls", event_stream_message)
-            elif message_chunk.tool_call_chunks:
-                # AI Message - Tool Call Chunks
-                event_stream_message["tool_call_chunks"] = (
-                    message_chunk.tool_call_chunks
+            event_stream_message: dict[str, any] = {
+                "thread_id": thread_id,
+                "agent": agent[0].split(":")[0],
+                "id": message_chunk.id,
+                "role": "assistant",
+                "content": message_chunk.content,
+            }
+            if message_chunk.response_metadata.get("finish_reason"):
+                event_stream_message["finish_reason"] = (
+                    message_chunk.response_metadata.get("finish_reason")
                 )
-                yield _make_event("tool_call_chunks", event_stream_message)
-            else:
+            if isinstance(message_chunk, ToolMessage):
+                # Tool Message - Return the result of the tool call
+                event_stream_message["tool_call_id"] = message_chunk.tool_call_id
+                yield _make_event("tool_call_result", event_stream_message)
+            elif isinstance(message_chunk, AIMessageChunk):
                 # AI Message - Raw message tokens
+                if message_chunk.tool_calls:
+                    # AI Message - Tool Call
+                    event_stream_message["tool_calls"] = message_chunk.tool_calls
+                    event_stream_message["tool_call_chunks"] = (
+                        message_chunk.tool_call_chunks
+                    )
+                    yield _make_event("tool_calls", event_stream_message)
+                elif message_chunk.tool_call_chunks:
+                    # AI Message - Tool Call Chunks
+                    event_stream_message["tool_call_chunks"] = (
+                        message_chunk.tool_call_chunks
+                    )
+                    yield _make_event("tool_call_chunks", event_stream_message)
+                else:
+                    # AI Message - Raw message tokens
+                    yield _make_event("message_chunk", event_stream_message)
+            elif isinstance(message_chunk, AIMessage) and event_stream_message.get(
+                "finish_reason"
+            ):
+                # AI Message - A complete message written by a node, e.g. a greeting
                 yield _make_event("message_chunk", event_stream_message)
+    finally:
+        if budget is not None:
+            budget.stop()
 
 
 def _make_event(event_type: str, data: dict[str, any]):
@@ -326,14 +467,15 @@ async def mcp_server_metadata(request: MCPServerMetadataRequest):
         if request.timeout_seconds is not None:
             timeout = request.timeout_seconds
 
-        # Load tools from the MCP server using the utility function
-        tools = await load_mcp_tools(
+        # Load tools from the MCP server, served from the metadata cache when possible
+        tools = await load_mcp_tools_cached(
             server_type=request.transport,
             command=request.command,
             args=request.args,
             url=request.url,
             env=request.env,
             timeout_seconds=timeout,
+            refresh=request.refresh,
         )
 
         # Create the response with tools
@@ -369,16 +511,34 @@ async def rag_resources(request: Annotated[RAGResourceRequest, Query()]):
     return RAGResourcesResponse(resources=[])
 
 
+@app.post("/api/admin/clear-plan-cache")
+async def clear_plan_cache():
+    """Drop all cached plan templates, e.g. after the planner prompt changed."""
+    plan_template_cache.clear()
+    logger.info("Plan template cache cleared")
+    return {"status": "success", "message": "Plan template cache cleared"}
+
+
+@app.post("/api/admin/clear-llm-cache")
+async def clear_llm_response_cache():
+    """Drop all cached LLM responses, e.g. after a prompt changed."""
+    await asyncio.to_thread(llm_response_cache.clear)
+    logger.info("LLM response cache cleared")
+    return {"status": "success", "message": "LLM response cache cleared"}
+
+
 @app.post("/api/admin/reload-llm")
 async def reload_llm_configuration():
     """Force reload LLM configuration. Useful for updating API keys without restart."""
     try:
+        from src.agents import clear_agent_cache
         from src.llms.llm import reload_all_llms
         from src.config.loader import clear_config_cache
 
-        # Clear both config and LLM caches
+        # Clear config, LLM and compiled agent caches
         clear_config_cache()
         reload_all_llms()
+        clear_agent_cache()
 
         logger.info("LLM configuration reloaded successfully")
         return {"status": "success", "message": "LLM configuration reloaded"}
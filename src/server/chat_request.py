@@ -58,6 +58,74 @@ class ChatRequest(BaseModel):
     enable_background_investigation: Optional[bool] = Field(
         True, description="Whether to get background investigation before plan"
     )
+    reporter_mode: Optional[str] = Field(
+        "single",
+        description="How the report is written: 'single' pass or 'sectioned' parallel drafts",
+    )
+    speculative_investigation: Optional[bool] = Field(
+        False,
+        description="Whether to run the background investigation concurrently with the coordinator",
+    )
+    step_cache_ttl: Optional[int] = Field(
+        0, description="Seconds a cached research step result can be reused, 0 disables"
+    )
+    step_cache_similarity: Optional[float] = Field(
+        0.0,
+        description="Minimum word overlap for reusing a near-duplicate step, 0 for exact matches only",
+    )
+    max_run_tokens: Optional[int] = Field(
+        0, description="Total token budget of the run, 0 for unlimited"
+    )
+    max_run_seconds: Optional[int] = Field(
+        0, description="Wall-clock time budget of the run in seconds, 0 for unlimited"
+    )
+    max_run_tool_calls: Optional[int] = Field(
+        0, description="Tool call budget of the run, 0 for unlimited"
+    )
+    early_termination: Optional[bool] = Field(
+        False,
+        description="Whether to skip the remaining steps once the findings answer the question",
+    )
+    resume: Optional[bool] = Field(
+        False,
+        description="Whether to resume the thread from its last completed step, e.g. after a failure",
+    )
+    follow_up: Optional[bool] = Field(
+        False,
+        description="Whether to reuse the thread's earlier research for a follow-up question",
+    )
+    step_merge_similarity: Optional[float] = Field(
+        0.0,
+        description="Lexical similarity above which overlapping plan steps are merged, 0 disables merging",
+    )
+    coordinator_fast_path: Optional[bool] = Field(
+        False,
+        description="Whether to handle obvious greetings and research requests without the coordinator LLM",
+    )
+    pipelined_planning: Optional[bool] = Field(
+        False,
+        description="Whether to start the first research step of an auto-accepted plan while the plan is still streaming",
+    )
+    fast: Optional[bool] = Field(
+        False,
+        description="Whether to answer in a single search-augmented pass instead of running the full research, a thread can switch between fast and full runs",
+    )
+    fast_escalation: Optional[bool] = Field(
+        False,
+        description="Whether a fast answer may escalate to the full research when the search results are not enough",
+    )
+    plan_cache_ttl: Optional[int] = Field(
+        0,
+        description="Seconds an accepted plan is reused for queries of the same template, 0 disables the plan cache",
+    )
+    plan_cache_min_confirmations: Optional[int] = Field(
+        1,
+        description="How many times users must accept the same plan of a template before it is reused",
+    )
+    distributed_steps: Optional[bool] = Field(
+        False,
+        description="Whether to run the researcher and coder steps on step workers instead of the API server",
+    )
 
 
 class TTSRequest(BaseModel):
@@ -25,6 +25,9 @@ class MCPServerMetadataRequest(BaseModel):
     timeout_seconds: Optional[int] = Field(
         None, description="Optional custom timeout in seconds for the operation"
     )
+    refresh: Optional[bool] = Field(
+        False, description="Whether to bypass the cached metadata of the server"
+    )
 
 
 class MCPServerMetadataResponse(BaseModel):
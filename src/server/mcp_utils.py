@@ -1,7 +1,10 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import logging
+import os
+import time
 from datetime import timedelta
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -10,8 +13,18 @@ from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from mcp.client.sse import sse_client
 
+from src.tools.mcp import cache_tool_schemas, get_server_key
+
 logger = logging.getLogger(__name__)
 
+# Seconds before cached server metadata is refreshed in the background
+MCP_METADATA_CACHE_TTL = int(os.getenv("MCP_METADATA_CACHE_TTL", "3600"))
+
+# Cached tool lists by server key: (fetch time, tools)
+_metadata_cache: Dict[str, Tuple[float, List]] = {}
+# In-flight lookups by server key, shared by concurrent requests
+_metadata_lookups: Dict[str, asyncio.Task] = {}
+
 
 async def _get_tools_from_client_session(
     client_context_manager: Any, timeout_seconds: int = 10
@@ -102,3 +115,87 @@ async def load_mcp_tools(
             logger.exception(f"Error loading MCP tools: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
         raise
+
+
+def _lookup_metadata(key: str, server_config: Dict[str, Any], timeout_seconds: int):
+    """Start a lookup for the server, or join the one already in flight."""
+    if lookup := _metadata_lookups.get(key):
+        return lookup
+
+    async def lookup_and_cache() -> List:
+        try:
+            tools = await load_mcp_tools(
+                server_type=server_config["transport"],
+                command=server_config.get("command"),
+                args=server_config.get("args"),
+                url=server_config.get("url"),
+                env=server_config.get("env"),
+                timeout_seconds=timeout_seconds,
+            )
+            _metadata_cache[key] = (time.monotonic(), tools)
+            # research steps can build tool stubs without starting the server
+            cache_tool_schemas(server_config, tools)
+            return tools
+        finally:
+            _metadata_lookups.pop(key, None)
+
+    lookup = asyncio.create_task(lookup_and_cache())
+    _metadata_lookups[key] = lookup
+    return lookup
+
+
+def _log_background_refresh_error(task: asyncio.Task) -> None:
+    if not task.cancelled() and (error := task.exception()):
+        logger.warning(f"Background refresh of MCP server metadata failed: {error}")
+
+
+async def load_mcp_tools_cached(
+    server_type: str,
+    command: Optional[str] = None,
+    args: Optional[List[str]] = None,
+    url: Optional[str] = None,
+    env: Optional[Dict[str, str]] = None,
+    timeout_seconds: int = 60,
+    refresh: bool = False,
+) -> List:
+    """
+    Load tools from an MCP server through the metadata cache.
+
+    Cached tools are returned immediately. Once they are older than
+    `MCP_METADATA_CACHE_TTL` they are still returned while a refresh runs in
+    the background (stale-while-revalidate). Concurrent lookups of the same
+    server share one request to the server.
+
+    Args:
+        server_type: The type of MCP server connection (stdio or sse)
+        command: The command to execute (for stdio type)
+        args: Command arguments (for stdio type)
+        url: The URL of the SSE server (for sse type)
+        env: Environment variables
+        timeout_seconds: Timeout in seconds for a lookup
+        refresh: If True, bypass the cache and fetch the tools again
+
+    Returns:
+        List of available tools from the MCP server
+
+    Raises:
+        HTTPException: If there's an error loading the tools
+    """
+    server_config = {
+        "transport": server_type,
+        "command": command,
+        "args": args,
+        "url": url,
+        "env": env,
+    }
+    key = get_server_key(server_config)
+    cached = _metadata_cache.get(key)
+    if cached and not refresh:
+        fetched_at, tools = cached
+        if time.monotonic() - fetched_at > MCP_METADATA_CACHE_TTL:
+            logger.info("Serving stale MCP server metadata while refreshing")
+            _lookup_metadata(key, server_config, timeout_seconds).add_done_callback(
+                _log_background_refresh_error
+            )
+        return tools
+    return await asyncio.shield(_lookup_metadata(key, server_config, timeout_seconds))
@@ -1,10 +1,13 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import logging
 import functools
 from typing import Any, Callable, Type, TypeVar
 
+from langchain_core.tools import BaseTool, StructuredTool
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
@@ -79,3 +82,61 @@ def create_logged_tool(base_tool_class: Type[T]) -> Type[T]:
     # Set a more descriptive name for the class
     LoggedTool.__name__ = f"Logged{base_tool_class.__name__}"
     return LoggedTool
+
+
+# Number of tool calls stopped by their deadline, by tool name
+tool_deadline_hits: dict[str, int] = {}
+
+
+def with_deadline(tool: BaseTool, seconds: float) -> BaseTool:
+    """
+    Wrap a tool so that each call is cancelled after `seconds`.
+
+    A call that runs out of time returns a message telling the agent so
+    instead of raising, and the agent goes on with the results it has.
+    Synchronous tools run in a worker thread that cannot be interrupted, only
+    the wait for their result is cancelled.
+
+    Args:
+        tool: The tool to wrap
+        seconds: Maximum duration of a single call
+
+    Returns:
+        A tool with the same name, description and arguments
+    """
+    content_and_artifact = tool.response_format == "content_and_artifact"
+
+    async def call_with_deadline(**kwargs: Any) -> Any:
+        tool_call = {
+            "name": tool.name,
+            "args": kwargs,
+            "id": "deadline",
+            "type": "tool_call",
+        }
+        try:
+            # the wrapper reports the call to the callbacks, not the wrapped tool
+            message = await asyncio.wait_for(
+                tool.ainvoke(tool_call, config={"callbacks": []}), seconds
+            )
+        except asyncio.TimeoutError:
+            tool_deadline_hits[tool.name] = tool_deadline_hits.get(tool.name, 0) + 1
+            logger.warning(
+                f"Tool {tool.name} call timed out after {seconds}s: {kwargs}"
+            )
+            content = (
+                f"Tool call timed out after {seconds}s and was cancelled. "
+                "Continue with the information gathered so far or try other arguments."
+            )
+            return (content, None) if content_and_artifact else content
+        if content_and_artifact:
+            return message.content, message.artifact
+        return message.content
+
+    return StructuredTool(
+        name=tool.name,
+        description=tool.description,
+        args_schema=tool.args_schema or tool.tool_call_schema,
+        coroutine=call_with_deadline,
+        response_format=tool.response_format,
+        return_direct=tool.return_direct,
+    )
@@ -0,0 +1,26 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from .pool import (
+    MCPSession,
+    MCPSessionPool,
+    get_server_key,
+    mcp_session_pool,
+    normalize_server_config,
+)
+from .result_cache import get_result_cache_ttl, mcp_result_cache, with_result_cache
+from .tools import cache_tool_schemas, get_cached_tool_schemas, get_mcp_tools
+
+__all__ = [
+    "cache_tool_schemas",
+    "get_cached_tool_schemas",
+    "get_mcp_tools",
+    "get_result_cache_ttl",
+    "mcp_result_cache",
+    "with_result_cache",
+    "MCPSession",
+    "MCPSessionPool",
+    "get_server_key",
+    "mcp_session_pool",
+    "normalize_server_config",
+]
@@ -0,0 +1,345 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, suppress
+from typing import Any, AsyncIterator, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from mcp import ClientSession
+
+logger = logging.getLogger(__name__)
+
+# Keys of an MCP server config that define the connection
+SERVER_CONNECTION_KEYS = ("transport", "command", "args", "url", "env")
+
+
+def normalize_server_config(server_config: dict) -> dict:
+    """Return only the connection fields of an MCP server config."""
+    return {
+        k: copy.deepcopy(server_config[k])
+        for k in SERVER_CONNECTION_KEYS
+        if server_config.get(k) is not None
+    }
+
+
+def get_server_key(server_config: dict) -> str:
+    """Compute a stable key for an MCP server from its connection fields."""
+    normalized = json.dumps(
+        normalize_server_config(server_config), sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class MCPSession:
+    """
+    A long-lived connection to one MCP server.
+
+    The underlying client is entered and exited by a dedicated background
+    task, so the session can be shared by steps running in other tasks.
+    """
+
+    def __init__(self, key: str, server_name: str, server_config: dict):
+        self.key = key
+        self.server_name = server_name
+        self.server_config = normalize_server_config(server_config)
+        self.session: Optional[ClientSession] = None
+        self.tools: list[BaseTool] = []
+        self.in_use = 0
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: Optional[BaseException] = None
+
+    async def start(self, timeout_seconds: float) -> None:
+        """Connect to the server and load its tools."""
+        self._loop = asyncio.get_running_loop()
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout_seconds)
+        except asyncio.TimeoutError:
+            await self.close()
+            raise TimeoutError(
+                f"MCP server '{self.server_name}' did not start within {timeout_seconds}s"
+            )
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self) -> None:
+        try:
+            connections = {self.server_name: copy.deepcopy(self.server_config)}
+            async with MultiServerMCPClient(connections) as client:
+                self.session = client.sessions[self.server_name]
+                self.tools = client.get_tools()
+                self._ready.set()
+                await self._closing.wait()
+        except Exception as e:
+            logger.warning(f"MCP server '{self.server_name}' session failed: {e}")
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def is_alive(self) -> bool:
+        """Whether the session is connected and usable from the current event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        return (
+            self.session is not None
+            and self._task is not None
+            and not self._task.done()
+            and self._loop is loop
+        )
+
+    async def ping(self, timeout_seconds: float) -> bool:
+        """Check that the server still responds."""
+        if not self.is_alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout_seconds)
+        except Exception as e:
+            logger.warning(f"MCP server '{self.server_name}' health check failed: {e}")
+            return False
+        self.last_checked = time.monotonic()
+        return True
+
+    def close_soon(self) -> None:
+        """
+        Ask the background task to close the connection from any thread.
+
+        Used when the session's event loop is no longer the pool's; the
+        server process is stopped once that loop runs the task again.
+        """
+        if self._loop is None or self._task is None or self._task.done():
+            return
+        with suppress(RuntimeError):
+            self._loop.call_soon_threadsafe(self._closing.set)
+
+    async def close(self) -> None:
+        """Close the connection and stop the background task."""
+        self._closing.set()
+        if self._task is not None and not self._task.done():
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), 5)
+            except (asyncio.TimeoutError, Exception):
+                self._task.cancel()
+                with suppress(asyncio.CancelledError, Exception):
+                    await self._task
+
+
+class MCPSessionPool:
+    """
+    A process-wide pool of MCP server sessions keyed by normalized server config.
+
+    Sessions are reused across steps and threads, health-checked before reuse,
+    evicted after being idle for `idle_timeout_seconds`, even when no step
+    runs, and capped at `max_sessions` open connections.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 8,
+        idle_timeout_seconds: float = 600,
+        health_check_interval_seconds: float = 60,
+        start_timeout_seconds: float = 60,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self.start_timeout_seconds = start_timeout_seconds
+        self._sessions: dict[str, MCPSession] = {}
+        self._starting: dict[str, asyncio.Future] = {}
+        # slots taken by sessions that are still starting
+        self._reserved = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reaper: Optional[asyncio.Task] = None
+
+    def _bind_to_running_loop(self) -> asyncio.Condition:
+        # Sessions cannot be used from another event loop, e.g. between
+        # asyncio.run() calls, so they are closed in the loop that opened them
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._sessions:
+                logger.info("Event loop changed, closing pooled MCP sessions")
+            for session in self._sessions.values():
+                session.close_soon()
+            self._sessions.clear()
+            self._starting.clear()
+            self._reserved = 0
+            self._condition = asyncio.Condition()
+            self._reaper = None
+            self._loop = loop
+        return self._condition
+
+    def _start_reaper(self) -> None:
+        # idle sessions are also evicted when no step acquires a session
+        if self._reaper is None or self._reaper.done():
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self) -> None:
+        while self._sessions:
+            await asyncio.sleep(self.idle_timeout_seconds / 2)
+            await self.evict_idle()
+
+    async def _is_healthy(self, session: MCPSession) -> bool:
+        if not session.is_alive:
+            return False
+        if time.monotonic() - session.last_checked < self.health_check_interval_seconds:
+            return True
+        return await session.ping(timeout_seconds=5)
+
+    async def _remove(self, session: MCPSession) -> None:
+        if self._sessions.get(session.key) is session:
+            del self._sessions[session.key]
+        await session.close()
+
+    async def evict_idle(self) -> int:
+        """Close sessions that have not been used for `idle_timeout_seconds`."""
+        now = time.monotonic()
+        idle = [
+            s
+            for s in self._sessions.values()
+            if s.in_use == 0 and now - s.last_used > self.idle_timeout_seconds
+        ]
+        for session in idle:
+            logger.info(f"Evicting idle MCP session '{session.server_name}'")
+            await self._remove(session)
+        return len(idle)
+
+    async def _reserve_slot(self, condition: asyncio.Condition) -> None:
+        # the slot is taken while holding the condition, so sessions started
+        # at the same time cannot exceed max_sessions
+        async with condition:
+            while len(self._sessions) + self._reserved >= self.max_sessions:
+                idle = [s for s in self._sessions.values() if s.in_use == 0]
+                if idle:
+                    lru = min(idle, key=lambda s: s.last_used)
+                    logger.info(f"MCP pool full, evicting '{lru.server_name}'")
+                    await self._remove(lru)
+                    continue
+                await asyncio.wait_for(condition.wait(), self.start_timeout_seconds)
+            self._reserved += 1
+
+    async def _release_slot(self, condition: asyncio.Condition) -> None:
+        async with condition:
+            self._reserved -= 1
+            condition.notify_all()
+
+    async def _start_session(
+        self, key: str, server_name: str, server_config: dict
+    ) -> MCPSession:
+        condition = self._bind_to_running_loop()
+        if starting := self._starting.get(key):
+            session = await asyncio.shield(starting)
+            session.in_use += 1
+            return session
+
+        future = asyncio.get_running_loop().create_future()
+        self._starting[key] = future
+        try:
+            await self._reserve_slot(condition)
+            try:
+                start = time.perf_counter()
+                session = MCPSession(key, server_name, server_config)
+                await session.start(self.start_timeout_seconds)
+                logger.info(
+                    f"Started MCP session '{server_name}' in "
+                    f"{(time.perf_counter() - start) * 1000:.1f} ms"
+                )
+                # in use before others see it, so it is not evicted as idle
+                session.in_use += 1
+                self._sessions[key] = session
+            finally:
+                # a started session holds its slot in _sessions from here on
+                await asyncio.shield(self._release_slot(condition))
+            self._start_reaper()
+            future.set_result(session)
+            return session
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # the error is re-raised here, waiters retrieve it from the future
+            future.exception()
+            raise
+        finally:
+            self._starting.pop(key, None)
+
+    async def acquire(self, server_name: str, server_config: dict) -> MCPSession:
+        """Get a healthy session for the server, starting one if needed."""
+        self._bind_to_running_loop()
+        await self.evict_idle()
+        key = get_server_key(server_config)
+        while True:
+            session = self._sessions.get(key)
+            if session is not None and not await self._is_healthy(session):
+                logger.info(f"Replacing unhealthy MCP session '{session.server_name}'")
+                await self._remove(session)
+                session = None
+            if session is None:
+                # counts the session as in use for this caller
+                session = await self._start_session(key, server_name, server_config)
+            else:
+                session.in_use += 1
+            session.last_used = time.monotonic()
+            if session.is_alive:
+                return session
+            # evicted by a concurrent start before this caller got it
+            await self.release(session)
+
+    async def release(self, session: MCPSession) -> None:
+        """Return a session acquired with `acquire` to the pool."""
+        session.in_use = max(session.in_use - 1, 0)
+        session.last_used = time.monotonic()
+        if self._condition is not None and self._loop is asyncio.get_running_loop():
+            async with self._condition:
+                self._condition.notify_all()
+
+    @asynccontextmanager
+    async def session(
+        self, server_name: str, server_config: dict
+    ) -> AsyncIterator[MCPSession]:
+        """Acquire a pooled session for the duration of the context."""
+        session = await self.acquire(server_name, server_config)
+        try:
+            yield session
+        finally:
+            await self.release(session)
+
+    async def close_all(self) -> None:
+        """Close every pooled session."""
+        for session in list(self._sessions.values()):
+            await self._remove(session)
+        if self._reaper is not None and self._loop is asyncio.get_running_loop():
+            self._reaper.cancel()
+            self._reaper = None
+
+    def stats(self) -> dict[str, Any]:
+        """Return the current pool utilization."""
+        return {
+            "sessions": len(self._sessions),
+            "in_use": sum(s.in_use > 0 for s in self._sessions.values()),
+            "max_sessions": self.max_sessions,
+        }
+
+
+mcp_session_pool = MCPSessionPool(
+    max_sessions=int(os.getenv("MCP_POOL_MAX_SESSIONS", "8")),
+    idle_timeout_seconds=float(os.getenv("MCP_POOL_IDLE_TIMEOUT", "600")),
+)
@@ -0,0 +1,96 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Optional
+
+from langchain_core.tools import BaseTool
+
+from src.utils.cache import TTLCache
+
+from .pool import get_server_key
+from .tools import TOOL_CACHE_TTL_SECONDS, get_schema_hash
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RESULT_CACHE_TTL = 300
+
+mcp_result_cache = TTLCache(
+    max_entries=int(os.getenv("MCP_RESULT_CACHE_MAX_ENTRIES", "1024")),
+    max_bytes=int(os.getenv("MCP_RESULT_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+
+# Cached-call wrappers by (server key, tool name, schema hash, ttl), reused so
+# agents can be cached
+_cached_tools = TTLCache(
+    max_entries=int(os.getenv("MCP_TOOL_CACHE_MAX_ENTRIES", "1024"))
+)
+
+
+def get_result_cache_ttl(
+    cache_config: Optional[dict], tool_name: str
+) -> Optional[float]:
+    """
+    Return the result cache TTL of a tool, or None if its results are not cached.
+
+    Caching is opt-in per server with a `result_cache` entry in `mcp_settings`,
+    e.g.::
+
+        "result_cache": {"ttl_seconds": 300, "tools": ["get_github_trending_repositories"]}
+
+    `tools` can also map tool names to their own TTL in seconds. Without
+    `tools`, every tool of the server is cached.
+    """
+    if not cache_config:
+        return None
+    ttl = cache_config.get("ttl_seconds", DEFAULT_RESULT_CACHE_TTL)
+    tools = cache_config.get("tools")
+    if tools is None:
+        return ttl
+    if isinstance(tools, dict):
+        return tools.get(tool_name)
+    return ttl if tool_name in tools else None
+
+
+def with_result_cache(
+    tool: BaseTool, server_config: dict, ttl_seconds: float
+) -> BaseTool:
+    """
+    Wrap an MCP tool so identical calls are answered from the result cache.
+
+    Args:
+        tool: An async MCP tool
+        server_config: Config of the server providing the tool
+        ttl_seconds: How long a result is reused
+
+    Returns:
+        A tool with the same name, description and schema
+    """
+    server_key = get_server_key(server_config)
+    schema_hash = get_schema_hash(tool.description, tool.args)
+    wrapper_key = (server_key, tool.name, schema_hash, ttl_seconds)
+    if cached_tool := _cached_tools.get(wrapper_key):
+        _cached_tools.set(wrapper_key, cached_tool, TOOL_CACHE_TTL_SECONDS)
+        return cached_tool
+    coroutine = tool.coroutine
+
+    async def call_tool_cached(**arguments: Any):
+        cache_key = hashlib.sha256(
+            json.dumps(
+                [server_key, tool.name, arguments], sort_keys=True, ensure_ascii=False
+            ).encode("utf-8")
+        ).hexdigest()
+        if (result := mcp_result_cache.get(cache_key)) is not None:
+            logger.info(f"MCP tool '{tool.name}' result served from cache")
+            return result
+        # failed calls raise and are not cached
+        result = await coroutine(**arguments)
+        mcp_result_cache.set(cache_key, result, ttl_seconds)
+        return result
+
+    cached_tool = tool.model_copy(update={"coroutine": call_tool_cached})
+    _cached_tools.set(wrapper_key, cached_tool, TOOL_CACHE_TTL_SECONDS)
+    return cached_tool
@@ -0,0 +1,177 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Any
+
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
+
+from src.utils.cache import TTLCache
+
+from .pool import MCPSessionPool, get_server_key, mcp_session_pool
+
+logger = logging.getLogger(__name__)
+
+# Cached tool schemas per server key: tool name -> (description, input schema)
+_tool_schema_cache: dict[str, dict[str, tuple[str, dict]]] = {}
+# Stub tools per (server key, tool name, schema hash), reused so agents can be
+# cached; stubs of changed schemas are no longer looked up and age out
+_stub_tool_cache = TTLCache(
+    max_entries=int(os.getenv("MCP_TOOL_CACHE_MAX_ENTRIES", "1024"))
+)
+# Servers that failed to start are not contacted again until this time
+_failed_servers: dict[str, float] = {}
+
+FAILED_SERVER_RETRY_SECONDS = 60
+TOOL_CACHE_TTL_SECONDS = 24 * 3600
+
+
+def get_schema_hash(description: str, input_schema: Any) -> str:
+    """Return a hash of a tool's description and input schema."""
+    return hashlib.sha256(
+        json.dumps(
+            [description, input_schema], sort_keys=True, ensure_ascii=False, default=str
+        ).encode("utf-8")
+    ).hexdigest()
+
+
+def cache_tool_schemas(server_config: dict, tools: list[Any]) -> None:
+    """
+    Remember the tool schemas of an MCP server.
+
+    Args:
+        server_config: The MCP server config
+        tools: LangChain tools loaded from the server or MCP `Tool` objects
+    """
+    schemas = {}
+    for tool in tools:
+        input_schema = getattr(tool, "inputSchema", None)
+        if input_schema is None:
+            input_schema = getattr(tool, "args_schema", None)
+        if not isinstance(input_schema, dict):
+            input_schema = {"type": "object", "properties": {}}
+        schemas[tool.name] = (tool.description or "", input_schema)
+    _tool_schema_cache[get_server_key(server_config)] = schemas
+
+
+def get_cached_tool_schemas(server_config: dict) -> dict[str, tuple[str, dict]]:
+    """Return the cached tool schemas of an MCP server, if any."""
+    return _tool_schema_cache.get(get_server_key(server_config), {})
+
+
+def _create_stub_tool(
+    pool: MCPSessionPool,
+    server_name: str,
+    server_config: dict,
+    tool_name: str,
+    description: str,
+    input_schema: dict,
+) -> BaseTool:
+    """Create a tool that only connects to its MCP server when it is called."""
+
+    async def call_tool(**arguments: Any):
+        async with pool.session(server_name, server_config) as session:
+            cache_tool_schemas(server_config, session.tools)
+            for tool in session.tools:
+                if tool.name == tool_name:
+                    return await tool.coroutine(**arguments)
+        raise ToolException(
+            f"Tool '{tool_name}' is no longer provided by MCP server '{server_name}'"
+        )
+
+    return StructuredTool(
+        name=tool_name,
+        description=description,
+        args_schema=input_schema,
+        coroutine=call_tool,
+        response_format="content_and_artifact",
+    )
+
+
+async def _load_server_schemas(
+    pool: MCPSessionPool, server_name: str, server_config: dict, timeout_seconds: float
+) -> dict[str, tuple[str, dict]]:
+    key = get_server_key(server_config)
+    if schemas := _tool_schema_cache.get(key):
+        return schemas
+    if _failed_servers.get(key, 0) > time.monotonic():
+        logger.warning(f"Skipping MCP server '{server_name}' after a recent failure")
+        return {}
+
+    start = time.perf_counter()
+    try:
+        session = await asyncio.wait_for(
+            pool.acquire(server_name, server_config), timeout_seconds
+        )
+    except Exception as e:
+        logger.error(f"Failed to start MCP server '{server_name}': {e!r}")
+        _failed_servers[key] = time.monotonic() + FAILED_SERVER_RETRY_SECONDS
+        return {}
+    try:
+        cache_tool_schemas(server_config, session.tools)
+    finally:
+        await pool.release(session)
+    _failed_servers.pop(key, None)
+    logger.info(
+        f"Loaded tool schemas of MCP server '{server_name}' in "
+        f"{(time.perf_counter() - start) * 1000:.1f} ms"
+    )
+    return _tool_schema_cache[key]
+
+
+async def get_mcp_tools(
+    mcp_servers: dict[str, dict],
+    timeout_seconds: float = 30,
+    pool: MCPSessionPool = mcp_session_pool,
+) -> dict[str, list[BaseTool]]:
+    """
+    Get the tools of several MCP servers without waiting for every server.
+
+    Servers whose tool schemas are cached are not contacted at all; their
+    tools are stubs that acquire a pooled session on first call. Uncached
+    servers are started concurrently, and a server that fails or does not
+    start within `timeout_seconds` is skipped.
+
+    Args:
+        mcp_servers: Server configs by server name
+        timeout_seconds: Per-server timeout for loading tool schemas
+        pool: The session pool used by the tools
+
+    Returns:
+        Tools by server name
+    """
+    names = list(mcp_servers)
+    results = await asyncio.gather(
+        *(
+            _load_server_schemas(pool, name, mcp_servers[name], timeout_seconds)
+            for name in names
+        )
+    )
+
+    tools_by_server = {}
+    for server_name, schemas in zip(names, results):
+        server_config = mcp_servers[server_name]
+        key = get_server_key(server_config)
+        tools = []
+        for tool_name, (description, input_schema) in schemas.items():
+            stub_key = (key, tool_name, get_schema_hash(description, input_schema))
+            stub_tool = _stub_tool_cache.get(stub_key)
+            if stub_tool is None:
+                stub_tool = _create_stub_tool(
+                    pool,
+                    server_name,
+                    server_config,
+                    tool_name,
+                    description,
+                    input_schema,
+                )
+            # refresh the expiry of stubs in use
+            _stub_tool_cache.set(stub_key, stub_tool, TOOL_CACHE_TTL_SECONDS)
+            tools.append(stub_tool)
+        tools_by_server[server_name] = tools
+    return tools_by_server
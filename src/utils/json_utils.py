@@ -37,3 +37,79 @@ def repair_json_output(content: str) -> str:
         except Exception as e:
             logger.warning(f"JSON repair failed: {e}")
     return content
+
+
+class PlanStepParser:
+    """
+    Incrementally parse a streamed plan JSON and return each object of its
+    top-level "steps" array as soon as the object is complete.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_key = None
+        self._steps_depth = None
+        self._step_start = None
+
+    def feed(self, text: str) -> list[dict]:
+        """
+        Add the next chunk of the response.
+
+        Args:
+            text: The streamed text chunk
+
+        Returns:
+            The steps completed by this chunk
+        """
+        self._buffer += text
+        steps = []
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = self._buffer[
+                            self._string_start + 1 : self._pos
+                        ]
+            elif char == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif char in "{[":
+                if (
+                    char == "["
+                    and self._depth == 1
+                    and self._last_key == "steps"
+                    and self._steps_depth is None
+                ):
+                    self._steps_depth = self._depth + 1
+                elif char == "{" and self._depth == self._steps_depth:
+                    self._step_start = self._pos
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if (
+                    char == "}"
+                    and self._depth == self._steps_depth
+                    and self._step_start is not None
+                ):
+                    try:
+                        steps.append(
+                            json.loads(self._buffer[self._step_start : self._pos + 1])
+                        )
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Failed to parse streamed plan step: {e}")
+                    self._step_start = None
+                elif char == "]" and self._depth + 1 == self._steps_depth:
+                    self._steps_depth = -1
+            self._pos += 1
+        return steps
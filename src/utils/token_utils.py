@@ -0,0 +1,57 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+import re
+from typing import Any
+
+# CJK characters are roughly one token each, everything else ~4 characters/token
+_CJK_PATTERN = re.compile("[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens in a piece of text without a tokenizer.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        The approximate token count
+    """
+    if not text:
+        return 0
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    return cjk_count + (len(text) - cjk_count + 3) // 4
+
+
+def get_message_content(message: Any) -> str:
+    """Return the textual content of a message object or message dict."""
+    content = (
+        message.get("content", "")
+        if isinstance(message, dict)
+        else getattr(message, "content", "")
+    )
+    if isinstance(content, list):
+        return "\n".join(
+            (
+                item.get("text") or json.dumps(item, ensure_ascii=False)
+                if isinstance(item, dict)
+                else str(item)
+            )
+            for item in content
+        )
+    return content if isinstance(content, str) else str(content)
+
+
+def count_message_tokens(messages: list) -> int:
+    """
+    Estimate the number of tokens in a list of messages.
+
+    Args:
+        messages: Messages as LangChain message objects or role/content dicts
+
+    Returns:
+        The approximate token count of all message contents
+    """
+    return sum(estimate_tokens(get_message_content(message)) for message in messages)
@@ -0,0 +1,11 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from .broker import StepBroker, StepTask, StepTaskError, get_step_broker
+
+__all__ = [
+    "StepBroker",
+    "StepTask",
+    "StepTaskError",
+    "get_step_broker",
+]
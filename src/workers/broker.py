@@ -0,0 +1,314 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional, Sequence
+from uuid import uuid4
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS step_tasks (
+    id TEXT PRIMARY KEY,
+    agent_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    heartbeat_at REAL
+);
+CREATE INDEX IF NOT EXISTS step_tasks_status ON step_tasks (status, created_at);
+"""
+
+
+class StepTaskError(Exception):
+    """Raised to the owning run when a dispatched step failed or was lost."""
+
+
+@dataclass
+class StepTask:
+    """An agent step in the broker queue."""
+
+    id: str
+    agent_type: str
+    payload: dict
+    status: str
+    attempts: int
+    worker_id: Optional[str] = None
+    result: Optional[dict] = None
+    error: Optional[str] = None
+
+
+class StepBroker:
+    """
+    A queue of agent steps in a SQLite database shared by the API servers and
+    the step workers.
+
+    The run that owns a step enqueues it and polls for its result, workers
+    claim queued steps and keep a lease on them with heartbeats. A step whose
+    worker stopped sending heartbeats is handed to another worker, up to
+    `max_attempts` times. Finished steps that no run collected are removed
+    after `retention_seconds`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = 120,
+        max_attempts: int = 3,
+        retention_seconds: float = 86400,
+    ):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retention_seconds = retention_seconds
+        self._initialized = False
+        self._init_lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        with self._init_lock:
+            if not self._initialized:
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.executescript(_SCHEMA)
+                self._initialized = True
+        return conn
+
+    @contextmanager
+    def _connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connect()
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _to_task(row: sqlite3.Row) -> StepTask:
+        return StepTask(
+            id=row["id"],
+            agent_type=row["agent_type"],
+            payload=json.loads(row["payload"]),
+            status=row["status"],
+            attempts=row["attempts"],
+            worker_id=row["worker_id"],
+            result=json.loads(row["result"]) if row["result"] else None,
+            error=row["error"],
+        )
+
+    def enqueue(self, agent_type: str, payload: dict) -> str:
+        """Queue a step for the workers and return its task id."""
+        task_id = str(uuid4())
+        self.purge()
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO step_tasks (id, agent_type, payload, status, created_at) "
+                "VALUES (?, ?, ?, 'queued', ?)",
+                (
+                    task_id,
+                    agent_type,
+                    json.dumps(payload, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+        return task_id
+
+    def claim(
+        self, worker_id: str, agent_types: Optional[Sequence[str]] = None
+    ) -> Optional[StepTask]:
+        """
+        Take the oldest queued step, or a step whose worker lost its lease.
+
+        Args:
+            worker_id: The claiming worker
+            agent_types: The agent types the worker runs, all if None
+
+        Returns:
+            The claimed step, or None if there is nothing to do
+        """
+        agent_filter = ""
+        params: list[Any] = []
+        if agent_types:
+            agent_filter = f"AND agent_type IN ({', '.join('?' * len(agent_types))})"
+            params = list(agent_types)
+        with self._connection() as conn:
+            while True:
+                now = time.time()
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT * FROM step_tasks WHERE (status = 'queued' OR "
+                    f"(status = 'running' AND heartbeat_at < ?)) {agent_filter} "
+                    "ORDER BY created_at LIMIT 1",
+                    [now - self.lease_seconds, *params],
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                if row["attempts"] >= self.max_attempts:
+                    conn.execute(
+                        "UPDATE step_tasks SET status = 'failed', error = ? WHERE id = ?",
+                        (
+                            f"Step workers were lost {row['attempts']} times",
+                            row["id"],
+                        ),
+                    )
+                    conn.execute("COMMIT")
+                    continue
+                conn.execute(
+                    "UPDATE step_tasks SET status = 'running', worker_id = ?, "
+                    "attempts = attempts + 1, heartbeat_at = ? WHERE id = ?",
+                    (worker_id, now, row["id"]),
+                )
+                conn.execute("COMMIT")
+                if row["status"] == "running":
+                    logger.warning(
+                        f"Reclaimed step task {row['id']} from lost worker "
+                        f"{row['worker_id']}"
+                    )
+                task = self._to_task(row)
+                task.status = "running"
+                task.worker_id = worker_id
+                task.attempts += 1
+                return task
+
+    def _update_running(
+        self, task_id: str, worker_id: str, sql: str, params: tuple
+    ) -> bool:
+        with self._connection() as conn:
+            cursor = conn.execute(
+                f"{sql} WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (*params, task_id, worker_id),
+            )
+            return cursor.rowcount == 1
+
+    def heartbeat(self, task_id: str, worker_id: str) -> bool:
+        """Renew the lease of a running step, False if the worker lost it."""
+        return self._update_running(
+            task_id, worker_id, "UPDATE step_tasks SET heartbeat_at = ?", (time.time(),)
+        )
+
+    def complete(self, task_id: str, worker_id: str, result: dict) -> bool:
+        """Store the result of a step for its owning run."""
+        return self._update_running(
+            task_id,
+            worker_id,
+            "UPDATE step_tasks SET status = 'done', result = ?",
+            (json.dumps(result, ensure_ascii=False),),
+        )
+
+    def fail(self, task_id: str, worker_id: str, error: str) -> bool:
+        """Report a step that could not be executed to its owning run."""
+        return self._update_running(
+            task_id,
+            worker_id,
+            "UPDATE step_tasks SET status = 'failed', error = ?",
+            (error,),
+        )
+
+    def get(self, task_id: str) -> Optional[StepTask]:
+        """Return a step task, or None if it does not exist."""
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM step_tasks WHERE id = ?", (task_id,)
+            ).fetchone()
+        return self._to_task(row) if row is not None else None
+
+    def delete(self, task_id: str) -> None:
+        """Remove a step task, e.g. when its owning run no longer waits for it."""
+        with self._connection() as conn:
+            conn.execute("DELETE FROM step_tasks WHERE id = ?", (task_id,))
+
+    def purge(self) -> int:
+        """Remove finished steps older than the retention, return their number."""
+        with self._connection() as conn:
+            cursor = conn.execute(
+                "DELETE FROM step_tasks WHERE status IN ('done', 'failed') "
+                "AND created_at < ?",
+                (time.time() - self.retention_seconds,),
+            )
+        if cursor.rowcount:
+            logger.info(f"Purged {cursor.rowcount} finished step tasks")
+        return cursor.rowcount
+
+    async def wait_for_result(
+        self,
+        task_id: str,
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.5,
+    ) -> dict:
+        """
+        Wait until a worker finished a step and remove it from the queue.
+
+        Args:
+            task_id: The step task
+            timeout: Maximum seconds to wait, None to wait forever
+            poll_interval: Seconds between two checks
+
+        Returns:
+            The result reported by the worker
+
+        Raises:
+            StepTaskError: If the step failed or was removed
+            TimeoutError: If the step did not finish in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while True:
+                task = await asyncio.to_thread(self.get, task_id)
+                if task is None:
+                    raise StepTaskError(f"Step task {task_id} no longer exists")
+                if task.status in ("done", "failed"):
+                    await asyncio.to_thread(self.delete, task_id)
+                    if task.status == "failed":
+                        raise StepTaskError(task.error or "Step failed in the worker")
+                    return task.result
+                if deadline is not None and time.monotonic() >= deadline:
+                    await asyncio.to_thread(self.delete, task_id)
+                    raise TimeoutError(
+                        f"Step task {task_id} timed out after {timeout}s"
+                    )
+                await asyncio.sleep(poll_interval)
+        except asyncio.CancelledError:
+            # the owning run was cancelled, nobody will collect the result; the
+            # worker's result is discarded as the task no longer exists
+            await asyncio.shield(asyncio.to_thread(self.delete, task_id))
+            raise
+
+    def stats(self) -> dict[str, int]:
+        """Return the number of step tasks by status."""
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) FROM step_tasks GROUP BY status"
+            ).fetchall()
+        return {"queued": 0, "running": 0, **{status: count for status, count in rows}}
+
+
+_step_broker: Optional[StepBroker] = None
+_step_broker_lock = threading.Lock()
+
+
+def get_step_broker() -> StepBroker:
+    """Return the process-wide broker configured by the STEP_BROKER_* variables."""
+    global _step_broker
+    with _step_broker_lock:
+        if _step_broker is None:
+            _step_broker = StepBroker(
+                os.getenv("STEP_BROKER_PATH", "step_broker.sqlite3"),
+                lease_seconds=float(os.getenv("STEP_BROKER_LEASE_SECONDS", "120")),
+                max_attempts=int(os.getenv("STEP_BROKER_MAX_ATTEMPTS", "3")),
+                retention_seconds=float(
+                    os.getenv("STEP_BROKER_RETENTION_SECONDS", "86400")
+                ),
+            )
+        return _step_broker
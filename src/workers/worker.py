@@ -0,0 +1,159 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Optional, Sequence
+from uuid import uuid4
+
+from langchain_core.runnables import RunnableLambda
+
+from src.graph.budget import start_run_budget
+from src.graph.nodes import run_agent_step
+from src.prompts.planner_model import Plan
+from src.rag import Resource
+
+from .broker import StepBroker, StepTask
+
+logger = logging.getLogger(__name__)
+
+AGENT_TYPES = ("researcher", "coder")
+
+
+async def execute_step_task(task: StepTask) -> dict:
+    """
+    Run a dispatched step and return the state update for its owning run.
+
+    Args:
+        task: The claimed step task
+
+    Returns:
+        The plan with the executed step, the observations, the new messages
+        and the tokens and tool calls the step used
+    """
+    payload = task.payload
+    resources = [Resource(**r) for r in payload["state"].get("resources", [])]
+    plan = Plan.model_validate(payload["state"]["current_plan"])
+    state = {
+        "messages": [],
+        "current_plan": plan,
+        "observations": payload["state"].get("observations", []),
+        "locale": payload["state"].get("locale", "en-US"),
+        "resources": resources,
+    }
+    # the step gets its own budget with what is left of the run's budget, if
+    # the run has one
+    thread_id = f"{payload['configurable'].get('thread_id')}:step-{task.id}"
+    configurable = {
+        **payload["configurable"],
+        "resources": resources,
+        "thread_id": thread_id,
+    }
+    budget = start_run_budget(thread_id, **payload.get("budget", {}))
+
+    # the step inherits the budget as a callback, like a node of the graph run
+    async def run(_, config):
+        return await run_agent_step(
+            state, {**config, "configurable": configurable}, task.agent_type
+        )
+
+    if budget is None:
+        command = await RunnableLambda(run).ainvoke(None)
+    else:
+        budget.start()
+        try:
+            command = await RunnableLambda(run).ainvoke(
+                None, config={"callbacks": [budget]}
+            )
+        finally:
+            budget.stop()
+    update = command.update or {}
+    result = {
+        "current_plan": update.get("current_plan", plan).model_dump(mode="json"),
+        "observations": update.get("observations"),
+        "messages": [message.content for message in update.get("messages", [])],
+    }
+    if budget is not None:
+        result["usage"] = {"tokens": budget.tokens, "tool_calls": budget.tool_calls}
+    return result
+
+
+async def _keep_lease(broker: StepBroker, task: StepTask, worker_id: str) -> None:
+    while True:
+        await asyncio.sleep(broker.lease_seconds / 3)
+        if not await asyncio.to_thread(broker.heartbeat, task.id, worker_id):
+            logger.warning(f"Worker {worker_id} lost the lease of task {task.id}")
+            return
+
+
+async def _work(
+    broker: StepBroker,
+    worker_id: str,
+    agent_types: Sequence[str],
+    poll_interval: float,
+    stop: asyncio.Event,
+) -> None:
+    while not stop.is_set():
+        task = await asyncio.to_thread(broker.claim, worker_id, agent_types)
+        if task is None:
+            try:
+                await asyncio.wait_for(stop.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        logger.info(
+            f"Worker {worker_id} running {task.agent_type} task {task.id} "
+            f"(attempt {task.attempts})"
+        )
+        lease = asyncio.create_task(_keep_lease(broker, task, worker_id))
+        try:
+            result = await execute_step_task(task)
+        except Exception as e:
+            logger.exception(f"Task {task.id} failed in worker {worker_id}")
+            await asyncio.to_thread(broker.fail, task.id, worker_id, repr(e))
+            continue
+        finally:
+            lease.cancel()
+        if not await asyncio.to_thread(broker.complete, task.id, worker_id, result):
+            logger.warning(f"Result of task {task.id} discarded, it was reassigned")
+
+
+async def run_worker(
+    broker: StepBroker,
+    agent_types: Sequence[str] = AGENT_TYPES,
+    concurrency: int = 1,
+    poll_interval: float = 1.0,
+    worker_id: Optional[str] = None,
+    stop: Optional[asyncio.Event] = None,
+) -> None:
+    """
+    Execute dispatched agent steps until `stop` is set.
+
+    Args:
+        broker: The broker shared with the API servers
+        agent_types: The agent types this worker runs
+        concurrency: Number of steps executed at the same time
+        poll_interval: Seconds to wait when the queue is empty
+        worker_id: Identifier of this worker, defaults to host and process id
+        stop: Event that stops the worker after its current steps
+    """
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    stop = stop or asyncio.Event()
+    logger.info(
+        f"Step worker {worker_id} started with concurrency {concurrency} "
+        f"for {list(agent_types)} on {broker.path}"
+    )
+    await asyncio.gather(
+        *(
+            _work(
+                broker,
+                f"{worker_id}-{i}-{uuid4().hex[:6]}",
+                agent_types,
+                poll_interval,
+                stop,
+            )
+            for i in range(concurrency)
+        )
+    )
@@ -3,7 +3,7 @@
 
 import asyncio
 import logging
-from src.graph import build_graph
+from src.graph import build_fast_graph, build_graph
 
 # Configure logging
 logging.basicConfig(
@@ -19,8 +19,9 @@ def enable_debug_logging():
 
 logger = logging.getLogger(__name__)
 
-# Create the graph
+# Create the graphs
 graph = build_graph()
+fast_graph = build_fast_graph()
 
 
 async def run_agent_workflow_async(
@@ -29,6 +30,8 @@ async def run_agent_workflow_async(
     max_plan_iterations: int = 1,
     max_step_num: int = 3,
     enable_background_investigation: bool = True,
+    fast: bool = False,
+    fast_escalation: bool = False,
 ):
     """Run the agent workflow asynchronously with the given user input.
 
@@ -38,6 +41,8 @@ async def run_agent_workflow_async(
         max_plan_iterations: Maximum number of plan iterations
         max_step_num: Maximum number of steps in a plan
         enable_background_investigation: If True, performs web search before planning to enhance context
+        fast: If True, answers in a single pass from a web search instead of running the full research
+        fast_escalation: If True, a fast answer runs the full research when the search results are not enough
 
     Returns:
         The final state after the workflow completes
@@ -60,6 +65,7 @@ async def run_agent_workflow_async(
             "thread_id": "default",
             "max_plan_iterations": max_plan_iterations,
             "max_step_num": max_step_num,
+            "fast_escalation": fast_escalation,
             "mcp_settings": {
                 "servers": {
                     "mcp-github-trending": {
@@ -75,7 +81,8 @@ async def run_agent_workflow_async(
         "recursion_limit": 100,
     }
     last_message_cnt = 0
-    async for s in graph.astream(
+    workflow = fast_graph if fast else graph
+    async for s in workflow.astream(
         input=initial_state, config=config, stream_mode="values"
     ):
         try:
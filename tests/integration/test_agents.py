@@ -0,0 +1,48 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from unittest.mock import patch
+
+import pytest
+from langchain_openai import ChatOpenAI
+
+from src.agents import clear_agent_cache, create_agent
+from src.agents.agents import get_tools_fingerprint
+from src.tools import crawl_tool, python_repl_tool
+
+
+def _make_llm():
+    return ChatOpenAI(model="test-model", api_key="test-key")
+
+
+@pytest.fixture(autouse=True)
+def empty_agent_cache():
+    clear_agent_cache()
+    yield
+    clear_agent_cache()
+
+
+def test_tools_fingerprint_depends_on_tool_set():
+    assert get_tools_fingerprint([crawl_tool]) == get_tools_fingerprint([crawl_tool])
+    assert get_tools_fingerprint([crawl_tool]) != get_tools_fingerprint(
+        [crawl_tool, python_repl_tool]
+    )
+
+
+def test_create_agent_reuses_cached_agent():
+    llm = _make_llm()
+    with patch("src.agents.agents.get_llm_by_type", return_value=llm):
+        first = create_agent("coder", "coder", [python_repl_tool], "coder")
+        second = create_agent("coder", "coder", [python_repl_tool], "coder")
+        other_tools = create_agent("coder", "coder", [crawl_tool], "coder")
+    assert first is second
+    assert other_tools is not first
+
+
+def test_create_agent_rebuilds_after_llm_reload():
+    with patch("src.agents.agents.get_llm_by_type", return_value=_make_llm()):
+        first = create_agent("coder", "coder", [python_repl_tool], "coder")
+    # a reload replaces the LLM instance, which must not hit the old agent
+    with patch("src.agents.agents.get_llm_by_type", return_value=_make_llm()):
+        second = create_agent("coder", "coder", [python_repl_tool], "coder")
+    assert first is not second
@@ -0,0 +1,152 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+from langgraph.graph import END, START, StateGraph
+
+from src.graph.budget import (
+    BudgetExceededError,
+    BudgetGuard,
+    RunBudget,
+    get_run_budget,
+    start_run_budget,
+)
+from src.graph.builder import continue_to_running_research_team
+from src.graph.nodes import _execute_agent_step, researcher_node
+from src.graph.types import State
+from src.prompts.planner_model import Plan, Step, StepType
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look up a query."""
+    return "found"
+
+
+def _plan():
+    return Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="t",
+        title="T",
+        steps=[
+            Step(
+                need_search=True,
+                title=f"Step {i}",
+                description="Collect data.",
+                step_type=StepType.RESEARCH,
+            )
+            for i in range(2)
+        ],
+    )
+
+
+def test_run_budget_counts_llm_tokens_and_tool_calls():
+    budget = RunBudget(max_tool_calls=2)
+    llm = FakeListChatModel(responses=["an answer of some length"])
+    llm.invoke("a question", config={"callbacks": [budget]})
+    assert budget.tokens > 0
+    assert budget.exceeded is None
+
+    lookup.invoke("btc", config={"callbacks": [budget]})
+    lookup.invoke("eth", config={"callbacks": [budget]})
+    assert budget.tool_calls == 2
+    assert budget.exceeded == "tool_calls"
+    with pytest.raises(BudgetExceededError):
+        lookup.invoke("sol", config={"callbacks": [BudgetGuard(budget)]})
+
+
+def test_start_run_budget_resets_only_new_runs():
+    budget = start_run_budget("budget-thread", max_tokens=100)
+    budget.tokens = 50
+    resumed = start_run_budget("budget-thread", max_tokens=100, reset=False)
+    assert resumed is budget and resumed.tokens == 50
+    assert start_run_budget("budget-thread", max_tokens=100).tokens == 0
+    config = {"configurable": {"thread_id": "budget-thread"}}
+    assert get_run_budget(config) is not budget
+    # a run without limits has no budget, so no usage events are sent
+    assert start_run_budget("budget-thread") is None
+    assert get_run_budget(config) is None
+
+
+def test_research_team_routes_to_reporter_when_budget_exhausted():
+    config = {"configurable": {"thread_id": "exhausted-thread"}}
+    budget = start_run_budget("exhausted-thread", max_tool_calls=1)
+    state = {"current_plan": _plan()}
+    assert continue_to_running_research_team(state, config) == "researcher"
+    budget.tool_calls = 1
+    assert continue_to_running_research_team(state, config) == "reporter"
+
+
+def test_execute_agent_step_stops_when_budget_exhausted():
+    config = {"configurable": {"thread_id": "step-thread"}}
+    start_run_budget("step-thread", max_tokens=10)
+    plan = _plan()
+    state = {"current_plan": plan, "observations": ["earlier"]}
+    agent = MagicMock()
+    agent.ainvoke = AsyncMock(side_effect=BudgetExceededError("Run tokens budget"))
+
+    configurable = MagicMock()
+    configurable.step_cache_ttl = 0
+    with patch(
+        "src.graph.nodes.Configuration.from_runnable_config",
+        return_value=configurable,
+    ):
+        result = asyncio.run(_execute_agent_step(state, agent, "researcher", config))
+
+    assert result.goto == "research_team"
+    assert result.update == {"current_plan": plan}
+    assert plan.steps[0].execution_res.startswith("Skipped")
+    agent_config = agent.ainvoke.call_args.kwargs["config"]
+    assert any(isinstance(h, BudgetGuard) for h in agent_config["callbacks"].handlers)
+
+
+def test_agent_steps_stream_and_count_inside_the_graph():
+    llm = FakeListChatModel(responses=["AVAX trades at $35"])
+
+    async def agent(input, config):
+        await lookup.ainvoke({"query": "AVAX"}, config)
+        answer = await llm.ainvoke(input["messages"], config)
+        return {"messages": [*input["messages"], answer]}
+
+    builder = StateGraph(State)
+    builder.add_node("researcher", researcher_node)
+    builder.add_node("research_team", lambda state: {})
+    builder.add_edge(START, "researcher")
+    builder.add_edge("research_team", END)
+    graph = builder.compile()
+    budget = start_run_budget("graph-thread", max_tokens=100_000)
+
+    async def run():
+        chunks = []
+        async for chunk, metadata in graph.astream(
+            {"messages": [], "current_plan": _plan(), "locale": "en-US"},
+            config={
+                "configurable": {"thread_id": "graph-thread"},
+                "callbacks": [budget],
+            },
+            stream_mode="messages",
+        ):
+            if isinstance(chunk, AIMessageChunk):
+                chunks.append(chunk)
+        return chunks
+
+    with (
+        patch(
+            "src.graph.nodes._create_agent_timed", return_value=RunnableLambda(agent)
+        ),
+        patch("src.graph.nodes.get_web_search_tool", return_value=MagicMock()),
+    ):
+        chunks = asyncio.run(run())
+
+    # the agent's tokens reach the client and its usage is counted in the budget
+    assert "".join(chunk.content for chunk in chunks) == "AVAX trades at $35"
+    assert budget.tokens > 0
+    assert budget.tool_calls == 1
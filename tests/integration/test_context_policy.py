@@ -0,0 +1,120 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.agents.agents import _build_tool_result_hook
+from src.prompts.context import (
+    apply_context_policy,
+    condense_tool_results,
+    is_agent_output,
+)
+from src.prompts.template import apply_prompt_template
+
+
+def _research_history():
+    return [
+        HumanMessage(content="What is MCP?"),
+        AIMessage(content="plan " * 100, name="planner"),
+        HumanMessage(content="finding one " * 200, name="researcher"),
+        HumanMessage(content="finding two " * 200, name="researcher"),
+        HumanMessage(content="[EDIT_PLAN] more detail", name="feedback"),
+    ]
+
+
+def test_is_agent_output():
+    assert is_agent_output(AIMessage(content="x"))
+    assert is_agent_output(HumanMessage(content="x", name="researcher"))
+    assert not is_agent_output(HumanMessage(content="x"))
+    assert not is_agent_output(HumanMessage(content="x", name="feedback"))
+    assert not is_agent_output({"role": "user", "content": "x"})
+
+
+def test_window_policy_keeps_latest_messages():
+    policy = {"coordinator": {"strategy": "window", "max_messages": 2}}
+    messages = _research_history()
+    with patch.dict("src.prompts.context.AGENT_CONTEXT_POLICY", policy, clear=True):
+        result = apply_context_policy("coordinator", messages)
+    assert result == messages[-2:]
+
+
+def test_summarize_policy_condenses_older_agent_outputs():
+    policy = {
+        "planner": {"strategy": "summarize", "keep_recent": 1, "summary_chars": 50}
+    }
+    messages = _research_history()
+    with patch.dict("src.prompts.context.AGENT_CONTEXT_POLICY", policy, clear=True):
+        result = apply_context_policy("planner", messages)
+
+    assert len(result) == len(messages)
+    # user messages and the latest agent output are untouched
+    assert result[0] is messages[0]
+    assert result[3] is messages[3]
+    assert result[4] is messages[4]
+    # older agent outputs are condensed but keep their name
+    assert "condensed" in result[1].content
+    assert result[2].name == "researcher"
+    assert len(result[2].content) < len(messages[2].content)
+
+
+def test_agent_without_policy_sees_full_history():
+    messages = _research_history()
+    with patch.dict("src.prompts.context.AGENT_CONTEXT_POLICY", {}, clear=True):
+        assert apply_context_policy("reporter", messages) == messages
+
+
+def test_apply_prompt_template_uses_context_policy():
+    policy = {"coder": {"strategy": "window", "max_messages": 1}}
+    state = {
+        "messages": [
+            {"role": "user", "content": "first"},
+            {"role": "user", "content": "second"},
+        ]
+    }
+    with patch.dict("src.prompts.context.AGENT_CONTEXT_POLICY", policy, clear=True):
+        messages = apply_prompt_template("coder", state)
+    assert len(messages) == 2
+    assert messages[1]["content"] == "second"
+
+
+def _tool_message(content, call_id):
+    return ToolMessage(content=content, tool_call_id=call_id, name="web_search")
+
+
+def test_condense_tool_results_keeps_recent_results():
+    search_result = json.dumps(
+        [
+            {
+                "type": "page",
+                "title": "MCP docs",
+                "url": "https://example.com/mcp",
+                "content": "Model Context Protocol " * 50,
+                "raw_content": "raw " * 1000,
+            }
+        ]
+    )
+    messages = [
+        HumanMessage(content="task"),
+        _tool_message(search_result, "1"),
+        _tool_message("{'url': 'https://example.com/a', 'crawled_content': 'x'}", "2"),
+        _tool_message(search_result, "3"),
+    ]
+    result = condense_tool_results(messages, keep_recent=1, summary_chars=100)
+
+    assert result[0] is messages[0]
+    assert result[3] is messages[3]
+    assert "https://example.com/mcp" in result[1].content
+    assert "raw raw" not in result[1].content
+    assert result[1].tool_call_id == "1"
+    assert "https://example.com/a" in result[2].content
+
+
+def test_tool_result_hook_only_changes_llm_input():
+    hook = _build_tool_result_hook("researcher", {"keep_recent": 0})
+    messages = [HumanMessage(content="task"), _tool_message("long " * 500, "1")]
+    update = hook({"messages": messages})
+    assert "messages" not in update
+    assert "condensed" in update["llm_input_messages"][1].content
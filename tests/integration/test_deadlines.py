@@ -0,0 +1,158 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+
+from src.graph.deadline import step_deadline_hits
+from src.graph.nodes import researcher_node
+from src.prompts.planner_model import Plan, Step, StepType
+from src.tools.decorators import tool_deadline_hits, with_deadline
+
+
+@tool
+async def lookup_price(symbol: str) -> str:
+    """Look up the price of an asset."""
+    if symbol == "SLOW":
+        await asyncio.sleep(10)
+    return f"{symbol} trades at $35 (https://example.com/{symbol})"
+
+
+@tool(response_format="content_and_artifact")
+async def search_news(query: str) -> tuple[str, list]:
+    """Search the news."""
+    await asyncio.sleep(10)
+    return query, []
+
+
+def test_tool_calls_are_stopped_by_their_deadline():
+    wrapped = with_deadline(lookup_price, 0.05)
+    assert wrapped.name == "lookup_price"
+    assert wrapped.tool_call_schema.model_json_schema()["required"] == ["symbol"]
+
+    assert asyncio.run(wrapped.ainvoke({"symbol": "AVAX"})).startswith("AVAX trades")
+    hits = tool_deadline_hits.get("lookup_price", 0)
+    result = asyncio.run(wrapped.ainvoke({"symbol": "SLOW"}))
+    assert result.startswith("Tool call timed out after 0.05s")
+    assert tool_deadline_hits["lookup_price"] == hits + 1
+
+    message = asyncio.run(
+        with_deadline(search_news, 0.05).ainvoke(
+            {
+                "name": "search_news",
+                "args": {"query": "AVAX"},
+                "id": "1",
+                "type": "tool_call",
+            }
+        )
+    )
+    assert message.content.startswith("Tool call timed out")
+
+
+def test_step_deadline_keeps_the_partial_findings():
+    plan = Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="t",
+        title="AVAX",
+        steps=[
+            Step(
+                need_search=True,
+                title="AVAX price",
+                description="Collect the AVAX price.",
+                step_type=StepType.RESEARCH,
+            )
+        ],
+    )
+    state = {"current_plan": plan, "observations": [], "locale": "en-US"}
+    cancelled = asyncio.Event()
+
+    async def stuck_agent(_, config):
+        await lookup_price.ainvoke(
+            {
+                "name": "lookup_price",
+                "args": {"symbol": "AVAX"},
+                "id": "1",
+                "type": "tool_call",
+            },
+            config,
+        )
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    writer = MagicMock()
+    hits = step_deadline_hits.get("researcher", 0)
+    with (
+        patch("src.graph.nodes.AGENT_DEADLINES", {"researcher": {"step_seconds": 0.1}}),
+        patch(
+            "src.graph.nodes._create_agent_timed",
+            return_value=RunnableLambda(stuck_agent),
+        ),
+        patch("src.graph.nodes.get_stream_writer", return_value=writer),
+        patch("src.graph.nodes.get_web_search_tool", return_value=MagicMock()),
+    ):
+        result = asyncio.run(researcher_node(state, {"configurable": {}}))
+
+    step = result.update["current_plan"].steps[0]
+    assert cancelled.is_set()
+    assert step.execution_error is None
+    assert "stopped by its 0.1s deadline" in step.execution_res
+    assert "AVAX trades at $35" in step.execution_res
+    assert result.update["observations"] == [step.execution_res]
+    assert result.goto == "research_team"
+    assert step_deadline_hits["researcher"] == hits + 1
+    assert writer.call_args.args[0]["type"] == "step_deadline"
+
+
+def test_step_deadline_covers_all_attempts():
+    plan = Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="t",
+        title="AVAX",
+        steps=[
+            Step(
+                need_search=True,
+                title="AVAX price",
+                description="Collect the AVAX price.",
+                step_type=StepType.RESEARCH,
+            )
+        ],
+    )
+    attempts = []
+
+    async def flaky_agent(_, config):
+        attempts.append(time.monotonic())
+        await lookup_price.ainvoke({"symbol": f"AVAX{len(attempts)}"}, config)
+        await asyncio.sleep(0.15)
+        if len(attempts) == 1:
+            raise RuntimeError("provider error")
+
+    state = {"current_plan": plan, "observations": [], "locale": "en-US"}
+    config = {"configurable": {"max_step_retries": 3}}
+    start = time.monotonic()
+    with (
+        patch("src.graph.nodes.AGENT_DEADLINES", {"researcher": {"step_seconds": 0.2}}),
+        patch("src.graph.nodes.STEP_RETRY_BACKOFF_SECONDS", 0),
+        patch(
+            "src.graph.nodes._create_agent_timed",
+            return_value=RunnableLambda(flaky_agent),
+        ),
+        patch("src.graph.nodes.get_stream_writer", return_value=MagicMock()),
+        patch("src.graph.nodes.get_web_search_tool", return_value=MagicMock()),
+    ):
+        result = asyncio.run(researcher_node(state, config))
+
+    # the retry only gets what is left of the step's deadline
+    assert len(attempts) == 2
+    assert time.monotonic() - start < 0.3
+    # the findings of the failed attempt are kept
+    findings = result.update["current_plan"].steps[0].execution_res
+    assert "AVAX1 trades" in findings and "AVAX2 trades" in findings
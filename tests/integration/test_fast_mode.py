@@ -0,0 +1,107 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.types import Command, interrupt
+
+from src.graph import (
+    build_fast_graph,
+    build_fast_graph_with_memory,
+    build_graph_with_memory,
+)
+from src.graph.nodes import fast_answer_node
+
+SEARCH_RESULTS = "## AVAX price\n\nAVAX trades at $35 (https://example.com/avax)"
+
+
+def _llm(response):
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(return_value=response)
+    llm.bind_tools.return_value.ainvoke = llm.ainvoke
+    return llm
+
+
+def test_fast_graph_answers_in_a_single_pass():
+    llm = _llm(AIMessage(content="AVAX trades at $35."))
+    with (
+        patch(
+            "src.graph.nodes._investigate", AsyncMock(return_value=SEARCH_RESULTS)
+        ) as investigate,
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+    ):
+        state = asyncio.run(
+            build_fast_graph().ainvoke(
+                {"messages": [HumanMessage(content="current price of AVAX?")]}
+            )
+        )
+
+    investigate.assert_awaited_once()
+    assert llm.ainvoke.await_count == 1
+    # the search results are part of the prompt of the single call
+    assert SEARCH_RESULTS in llm.ainvoke.call_args.args[0][0]["content"]
+    assert state["final_report"] == "AVAX trades at $35."
+    assert state["messages"][-1].name == "coordinator"
+    llm.bind_tools.assert_not_called()
+
+
+def test_fast_answer_escalates_when_context_is_lacking():
+    llm = _llm(
+        AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "handoff_to_planner",
+                    "args": {"task_title": "AVAX outlook", "locale": "zh-CN"},
+                    "id": "call_1",
+                }
+            ],
+        )
+    )
+    state = {
+        "messages": [HumanMessage(content="AVAX 2030 outlook")],
+        "background_investigation_results": SEARCH_RESULTS,
+    }
+    config = {"configurable": {"fast_escalation": True}}
+    with patch("src.graph.nodes.get_llm_by_type", return_value=llm):
+        result = asyncio.run(fast_answer_node(state, config))
+
+    assert result.goto == "planner"
+    assert result.update["locale"] == "zh-CN"
+    assert result.update["enable_background_investigation"] is True
+
+
+def test_escalated_fast_thread_is_resumed_by_the_full_graph():
+    async def escalate(state, config):
+        return Command(goto="planner")
+
+    async def plan(state, config):
+        return Command(update={"current_plan": "plan"}, goto="human_feedback")
+
+    def review(state):
+        feedback = interrupt("Please review the plan.")
+        return Command(update={"final_report": feedback}, goto="__end__")
+
+    checkpointer = MemorySaver()
+    with (
+        patch("src.graph.builder.background_investigation_node", lambda state: {}),
+        patch("src.graph.builder.fast_answer_node", escalate),
+        patch("src.graph.builder.planner_node", plan),
+        patch("src.graph.builder.human_feedback_node", review),
+    ):
+        fast_graph = build_fast_graph_with_memory(checkpointer)
+        graph = build_graph_with_memory(checkpointer)
+    config = {"configurable": {"thread_id": "avax"}}
+
+    async def run():
+        await fast_graph.ainvoke(
+            {"messages": [HumanMessage(content="AVAX 2030 outlook")]}, config
+        )
+        # the next request of the thread, e.g. the plan feedback, is not fast
+        return await graph.ainvoke(Command(resume="[accepted]"), config)
+
+    state = asyncio.run(run())
+    assert state["final_report"] == "[accepted]"
@@ -0,0 +1,94 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from src.llms.http_client import LLMHttpClients, llm_http_clients
+from src.llms.llm import get_llm_by_type, reload_all_llms
+
+
+class _OkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_llms_share_the_pooled_clients_across_reloads():
+    basic = get_llm_by_type("basic")
+    reload_all_llms()
+    reloaded = get_llm_by_type("basic")
+
+    assert reloaded is not basic
+    assert basic.root_client._client is reloaded.root_client._client
+    assert reloaded.root_client._client is llm_http_clients.get_client()
+    assert (
+        get_llm_by_type("reasoning").root_async_client._client
+        is llm_http_clients.get_async_client()
+    )
+
+
+def test_connections_are_kept_alive_and_reported():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    clients = LLMHttpClients()
+    try:
+        client = clients.get_client()
+        for _ in range(3):
+            assert client.get(url).text == "ok"
+
+        async def fetch():
+            await clients.get_async_client().get(url)
+            stats = clients.stats()
+            await clients.aclose()
+            return stats
+
+        stats = asyncio.run(fetch())
+    finally:
+        server.shutdown()
+
+    assert stats["requests"] == 4
+    # the requests reused one keep-alive connection
+    assert stats["sync"] == {
+        "connections": 1,
+        "active": 0,
+        "idle": 1,
+        "http2": 0,
+        "queued_requests": 0,
+    }
+    assert stats["async"]["connections"] == 1
+    assert clients.stats()["sync"] is None
+
+
+def test_clients_honor_proxies_and_event_loops():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+    clients = LLMHttpClients()
+    with patch.dict("os.environ", {"HTTPS_PROXY": "http://proxy.test:3128"}):
+        assert clients.get_client()._mounts
+
+    async def fetch():
+        client = clients.get_async_client()
+        return (await client.get(url)).text, client.loop_client()
+
+    try:
+        # each event loop sends through its own connections
+        first, first_client = asyncio.run(fetch())
+        second, second_client = asyncio.run(fetch())
+    finally:
+        server.shutdown()
+
+    assert first == second == "ok"
+    assert first_client is not second_client
+    assert clients.stats()["requests"] == 2
@@ -0,0 +1,116 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.graph.budget import RunBudget
+from src.llms.response_cache import CachingChatOpenAI, LLMResponseCache
+
+ANSWER = "Bitcoin is a decentralized digital currency secured by proof of work."
+
+
+def _completion(request: httpx.Request) -> httpx.Response:
+    _completion.requests.append(json.loads(request.content))
+    return httpx.Response(
+        200,
+        json={
+            "id": "chatcmpl-1",
+            "object": "chat.completion",
+            "created": 0,
+            "model": "test-model",
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": ANSWER},
+                    "finish_reason": "stop",
+                }
+            ],
+            "usage": {"prompt_tokens": 5, "completion_tokens": 12, "total_tokens": 17},
+        },
+    )
+
+
+def _llm(ttl: float) -> CachingChatOpenAI:
+    transport = httpx.MockTransport(_completion)
+    return CachingChatOpenAI(
+        model="test-model",
+        api_key="test",
+        base_url="http://llm.test/v1",
+        http_client=httpx.Client(transport=transport),
+        http_async_client=httpx.AsyncClient(transport=transport),
+        response_cache_ttl=ttl,
+    )
+
+
+def _messages(time: str) -> list:
+    return [
+        SystemMessage(content=f"CURRENT_TIME: Mon Oct 19 2026 {time} \nBe brief."),
+        HumanMessage(content="What is bitcoin?", id="a-run-specific-id"),
+    ]
+
+
+def test_identical_calls_are_answered_from_the_cache(tmp_path):
+    _completion.requests = []
+    cache = LLMResponseCache(path=str(tmp_path / "responses.db"))
+    with patch("src.llms.response_cache.llm_response_cache", cache):
+        first = asyncio.run(_llm(60).ainvoke(_messages("10:00:01")))
+        # the time of day and message ids are not part of the key
+        second = asyncio.run(_llm(60).ainvoke(_messages("10:05:59")))
+        # the sync API and other parameters have their own entries
+        assert _llm(60).invoke(_messages("11:00:00")).content == ANSWER
+        _llm(60).bind(temperature=0.5).invoke(_messages("10:00:01"))
+
+    assert first.content == second.content == ANSWER
+    assert second.usage_metadata["total_tokens"] == 0
+    assert second.response_metadata["cached"]
+    assert len(_completion.requests) == 2
+    assert _completion.requests[1]["temperature"] == 0.5
+    assert cache.stats()["memory_hits"] == 2
+
+
+def test_cached_responses_are_streamed_and_persisted(tmp_path):
+    _completion.requests = []
+    path = str(tmp_path / "responses.db")
+    with patch("src.llms.response_cache.llm_response_cache", LLMResponseCache(path)):
+        asyncio.run(_llm(60).ainvoke(_messages("10:00:01")))
+
+    # a new process reads the response from the SQLite tier
+    cache = LLMResponseCache(path)
+
+    async def stream():
+        return [chunk async for chunk in _llm(60).astream(_messages("12:00:00"))]
+
+    with patch("src.llms.response_cache.llm_response_cache", cache):
+        chunks = asyncio.run(stream())
+        # expired responses and models without a TTL call the provider
+        asyncio.run(_llm(-1).ainvoke(_messages("10:00:01")))
+        asyncio.run(_llm(0).ainvoke(_messages("10:00:01")))
+
+    assert len(chunks) > 1
+    assert "".join(chunk.content for chunk in chunks) == ANSWER
+    assert chunks[-1].usage_metadata["total_tokens"] == 0
+    assert cache.stats()["disk_hits"] == 1
+    assert len(_completion.requests) == 3
+
+
+def test_cached_responses_are_not_charged_to_the_run_budget(tmp_path):
+    _completion.requests = []
+    budget = RunBudget()
+    config = {"callbacks": [budget]}
+
+    async def stream():
+        return [c async for c in _llm(60).astream(_messages("10:00:01"), config)]
+
+    with patch("src.llms.response_cache.llm_response_cache", LLMResponseCache()):
+        asyncio.run(_llm(60).ainvoke(_messages("10:00:01"), config))
+        charged = budget.tokens
+        asyncio.run(_llm(60).ainvoke(_messages("10:00:01"), config))
+        asyncio.run(stream())
+
+    assert charged == 17
+    assert budget.tokens == charged
@@ -0,0 +1,227 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import sys
+import threading
+
+import pytest
+from mcp.types import Tool as MCPTool
+
+from src.tools.mcp import (
+    MCPSessionPool,
+    cache_tool_schemas,
+    get_mcp_tools,
+    get_server_key,
+)
+
+MATH_SERVER = """
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("math")
+
+
+@mcp.tool()
+def add(a: int, b: int) -> int:
+    \"\"\"Add two numbers\"\"\"
+    return a + b
+
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
+"""
+
+
+@pytest.fixture
+def server_config(tmp_path):
+    server_path = tmp_path / "math_server.py"
+    server_path.write_text(MATH_SERVER)
+    return {
+        "transport": "stdio",
+        "command": sys.executable,
+        "args": [str(server_path)],
+    }
+
+
+def test_server_key_ignores_non_connection_fields(server_config):
+    with_agent_fields = {
+        **server_config,
+        "enabled_tools": ["add"],
+        "add_to_agents": ["researcher"],
+    }
+    assert get_server_key(server_config) == get_server_key(with_agent_fields)
+    assert get_server_key(server_config) != get_server_key(
+        {**server_config, "args": ["other.py"]}
+    )
+
+
+def test_pool_reuses_session_across_steps(server_config):
+    pool = MCPSessionPool()
+
+    async def run():
+        async with pool.session("math", server_config) as first:
+            result = await first.tools[0].ainvoke({"a": 1, "b": 2})
+        sessions = await asyncio.gather(
+            pool.acquire("math", dict(server_config)),
+            pool.acquire("math-alias", dict(server_config)),
+        )
+        for session in sessions:
+            await pool.release(session)
+        stats = pool.stats()
+        await pool.close_all()
+        return first, sessions, result, stats
+
+    first, sessions, result, stats = asyncio.run(run())
+    assert result == "3"
+    assert all(session is first for session in sessions)
+    assert stats["sessions"] == 1
+
+
+def test_pool_evicts_least_recently_used_session(server_config, tmp_path):
+    pool = MCPSessionPool(max_sessions=1)
+    other_path = tmp_path / "other_server.py"
+    other_path.write_text(MATH_SERVER)
+    other_config = {**server_config, "args": [str(other_path)]}
+
+    async def run():
+        async with pool.session("math", server_config) as first:
+            pass
+        async with pool.session("other", other_config) as second:
+            pass
+        alive = first.is_alive
+        stats = pool.stats()
+        await pool.close_all()
+        return second, alive, stats
+
+    second, first_alive, stats = asyncio.run(run())
+    assert second.tools
+    assert not first_alive
+    assert stats["sessions"] == 1
+
+
+def test_pool_cap_holds_for_concurrent_starts(server_config, tmp_path):
+    pool = MCPSessionPool(max_sessions=1)
+    configs = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / f"{name}_server.py"
+        path.write_text(MATH_SERVER)
+        configs.append((name, {**server_config, "args": [str(path)]}))
+    open_sessions = []
+
+    async def step(name, config):
+        async with pool.session(name, config) as session:
+            open_sessions.append(pool.stats()["sessions"])
+            return await session.tools[0].ainvoke({"a": 1, "b": 2})
+
+    async def run():
+        results = await asyncio.gather(*(step(*c) for c in configs))
+        stats = pool.stats()
+        await pool.close_all()
+        return results, stats
+
+    results, stats = asyncio.run(run())
+    assert results == ["3", "3", "3"]
+    assert open_sessions == [1, 1, 1]
+    assert stats["sessions"] == 1
+
+
+def test_pool_closes_idle_sessions_without_new_steps(server_config):
+    pool = MCPSessionPool(idle_timeout_seconds=0.2)
+
+    async def run():
+        async with pool.session("math", server_config) as session:
+            pass
+        await asyncio.sleep(0.6)
+        return session, pool.stats()
+
+    session, stats = asyncio.run(run())
+    assert stats["sessions"] == 0
+    assert session._task.done()
+
+
+def test_pool_closes_sessions_of_a_previous_event_loop(server_config):
+    pool = MCPSessionPool()
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        first = asyncio.run_coroutine_threadsafe(
+            pool.acquire("math", server_config), loop
+        ).result(30)
+        asyncio.run_coroutine_threadsafe(pool.release(first), loop).result(5)
+
+        async def run():
+            second = await pool.acquire("math", server_config)
+            await pool.release(second)
+            await pool.close_all()
+            return second
+
+        second = asyncio.run(run())
+        # the first session is closed in its own loop
+        closed = asyncio.run_coroutine_threadsafe(
+            asyncio.wait_for(asyncio.shield(first._task), 10), loop
+        )
+        closed.result(15)
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+
+    assert second is not first
+    assert first.session is None
+
+
+def test_get_mcp_tools_skips_broken_server(server_config):
+    pool = MCPSessionPool()
+    broken_config = {"transport": "stdio", "command": "/nonexistent", "args": []}
+
+    async def run():
+        tools = await get_mcp_tools(
+            {"math": server_config, "broken": broken_config},
+            timeout_seconds=20,
+            pool=pool,
+        )
+        result = await tools["math"][0].ainvoke({"a": 2, "b": 3})
+        await pool.close_all()
+        return tools, result
+
+    tools, result = asyncio.run(run())
+    assert [tool.name for tool in tools["math"]] == ["add"]
+    assert tools["broken"] == []
+    assert result == "5"
+
+
+def test_get_mcp_tools_uses_cached_schemas_without_connecting(server_config):
+    pool = MCPSessionPool()
+    cache_tool_schemas(
+        server_config,
+        [MCPTool(name="add", description="Add two numbers", inputSchema={})],
+    )
+
+    async def run():
+        tools = await get_mcp_tools({"math": server_config}, pool=pool)
+        stats = pool.stats()
+        result = await tools["math"][0].ainvoke({"a": 1, "b": 1})
+        await pool.close_all()
+        return tools, stats, result
+
+    tools, stats, result = asyncio.run(run())
+    assert tools["math"][0].name == "add"
+    # the server is only started when the tool is called
+    assert stats["sessions"] == 0
+    assert result == "2"
+
+
+def test_stub_tools_are_rebuilt_after_a_schema_change(server_config):
+    def get_tool(description):
+        cache_tool_schemas(
+            server_config,
+            [MCPTool(name="add", description=description, inputSchema={})],
+        )
+        tools = asyncio.run(get_mcp_tools({"math": server_config}))
+        return tools["math"][0]
+
+    stub = get_tool("Add two numbers")
+    assert get_tool("Add two numbers") is stub
+    changed = get_tool("Add two integers")
+    assert changed is not stub
+    assert changed.description == "Add two integers"
@@ -0,0 +1,93 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+
+from langchain_core.tools import StructuredTool, ToolException
+
+from src.tools.mcp import get_result_cache_ttl, mcp_result_cache, with_result_cache
+from src.utils.cache import TTLCache
+
+SERVER_CONFIG = {"transport": "sse", "url": "http://localhost:9000/sse"}
+
+
+def _make_tool(calls):
+    async def search(query: str):
+        calls.append(query)
+        if query == "fail":
+            raise ToolException("upstream error")
+        return f"results for {query}", None
+
+    return StructuredTool.from_function(
+        coroutine=search,
+        name="search",
+        description="Search the web",
+        response_format="content_and_artifact",
+    )
+
+
+def test_result_cache_ttl_is_opt_in():
+    assert get_result_cache_ttl(None, "search") is None
+    assert get_result_cache_ttl({"ttl_seconds": 60}, "search") == 60
+    assert get_result_cache_ttl({"tools": ["search"]}, "search") == 300
+    assert get_result_cache_ttl({"tools": ["search"]}, "fetch") is None
+    assert get_result_cache_ttl({"tools": {"search": 30}}, "search") == 30
+
+
+def test_cached_tool_reuses_results_for_identical_arguments():
+    mcp_result_cache.clear()
+    calls = []
+    tool = with_result_cache(_make_tool(calls), SERVER_CONFIG, 60)
+
+    async def run():
+        first = await tool.ainvoke({"query": "btc"})
+        second = await tool.ainvoke({"query": "btc"})
+        third = await tool.ainvoke({"query": "eth"})
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == "results for btc"
+    assert third == "results for eth"
+    assert calls == ["btc", "eth"]
+    assert mcp_result_cache.stats()["hits"] >= 1
+
+
+def test_cached_tool_does_not_cache_errors():
+    mcp_result_cache.clear()
+    calls = []
+    tool = with_result_cache(
+        _make_tool(calls), {**SERVER_CONFIG, "url": "http://other/sse"}, 60
+    )
+
+    async def run():
+        for _ in range(2):
+            try:
+                await tool.coroutine(query="fail")
+            except ToolException:
+                pass
+
+    asyncio.run(run())
+    assert calls == ["fail", "fail"]
+
+
+def test_ttl_cache_expires_and_bounds_size():
+    cache = TTLCache(max_entries=2, max_bytes=10)
+    cache.set("a", "12345", ttl_seconds=60)
+    cache.set("b", "12345", ttl_seconds=60)
+    cache.set("c", "1", ttl_seconds=60)
+    assert cache.get("a") is None
+    assert cache.get("c") == "1"
+    cache.set("d", "x", ttl_seconds=-1)
+    assert cache.get("d") is None
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_cached_tool_is_rebuilt_after_a_schema_change():
+    tool = _make_tool([])
+    wrapped = with_result_cache(tool, SERVER_CONFIG, 60)
+    assert with_result_cache(tool, SERVER_CONFIG, 60) is wrapped
+
+    changed = tool.model_copy(update={"description": "Search the news"})
+    assert with_result_cache(changed, SERVER_CONFIG, 60).description == (
+        "Search the news"
+    )
@@ -0,0 +1,72 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from src.server import mcp_utils
+from src.server.mcp_utils import load_mcp_tools_cached
+
+
+@pytest.fixture(autouse=True)
+def empty_metadata_cache():
+    mcp_utils._metadata_cache.clear()
+    yield
+    mcp_utils._metadata_cache.clear()
+
+
+@pytest.fixture
+def mock_load_mcp_tools():
+    calls = []
+
+    async def load_mcp_tools(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.01)
+        return [f"tools-{len(calls)}"]
+
+    with (
+        patch("src.server.mcp_utils.load_mcp_tools", side_effect=load_mcp_tools),
+        patch("src.server.mcp_utils.cache_tool_schemas"),
+    ):
+        yield calls
+
+
+def test_concurrent_lookups_are_coalesced(mock_load_mcp_tools):
+    async def run():
+        return await asyncio.gather(
+            *(load_mcp_tools_cached("sse", url="http://mcp") for _ in range(3))
+        )
+
+    results = asyncio.run(run())
+    assert results == [["tools-1"]] * 3
+    assert len(mock_load_mcp_tools) == 1
+
+
+def test_cached_metadata_and_explicit_refresh(mock_load_mcp_tools):
+    async def run():
+        first = await load_mcp_tools_cached("sse", url="http://mcp")
+        cached = await load_mcp_tools_cached("sse", url="http://mcp")
+        other = await load_mcp_tools_cached("sse", url="http://other")
+        refreshed = await load_mcp_tools_cached("sse", url="http://mcp", refresh=True)
+        return first, cached, other, refreshed
+
+    first, cached, other, refreshed = asyncio.run(run())
+    assert first == cached == ["tools-1"]
+    assert other == ["tools-2"]
+    assert refreshed == ["tools-3"]
+
+
+def test_stale_metadata_is_served_while_revalidating(mock_load_mcp_tools):
+    async def run():
+        await load_mcp_tools_cached("sse", url="http://mcp")
+        with patch("src.server.mcp_utils.MCP_METADATA_CACHE_TTL", -1):
+            stale = await load_mcp_tools_cached("sse", url="http://mcp")
+        await asyncio.sleep(0.05)
+        fresh = await load_mcp_tools_cached("sse", url="http://mcp")
+        return stale, fresh
+
+    stale, fresh = asyncio.run(run())
+    assert stale == ["tools-1"]
+    assert fresh == ["tools-2"]
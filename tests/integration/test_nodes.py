@@ -1,6 +1,7 @@
+import asyncio
 import json
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 # 在这里 mock 掉 get_llm_by_type，避免 ValueError
 with patch("src.llms.llm.get_llm_by_type", return_value=MagicMock()):
@@ -50,7 +51,8 @@ def patch_config_from_runnable_config(mock_configurable):
 def mock_tavily_search():
     with patch("src.graph.nodes.LoggedTavilySearch") as mock:
         instance = mock.return_value
-        instance.invoke.return_value = [
+        instance.ainvoke = AsyncMock()
+        instance.ainvoke.return_value = [
             {"title": "Test Title 1", "content": "Test Content 1"},
             {"title": "Test Title 2", "content": "Test Content 2"},
         ]
@@ -61,7 +63,8 @@ def mock_tavily_search():
 def mock_web_search_tool():
     with patch("src.graph.nodes.get_web_search_tool") as mock:
         instance = mock.return_value
-        instance.invoke.return_value = [
+        instance.ainvoke = AsyncMock()
+        instance.ainvoke.return_value = [
             {"title": "Test Title 1", "content": "Test Content 1"},
             {"title": "Test Title 2", "content": "Test Content 2"},
         ]
@@ -79,7 +82,7 @@ def test_background_investigation_node_tavily(
 ):
     """Test background_investigation_node with Tavily search engine"""
     with patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", search_engine):
-        result = background_investigation_node(mock_state, mock_config)
+        result = asyncio.run(background_investigation_node(mock_state, mock_config))
 
         # Verify the result structure
         assert isinstance(result, dict)
@@ -91,13 +94,15 @@ def test_background_investigation_node_tavily(
         results = result["background_investigation_results"]
 
         if search_engine == SearchEngine.TAVILY.value:
-            mock_tavily_search.return_value.invoke.assert_called_once_with("test query")
+            mock_tavily_search.return_value.ainvoke.assert_called_once_with(
+                "test query"
+            )
             assert (
                 results
                 == "## Test Title 1\n\nTest Content 1\n\n## Test Title 2\n\nTest Content 2"
             )
         else:
-            mock_web_search_tool.return_value.invoke.assert_called_once_with(
+            mock_web_search_tool.return_value.ainvoke.assert_called_once_with(
                 "test query"
             )
             assert len(json.loads(results)) == 2
@@ -109,9 +114,9 @@ def test_background_investigation_node_malformed_response(
     """Test background_investigation_node with malformed Tavily response"""
     with patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", SearchEngine.TAVILY.value):
         # Mock a malformed response
-        mock_tavily_search.return_value.invoke.return_value = "invalid response"
+        mock_tavily_search.return_value.ainvoke.return_value = "invalid response"
 
-        result = background_investigation_node(mock_state, mock_config)
+        result = asyncio.run(background_investigation_node(mock_state, mock_config))
 
         # Verify the result structure
         assert isinstance(result, dict)
@@ -122,3 +127,186 @@ def test_background_investigation_node_malformed_response(
         # Parse and verify the JSON content
         results = result["background_investigation_results"]
         assert json.loads(results) is None
+
+
+def test_reporter_node_sectioned_mode_drafts_sections_concurrently():
+    """Test reporter_node drafts one section per observation before merging"""
+    from src.graph.nodes import reporter_node
+    from src.prompts.planner_model import Plan
+
+    plan = Plan(
+        locale="en-US", has_enough_context=False, thought="t", title="T", steps=[]
+    )
+    state = {
+        "current_plan": plan,
+        "locale": "en-US",
+        "observations": ["first " * 4000, "second " * 4000],
+    }
+    configurable = MagicMock()
+    configurable.reporter_mode = "sectioned"
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(
+        side_effect=[
+            MagicMock(content="## Section"),
+            MagicMock(content="## Section"),
+            MagicMock(content="# Final report"),
+        ]
+    )
+    writer = MagicMock()
+    with (
+        patch(
+            "src.graph.nodes.Configuration.from_runnable_config",
+            return_value=configurable,
+        ),
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.get_stream_writer", return_value=writer),
+    ):
+        result = asyncio.run(reporter_node(state, MagicMock()))
+
+    assert result == {"final_report": "# Final report"}
+    assert llm.ainvoke.call_count == 3
+    assert writer.call_count == 2
+    assert {call.args[0]["index"] for call in writer.call_args_list} == {0, 1}
+    # the drafts belong to the message the final report is streamed as
+    run_id = llm.ainvoke.call_args_list[-1].kwargs["config"]["run_id"]
+    assert {call.args[0]["id"] for call in writer.call_args_list} == {f"run-{run_id}"}
+    # the merge pass sees the drafts instead of the raw observations
+    merge_messages = llm.ainvoke.call_args_list[-1].args[0]
+    assert all("first first" not in str(m.content) for m in merge_messages[1:])
+
+
+@pytest.mark.parametrize("hands_off", [True, False])
+def test_coordinator_node_speculative_investigation(
+    mock_state, mock_tavily_search, hands_off
+):
+    """Test the coordinator runs the background search while deciding"""
+    from src.graph.nodes import coordinator_node
+
+    state = {**mock_state, "enable_background_investigation": True}
+    configurable = MagicMock()
+    configurable.speculative_investigation = True
+    configurable.max_search_results = 5
+    configurable.resources = []
+    tool_calls = (
+        [{"name": "handoff_to_planner", "args": {"locale": "en-US"}}]
+        if hands_off
+        else []
+    )
+    llm = MagicMock()
+    llm.bind_tools.return_value.ainvoke = AsyncMock(
+        return_value=MagicMock(tool_calls=tool_calls)
+    )
+    with (
+        patch(
+            "src.graph.nodes.Configuration.from_runnable_config",
+            return_value=configurable,
+        ),
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", SearchEngine.TAVILY.value),
+    ):
+        result = asyncio.run(coordinator_node(state, MagicMock()))
+
+    if hands_off:
+        # the planner gets the results without a separate investigation node
+        assert result.goto == "planner"
+        assert result.update["background_investigation_results"].startswith(
+            "## Test Title 1"
+        )
+    else:
+        assert result.goto == "__end__"
+        assert "background_investigation_results" not in result.update
+
+
+@pytest.mark.parametrize("sufficient", [True, False])
+def test_research_team_node_early_termination(sufficient):
+    """Test research_team ends the plan early when the findings suffice"""
+    from src.graph.builder import continue_to_running_research_team
+    from src.graph.nodes import research_team_node
+    from src.prompts.planner_model import Plan, Step, StepType
+
+    plan = Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="t",
+        title="T",
+        steps=[
+            Step(
+                need_search=True,
+                title=f"Step {i}",
+                description="Collect data.",
+                step_type=StepType.RESEARCH,
+                execution_res="findings" if i == 0 else None,
+            )
+            for i in range(3)
+        ],
+    )
+    state = {"current_plan": plan, "messages": [HumanMessage(content="question")]}
+    configurable = MagicMock()
+    configurable.early_termination = True
+    llm = MagicMock()
+    llm.ainvoke = AsyncMock(
+        return_value=MagicMock(
+            content=json.dumps({"sufficient": sufficient, "reason": "answered"})
+        )
+    )
+    with (
+        patch(
+            "src.graph.nodes.Configuration.from_runnable_config",
+            return_value=configurable,
+        ),
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.get_stream_writer", return_value=MagicMock()),
+    ):
+        update = asyncio.run(research_team_node(state, {}))
+
+    if sufficient:
+        assert update["current_plan"].has_enough_context
+        assert continue_to_running_research_team({**state, **update}) == "reporter"
+    else:
+        assert update is None
+        assert continue_to_running_research_team(state) == "researcher"
+
+
+def test_planner_node_follow_up_reuses_earlier_findings():
+    """Test the planner sees earlier findings and can answer from them"""
+    from src.graph.nodes import planner_node
+    from src.prompts.planner_model import Plan, Step, StepType
+
+    prior_plan = Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="t",
+        title="Bitcoin market",
+        steps=[
+            Step(
+                need_search=True,
+                title="Bitcoin price history",
+                description="Collect prices.",
+                step_type=StepType.RESEARCH,
+                execution_res="BTC traded at 60k in 2024",
+            )
+        ],
+    )
+    state = {
+        "messages": [HumanMessage(content="What was the 2024 price?")],
+        "current_plan": prior_plan,
+        "observations": ["BTC traded at 60k in 2024"],
+        "plan_iterations": 0,
+        "locale": "en-US",
+    }
+    llm = MagicMock()
+    llm.with_structured_output.return_value.ainvoke = AsyncMock(
+        return_value=Plan(
+            locale="en-US", has_enough_context=True, thought="t", title="Answer"
+        )
+    )
+    with (
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.AGENT_LLM_MAP", {"planner": "basic"}),
+    ):
+        result = asyncio.run(planner_node(state, {}))
+
+    prompt = llm.with_structured_output.return_value.ainvoke.call_args.args[0]
+    assert "BTC traded at 60k in 2024" in prompt[-1]["content"]
+    # answered straight from the earlier observations
+    assert result.goto == "reporter"
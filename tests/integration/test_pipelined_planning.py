@@ -0,0 +1,131 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from langchain_core.messages import HumanMessage
+
+from src.graph.nodes import planner_node
+from src.utils.json_utils import PlanStepParser
+
+PLAN = {
+    "locale": "en-US",
+    "has_enough_context": False,
+    "thought": 'Compare {prices} and "flows" [2024]',
+    "title": "Bitcoin market",
+    "steps": [
+        {
+            "need_search": True,
+            "title": "Bitcoin Price } History",
+            "description": 'Collect "daily" prices {close}.',
+            "step_type": "research",
+        },
+        {
+            "need_search": False,
+            "title": "Volatility",
+            "description": "Compute volatility.",
+            "step_type": "processing",
+        },
+    ],
+}
+
+
+def _chunks(text, size=7):
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def test_plan_step_parser_emits_steps_as_they_close():
+    text = "```json\n" + json.dumps(PLAN, indent=2) + "\n```"
+    parser = PlanStepParser()
+    emitted = []
+    for i, chunk in enumerate(_chunks(text)):
+        emitted += [(i, step) for step in parser.feed(chunk)]
+
+    assert [step for _, step in emitted] == PLAN["steps"]
+    # the first step is available long before the plan is complete
+    assert emitted[0][0] < len(_chunks(text)) - 10
+
+
+def test_planner_researches_first_step_while_streaming():
+    started = asyncio.Event()
+
+    async def researcher_node(state, config):
+        started.set()
+        state["current_plan"].steps[0].execution_res = "BTC closed at 60k"
+
+    async def astream(messages):
+        text = json.dumps(PLAN)
+        first_step_end = text.index("}, {") + 1
+        yield SimpleNamespace(content=text[:first_step_end])
+        # the step starts before the rest of the plan arrives
+        await asyncio.wait_for(started.wait(), 1)
+        yield SimpleNamespace(content=text[first_step_end:])
+
+    llm = MagicMock()
+    llm.bind.return_value.astream = astream
+    state = {
+        "messages": [HumanMessage(content="Bitcoin in 2024")],
+        "auto_accepted_plan": True,
+        "locale": "en-US",
+    }
+    config = {"configurable": {"pipelined_planning": True}}
+    with (
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.AGENT_LLM_MAP", {"planner": "basic"}),
+        patch("src.graph.nodes.researcher_node", researcher_node),
+        patch("src.graph.nodes.get_stream_writer", return_value=MagicMock()),
+    ):
+        result = asyncio.run(planner_node(state, config))
+
+    assert result.goto == "human_feedback"
+    steps = json.loads(result.update["current_plan"])["steps"]
+    assert steps[0]["execution_res"] == "BTC closed at 60k"
+    assert "execution_res" not in steps[1]
+    assert result.update["observations"] == ["BTC closed at 60k"]
+
+
+def test_planner_cancels_first_step_when_streaming_fails():
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def researcher_node(state, config):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    async def astream(messages):
+        text = json.dumps(PLAN)
+        yield SimpleNamespace(content=text[: text.index("}, {") + 1])
+        await asyncio.wait_for(started.wait(), 1)
+        raise ConnectionError("stream dropped")
+
+    llm = MagicMock()
+    llm.bind.return_value.astream = astream
+    state = {
+        "messages": [HumanMessage(content="Bitcoin in 2024")],
+        "auto_accepted_plan": True,
+        "locale": "en-US",
+    }
+    config = {"configurable": {"pipelined_planning": True}}
+
+    async def run():
+        with pytest.raises(ConnectionError):
+            await planner_node(state, config)
+        # the step is cancelled with the planner, not when the loop shuts down
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    with (
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.AGENT_LLM_MAP", {"planner": "basic"}),
+        patch("src.graph.nodes.researcher_node", researcher_node),
+        patch("src.graph.nodes.get_stream_writer", return_value=MagicMock()),
+    ):
+        asyncio.run(run())
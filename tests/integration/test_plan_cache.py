@@ -0,0 +1,143 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.graph.nodes import coordinator_node, human_feedback_node
+from src.graph.plan_cache import PlanTemplateCache, extract_template
+from src.prompts.planner_model import Plan
+
+AVAX_PLAN = Plan.model_validate(
+    {
+        "locale": "en-US",
+        "has_enough_context": False,
+        "thought": "The user wants a price analysis of AVAX.",
+        "title": "Avalanche (AVAX) Price Analysis 2024",
+        "steps": [
+            {
+                "need_search": True,
+                "title": "AVAX Price History",
+                "description": "Collect daily Avalanche prices in 2024.",
+                "step_type": "research",
+            }
+        ],
+    }
+)
+
+
+def test_extract_template():
+    template = extract_template("Price analysis of AVAX in 2024?")
+    assert template.template == "price analysis of <asset:0> in <year:1>"
+    assert template.entities == ["AVAX", "2024"]
+
+    compare = extract_template("compare bitcoin vs ETH, is bitcoin better")
+    assert compare.template == "compare <asset:0> vs <asset:1> is <asset:0> better"
+    assert extract_template("what is a blockchain") is None
+    # only known assets and cashtags are slots, not any uppercase word
+    assert extract_template("Impact of AI on US ETF flows") is None
+    cashtag = extract_template("Is $pepe riskier than AI stocks")
+    assert cashtag.template == "is <asset:0> riskier than ai stocks"
+    assert cashtag.entities == ["PEPE"]
+
+
+def test_cached_plan_is_instantiated_for_other_entities():
+    cache = PlanTemplateCache()
+    assert cache.store("Price analysis of AVAX in 2024", "en-US", AVAX_PLAN)
+
+    plan = cache.lookup("price analysis of SOL in 2023", "en-US", 60, 3)
+    assert plan.title == "Solana (SOL) Price Analysis 2023"
+    assert plan.steps[0].description == "Collect daily Solana prices in 2023."
+    # other templates, locales, unknown aliases and too long plans miss
+    assert cache.lookup("price of SOL in 2023", "en-US", 60, 3) is None
+    assert cache.lookup("price analysis of SOL in 2023", "zh-CN", 60, 3) is None
+    assert cache.lookup("price analysis of FOO in 2023", "en-US", 60, 3) is None
+    assert cache.lookup("price analysis of SOL in 2023", "en-US", 60, 0) is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 4
+
+
+def test_plan_is_reused_after_enough_confirmations():
+    cache = PlanTemplateCache()
+    cache.store("Price analysis of AVAX in 2024", "en-US", AVAX_PLAN)
+    assert cache.lookup("price analysis of SOL in 2023", "en-US", 60, 3, 2) is None
+
+    # the same plan accepted again for the template confirms it
+    cache.store("Price analysis of AVAX in 2024", "en-US", AVAX_PLAN)
+    assert cache.lookup("price analysis of SOL in 2023", "en-US", 60, 3, 2)
+
+
+def test_plans_tied_to_other_assets_are_rejected_and_entries_expire():
+    cache = PlanTemplateCache()
+    plan = AVAX_PLAN.model_copy(deep=True)
+    plan.steps[0].description = "Compare AVAX with Ethereum."
+    assert not cache.store("Price analysis of AVAX in 2024", "en-US", plan)
+    assert cache.stats()["rejected"] == 1
+
+    cache.store("Price analysis of AVAX in 2024", "en-US", AVAX_PLAN)
+    assert cache.lookup("price analysis of SOL in 2023", "en-US", -1, 3) is None
+    cache.store("Price analysis of AVAX in 2024", "en-US", AVAX_PLAN)
+    assert cache.invalidate("Price analysis of DOT in 2021", "en-US")
+    assert cache.lookup("price analysis of SOL in 2023", "en-US", 60, 3) is None
+
+
+def test_accepted_plan_skips_the_planner_for_the_same_template():
+    cache = PlanTemplateCache()
+    config = {
+        "configurable": {"plan_cache_ttl": 3600, "speculative_investigation": True}
+    }
+    state = {
+        "messages": [
+            HumanMessage(content="Price analysis of AVAX in 2024"),
+            AIMessage(content="{}", name="planner"),
+        ],
+        "current_plan": AVAX_PLAN.model_dump_json(),
+    }
+    with patch("src.graph.nodes.plan_template_cache", cache):
+        # auto accepted plans were not reviewed by a user and are not cached
+        human_feedback_node({**state, "auto_accepted_plan": True}, config)
+        assert cache.stats()["entries"] == 0
+        with patch("src.graph.nodes.interrupt", return_value="[ACCEPTED]"):
+            human_feedback_node({**state, "auto_accepted_plan": False}, config)
+        assert cache.stats()["entries"] == 1
+
+        llm = MagicMock()
+        llm.bind_tools.return_value.ainvoke = AsyncMock(
+            return_value=AIMessage(
+                content="",
+                tool_calls=[
+                    {
+                        "name": "handoff_to_planner",
+                        "args": {"task_title": "SOL", "locale": "en-US"},
+                        "id": "call_1",
+                    }
+                ],
+            )
+        )
+        writer = MagicMock()
+        with (
+            patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+            patch("src.graph.nodes.get_stream_writer", return_value=writer),
+            patch("src.graph.nodes._investigate", AsyncMock(return_value="BTC news")),
+        ):
+            result = asyncio.run(
+                coordinator_node(
+                    {
+                        "messages": [
+                            HumanMessage(content="Price analysis of SOL in 2025")
+                        ],
+                        "enable_background_investigation": True,
+                    },
+                    config,
+                )
+            )
+
+    assert result.goto == "human_feedback"
+    plan = json.loads(result.update["current_plan"])
+    assert plan["steps"][0]["title"] == "SOL Price History"
+    # clients receive the plan as a planner message
+    assert writer.call_args.args[0]["type"] == "cached_plan"
+    assert writer.call_args.args[0]["agent"] == "planner"
+    assert result.update["background_investigation_results"] == "BTC news"
@@ -0,0 +1,97 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+
+from src.graph.nodes import human_feedback_node
+from src.graph.plan_diff import carry_over_results, get_executed_steps
+from src.prompts.planner_model import Plan, Step, StepType
+
+
+def _step(title, description, execution_res=None, step_type=StepType.RESEARCH):
+    return Step(
+        need_search=True,
+        title=title,
+        description=description,
+        step_type=step_type,
+        execution_res=execution_res,
+    )
+
+
+OLD_PLAN = Plan(
+    locale="en-US",
+    has_enough_context=False,
+    thought="t",
+    title="Crypto market",
+    steps=[
+        _step(
+            "Bitcoin Price History",
+            "Collect the daily closing prices of bitcoin in 2024.",
+            "btc findings",
+        ),
+        _step("ETF Flows", "Collect spot ETF inflows.", "etf findings"),
+        _step("Regulation", "Summarize new regulation.", None),
+    ],
+)
+
+
+def _new_plan(*steps):
+    return {
+        "locale": "en-US",
+        "has_enough_context": False,
+        "thought": "t",
+        "title": "Crypto market",
+        "steps": [
+            {
+                "need_search": True,
+                "title": title,
+                "description": description,
+                "step_type": "research",
+            }
+            for title, description in steps
+        ],
+    }
+
+
+def test_carry_over_keeps_unchanged_and_equivalent_steps():
+    new_plan = _new_plan(
+        (
+            "bitcoin price history",
+            "Collect the daily closing prices of bitcoin in 2024",
+        ),
+        ("ETF Flows", "Compare spot ETF inflows with futures open interest."),
+        ("Regulation", "Summarize new regulation."),
+        ("Mining", "Collect hash rate data."),
+    )
+
+    assert carry_over_results(OLD_PLAN, new_plan) == 1
+    steps = new_plan["steps"]
+    assert steps[0]["execution_res"] == "btc findings"
+    # modified, never executed and new steps run again
+    assert all("execution_res" not in step for step in steps[1:])
+
+
+def test_carry_over_reads_plan_json_and_skips_failed_steps():
+    failed = OLD_PLAN.model_copy(deep=True)
+    failed.steps[1].execution_error = "TimeoutError()"
+    executed = get_executed_steps(failed.model_dump_json())
+    assert [step.title for step in executed] == ["Bitcoin Price History"]
+    assert get_executed_steps("not a plan") == []
+
+
+def test_human_feedback_keeps_carried_over_results():
+    new_plan = _new_plan(
+        ("ETF Flows", "Collect spot ETF inflows."), ("Mining", "Collect hash rate.")
+    )
+    carry_over_results(OLD_PLAN, new_plan)
+    state = {
+        "current_plan": json.dumps(new_plan),
+        "auto_accepted_plan": True,
+        "plan_iterations": 1,
+    }
+
+    result = human_feedback_node(state)
+
+    plan = result.update["current_plan"]
+    assert plan.steps[0].execution_res == "etf findings"
+    assert plan.steps[1].execution_res is None
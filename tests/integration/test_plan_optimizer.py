@@ -0,0 +1,85 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from unittest.mock import MagicMock, patch
+
+from src.graph.nodes import human_feedback_node
+from src.graph.plan_optimizer import merge_overlapping_steps, step_similarity
+from src.prompts.planner_model import Plan, Step, StepType
+
+
+def _step(title, description, step_type=StepType.RESEARCH, execution_res=None):
+    return Step(
+        need_search=True,
+        title=title,
+        description=description,
+        step_type=step_type,
+        execution_res=execution_res,
+    )
+
+
+MARKET_SIZE = _step(
+    "Market Size", "Collect the current market size of the AI sector in 2024."
+)
+MARKET_TRENDS = _step(
+    "Market Growth and Size Trends",
+    "Collect market size growth rates of the AI sector since 2020.",
+)
+REGULATION = _step("Regulation", "Summarize new AI regulation in the EU and US.")
+
+
+def _plan(*steps):
+    return Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="t",
+        title="AI market",
+        steps=list(steps),
+    )
+
+
+def test_step_similarity():
+    assert step_similarity(MARKET_SIZE, MARKET_TRENDS) >= 0.6
+    assert step_similarity(MARKET_SIZE, REGULATION) < 0.3
+    processing = MARKET_TRENDS.model_copy(update={"step_type": StepType.PROCESSING})
+    assert step_similarity(MARKET_SIZE, processing) == 0
+
+
+def test_merge_overlapping_steps():
+    plan, merged = merge_overlapping_steps(
+        _plan(MARKET_SIZE, REGULATION, MARKET_TRENDS), 0.6, 3
+    )
+
+    assert merged == 1
+    assert [step.title for step in plan.steps] == [
+        "Market Size & Market Growth and Size Trends",
+        "Regulation",
+    ]
+    assert "growth rates" in plan.steps[0].description
+
+
+def test_merge_keeps_executed_steps_and_respects_max_step_num():
+    executed = MARKET_SIZE.model_copy(update={"execution_res": "findings"})
+    plan, merged = merge_overlapping_steps(_plan(executed, MARKET_TRENDS), 0.6, 3)
+    assert merged == 0
+
+    # unrelated steps are not merged to fit max_step_num, the last are dropped
+    plan, merged = merge_overlapping_steps(
+        _plan(MARKET_SIZE, REGULATION, MARKET_TRENDS), 0.99, 2
+    )
+    assert merged == 0
+    assert [step.title for step in plan.steps] == ["Market Size", "Regulation"]
+
+
+def test_human_feedback_merges_steps_of_accepted_plan():
+    state = {
+        "current_plan": _plan(MARKET_SIZE, MARKET_TRENDS).model_dump_json(),
+        "auto_accepted_plan": True,
+    }
+    config = {"configurable": {"step_merge_similarity": 0.6}}
+
+    with patch("src.graph.nodes.get_stream_writer", return_value=MagicMock()):
+        result = human_feedback_node(state, config)
+
+    assert result.goto == "research_team"
+    assert len(result.update["current_plan"].steps) == 1
@@ -0,0 +1,142 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import tool
+
+from src.graph.budget import start_run_budget
+from src.graph.nodes import researcher_node
+from src.prompts.planner_model import Plan, Step, StepType
+from src.workers import StepBroker, StepTaskError
+from src.workers.worker import run_worker
+
+
+@tool
+def lookup_price(symbol: str) -> str:
+    """Look up the price of an asset."""
+    return f"{symbol} trades at $35"
+
+
+def test_steps_are_claimed_once_and_results_returned(tmp_path):
+    broker = StepBroker(str(tmp_path / "broker.db"))
+    task_id = broker.enqueue("researcher", {"step": 1})
+    broker.enqueue("coder", {"step": 2})
+
+    task = broker.claim("worker-a", ["researcher"])
+    assert task.id == task_id and task.payload == {"step": 1}
+    assert broker.claim("worker-b", ["researcher"]) is None
+    assert broker.stats() == {"queued": 1, "running": 1}
+
+    assert not broker.complete(task_id, "worker-b", {"ok": False})
+    assert broker.complete(task_id, "worker-a", {"ok": True})
+    assert asyncio.run(broker.wait_for_result(task_id)) == {"ok": True}
+    # the result is removed once the owning run has it
+    assert broker.get(task_id) is None
+
+
+def test_steps_of_lost_workers_are_reclaimed_then_failed(tmp_path):
+    broker = StepBroker(str(tmp_path / "broker.db"), lease_seconds=0, max_attempts=2)
+    task_id = broker.enqueue("researcher", {})
+
+    assert broker.claim("worker-a").attempts == 1
+    reclaimed = broker.claim("worker-b")
+    assert reclaimed.id == task_id and reclaimed.attempts == 2
+    # the first worker lost its lease and cannot report anymore
+    assert not broker.complete(task_id, "worker-a", {})
+
+    assert broker.claim("worker-c") is None
+    with pytest.raises(StepTaskError, match="lost 2 times"):
+        asyncio.run(broker.wait_for_result(task_id))
+
+
+def test_abandoned_steps_are_removed(tmp_path):
+    broker = StepBroker(str(tmp_path / "broker.db"), retention_seconds=0)
+    task_id = broker.enqueue("researcher", {})
+
+    async def cancel_waiting_run():
+        waiting = asyncio.create_task(
+            broker.wait_for_result(task_id, poll_interval=0.01)
+        )
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(cancel_waiting_run())
+    assert broker.get(task_id) is None
+
+    # finished steps whose run never collected them are purged
+    finished = broker.enqueue("researcher", {})
+    broker.claim("worker-a")
+    broker.complete(finished, "worker-a", {"ok": True})
+    broker.enqueue("coder", {})
+    assert broker.get(finished) is None
+    assert broker.stats() == {"queued": 1, "running": 0}
+
+
+def test_dispatched_step_runs_on_a_worker(tmp_path):
+    broker = StepBroker(str(tmp_path / "broker.db"))
+    plan = Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="t",
+        title="AVAX",
+        steps=[
+            Step(
+                need_search=True,
+                title="AVAX price",
+                description="Collect the AVAX price.",
+                step_type=StepType.RESEARCH,
+            )
+        ],
+    )
+    state = {"current_plan": plan, "observations": [], "locale": "en-US"}
+    config = {"configurable": {"thread_id": "t1", "distributed_steps": True}}
+    llm = FakeListChatModel(responses=["AVAX trades at $35"])
+    calls = []
+
+    async def agent(input, config):
+        calls.append(input)
+        await lookup_price.ainvoke({"symbol": "AVAX"}, config)
+        return {"messages": [await llm.ainvoke("What is the AVAX price?", config)]}
+
+    writer = MagicMock()
+    budget = start_run_budget("t1", max_tokens=100_000)
+
+    async def run():
+        stop = asyncio.Event()
+        worker = asyncio.create_task(run_worker(broker, poll_interval=0.01, stop=stop))
+        try:
+            return await researcher_node(state, config)
+        finally:
+            stop.set()
+            await worker
+
+    with (
+        patch("src.graph.nodes.get_step_broker", return_value=broker),
+        patch(
+            "src.graph.nodes._create_agent_timed", return_value=RunnableLambda(agent)
+        ),
+        patch("src.graph.nodes.get_stream_writer", return_value=writer),
+        patch("src.graph.nodes.get_web_search_tool", return_value=MagicMock()),
+    ):
+        result = asyncio.run(run())
+
+    assert len(calls) == 1
+    # the usage of the step in the worker is charged to the run's budget
+    assert budget.tokens > 0
+    assert budget.tool_calls == 1
+    assert result.update["current_plan"].steps[0].execution_res == "AVAX trades at $35"
+    assert result.update["observations"] == ["AVAX trades at $35"]
+    assert result.update["messages"][0].name == "researcher"
+    # the step ran in the worker, the run's plan is updated from its result
+    assert plan.steps[0].execution_res is None
+    assert [call.args[0]["type"] for call in writer.call_args_list] == [
+        "step_dispatched",
+        "step_result",
+    ]
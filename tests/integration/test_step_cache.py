@@ -0,0 +1,102 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from langchain_core.messages import AIMessage
+
+from src.graph.nodes import researcher_node
+from src.graph.step_cache import StepResultCache, step_result_cache
+from src.prompts.planner_model import Plan, Step, StepType
+from src.rag import Resource
+
+
+def _step(title, description="Collect market size and growth rates."):
+    return Step(
+        need_search=True,
+        title=title,
+        description=description,
+        step_type=StepType.RESEARCH,
+    )
+
+
+def test_lookup_matches_normalized_step():
+    cache = StepResultCache()
+    cache.store(
+        _step("Current AI Market Analysis"), "en-US", [], "result", "researcher", "t1"
+    )
+
+    hit = cache.lookup(_step("current AI market  analysis!"), "en-US", [], 60)
+    assert hit.entry.result == "result"
+    assert hit.entry.thread_id == "t1"
+    assert hit.similarity == 1.0
+    assert cache.lookup(_step("Current AI Market Analysis"), "zh-CN", [], 60) is None
+    resources = [Resource(uri="rag://dataset/1", title="Dataset")]
+    assert (
+        cache.lookup(_step("Current AI Market Analysis"), "en-US", resources, 60)
+        is None
+    )
+
+
+def test_lookup_respects_ttl_and_near_duplicate_threshold():
+    cache = StepResultCache()
+    cache.store(_step("Current AI Market Analysis"), "en-US", [], "result", "r")
+
+    assert cache.lookup(_step("Current AI Market Analysis"), "en-US", [], -1) is None
+    similar = _step("AI Market Analysis")
+    assert cache.lookup(similar, "en-US", [], 60) is None
+    hit = cache.lookup(similar, "en-US", [], 60, similarity_threshold=0.8)
+    assert hit is not None and 0.8 <= hit.similarity < 1.0
+    assert cache.lookup(_step("Quantum computing"), "en-US", [], 60, 0.8) is None
+
+
+def test_researcher_reuses_cached_result_before_setup():
+    step_result_cache.clear()
+    agent = MagicMock()
+    agent.ainvoke = AsyncMock(
+        return_value={"messages": [AIMessage(content="market findings")]}
+    )
+    mcp_settings = {
+        "servers": {
+            "prices": {
+                "transport": "stdio",
+                "command": "prices-server",
+                "enabled_tools": ["get_price"],
+                "add_to_agents": ["researcher"],
+            }
+        }
+    }
+
+    def run(thread_id):
+        plan = Plan(
+            locale="en-US",
+            has_enough_context=False,
+            thought="t",
+            title="T",
+            steps=[_step("Current AI Market Analysis")],
+        )
+        state = {"current_plan": plan, "observations": [], "locale": "en-US"}
+        config = {
+            "configurable": {
+                "thread_id": thread_id,
+                "step_cache_ttl": 600,
+                "step_cache_similarity": 0.0,
+                "mcp_settings": mcp_settings,
+            }
+        }
+        return asyncio.run(researcher_node(state, config))
+
+    with (
+        patch("src.graph.nodes.get_mcp_tools", AsyncMock(return_value={})) as mcp,
+        patch("src.graph.nodes._create_agent_timed", return_value=agent) as create,
+        patch("src.graph.nodes.get_stream_writer", return_value=MagicMock()),
+        patch("src.graph.nodes.get_web_search_tool", return_value=MagicMock()),
+    ):
+        first = run("thread-1")
+        second = run("thread-2")
+
+    # the hit neither opens MCP sessions nor builds an agent
+    assert mcp.await_count == create.call_count == agent.ainvoke.call_count == 1
+    assert first.update["observations"] == second.update["observations"]
+    assert second.update["observations"] == ["market findings"]
@@ -0,0 +1,117 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from src.graph.nodes import _execute_agent_step
+from src.graph.types import State
+from src.prompts.planner_model import Plan, Step, StepType
+
+
+def _plan(steps=2):
+    return Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="t",
+        title="T",
+        steps=[
+            Step(
+                need_search=True,
+                title=f"Step {i}",
+                description="Collect data.",
+                step_type=StepType.RESEARCH,
+            )
+            for i in range(steps)
+        ],
+    )
+
+
+@pytest.fixture
+def configurable():
+    configurable = MagicMock()
+    configurable.step_cache_ttl = 0
+    configurable.max_step_retries = 2
+    with (
+        patch(
+            "src.graph.nodes.Configuration.from_runnable_config",
+            return_value=configurable,
+        ),
+        patch("src.graph.nodes.STEP_RETRY_BACKOFF_SECONDS", 0),
+    ):
+        yield configurable
+
+
+def test_failed_step_is_retried(configurable):
+    agent = MagicMock()
+    agent.ainvoke = AsyncMock(
+        side_effect=[
+            RuntimeError("502 Bad Gateway"),
+            {"messages": [AIMessage(content="findings")]},
+        ]
+    )
+    state = {"current_plan": _plan(), "observations": []}
+
+    result = asyncio.run(_execute_agent_step(state, agent, "researcher", {}))
+
+    assert agent.ainvoke.call_count == 2
+    assert result.update["observations"] == ["findings"]
+
+
+def test_step_is_marked_failed_after_retries(configurable):
+    agent = MagicMock()
+    agent.ainvoke = AsyncMock(side_effect=TimeoutError("jina timeout"))
+    plan = _plan()
+    state = {"current_plan": plan, "observations": []}
+
+    result = asyncio.run(_execute_agent_step(state, agent, "researcher", {}))
+
+    assert agent.ainvoke.call_count == 3
+    assert result.goto == "research_team"
+    assert result.update["current_plan"].steps[0].execution_error
+    assert plan.steps[0].execution_res
+    assert not plan.steps[1].execution_res
+
+
+def test_resumed_thread_does_not_recompute_completed_steps(configurable):
+    calls = []
+
+    async def ainvoke(input, config):
+        calls.append(input["messages"][0].content)
+        if len(calls) == 2:
+            # not an Exception, so the run itself fails
+            raise KeyboardInterrupt
+        return {"messages": [AIMessage(content=f"findings {len(calls)}")]}
+
+    agent = MagicMock()
+    agent.ainvoke = ainvoke
+
+    async def step_node(state, config):
+        return await _execute_agent_step(state, agent, "researcher", config)
+
+    def route(state):
+        if all(step.execution_res for step in state["current_plan"].steps):
+            return END
+        return "step"
+
+    builder = StateGraph(State)
+    builder.add_node("step", step_node)
+    builder.add_edge(START, "step")
+    builder.add_conditional_edges("step", route, ["step", END])
+    graph = builder.compile(checkpointer=MemorySaver())
+    config = {"configurable": {"thread_id": "recovery"}}
+
+    with pytest.raises(KeyboardInterrupt):
+        asyncio.run(
+            graph.ainvoke({"current_plan": _plan(), "observations": []}, config)
+        )
+    final = asyncio.run(graph.ainvoke(None, config))
+
+    assert len(calls) == 3
+    assert "Step 0" in calls[0] and "Step 1" in calls[1] and "Step 1" in calls[2]
+    assert final["observations"] == ["findings 1", "findings 3"]
@@ -10,7 +10,7 @@ import { fetchStream } from "../sse";
 import { sleep } from "../utils";
 
 import { resolveServiceURL } from "./resolve-service-url";
-import type { ChatEvent } from "./types";
+import type { ChatEvent, RunProgressEvent } from "./types";
 
 export async function* chatStream(
   userMessage: string,
@@ -53,7 +53,7 @@ export async function* chatStream(
     yield {
       type: event.event,
       data: JSON.parse(event.data),
-    } as ChatEvent;
+    } as ChatEvent | RunProgressEvent;
   }
 }
 
@@ -67,6 +67,38 @@ export interface ToolCallResultEvent
     }
   > {}
 
+// A complete message of an agent whose tokens were not streamed, e.g. the
+// findings of a step that ran on a step worker
+export interface StepResultEvent
+  extends GenericEvent<
+    "step_result",
+    {
+      content: string;
+      step: string;
+    }
+  > {}
+
+// A drafted section of the report, sent with the id of the reporter message
+// before the final report is streamed into it
+export interface ReportSectionEvent
+  extends GenericEvent<
+    "report_section",
+    {
+      index: number;
+      total: number;
+      content: string;
+    }
+  > {}
+
+// A plan taken from the plan template cache instead of the planner
+export interface CachedPlanEvent
+  extends GenericEvent<
+    "cached_plan",
+    {
+      content: string;
+    }
+  > {}
+
 export interface InterruptEvent
   extends GenericEvent<
     "interrupt",
@@ -75,9 +107,34 @@ export interface InterruptEvent
     }
   > {}
 
+// Progress of a run that belongs to no message, sent without a message id
+export interface RunProgressEvent {
+  type:
+    | "budget"
+    | "plan_optimized"
+    | "step_prefetched"
+    | "step_cache_hit"
+    | "step_dispatched"
+    | "step_deadline"
+    | "early_termination";
+  data: {
+    id?: undefined;
+    thread_id: string;
+  } & Record<string, unknown>;
+}
+
+export function isRunProgressEvent(
+  event: ChatEvent | RunProgressEvent,
+): event is RunProgressEvent {
+  return event.data.id == null;
+}
+
 export type ChatEvent =
   | MessageChunkEvent
   | ToolCallsEvent
   | ToolCallChunksEvent
   | ToolCallResultEvent
+  | StepResultEvent
+  | CachedPlanEvent
+  | ReportSectionEvent
   | InterruptEvent;
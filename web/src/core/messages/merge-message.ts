@@ -2,9 +2,12 @@
 // SPDX-License-Identifier: MIT
 
 import type {
+  CachedPlanEvent,
   ChatEvent,
   InterruptEvent,
   MessageChunkEvent,
+  ReportSectionEvent,
+  StepResultEvent,
   ToolCallChunksEvent,
   ToolCallResultEvent,
   ToolCallsEvent,
@@ -20,6 +23,10 @@ export function mergeMessage(message: Message, event: ChatEvent) {
     mergeToolCallMessage(message, event);
   } else if (event.type === "tool_call_result") {
     mergeToolCallResultMessage(message, event);
+  } else if (event.type === "step_result" || event.type === "cached_plan") {
+    mergeCompleteMessage(message, event);
+  } else if (event.type === "report_section") {
+    mergeReportSection(message, event);
   } else if (event.type === "interrupt") {
     mergeInterruptMessage(message, event);
   }
@@ -39,12 +46,33 @@ export function mergeMessage(message: Message, event: ChatEvent) {
 }
 
 function mergeTextMessage(message: Message, event: MessageChunkEvent) {
+  if (message.reportSections && event.data.content) {
+    // the final report replaces the section drafts
+    delete message.reportSections;
+    message.content = "";
+    message.contentChunks = [];
+  }
   if (event.data.content) {
     message.content += event.data.content;
     message.contentChunks.push(event.data.content);
   }
 }
 
+function mergeCompleteMessage(
+  message: Message,
+  event: StepResultEvent | CachedPlanEvent,
+) {
+  message.content = event.data.content;
+  message.contentChunks = [event.data.content];
+}
+
+function mergeReportSection(message: Message, event: ReportSectionEvent) {
+  message.reportSections ??= new Array<string>(event.data.total).fill("");
+  message.reportSections[event.data.index] = event.data.content;
+  message.content = message.reportSections.filter(Boolean).join("\n\n");
+  message.contentChunks = [message.content];
+}
+
 function mergeToolCallMessage(
   message: Message,
   event: ToolCallsEvent | ToolCallChunksEvent,
@@ -17,6 +17,7 @@ export interface Message {
   isStreaming?: boolean;
   content: string;
   contentChunks: string[];
+  reportSections?: string[];
   toolCalls?: ToolCallRuntime[];
   options?: Option[];
   finishReason?: "stop" | "interrupt" | "tool_calls";
@@ -6,7 +6,7 @@ import { toast } from "sonner";
 import { create } from "zustand";
 import { useShallow } from "zustand/react/shallow";
 
-import { chatStream, generatePodcast } from "../api";
+import { chatStream, generatePodcast, isRunProgressEvent } from "../api";
 import type { Message, Resource } from "../messages";
 import { mergeMessage } from "../messages";
 import { parseJSON } from "../utils";
@@ -118,6 +118,10 @@ export async function sendMessage(
   let messageId: string | undefined;
   try {
     for await (const event of stream) {
+      if (isRunProgressEvent(event)) {
+        // progress events of the run, e.g. its budget usage, are no messages
+        continue;
+      }
       const { type, data } = event;
       messageId = data.id;
       let message: Message | undefined;
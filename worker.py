@@ -0,0 +1,66 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Worker script that executes the research steps dispatched by the DeerFlow API
+servers when distributed steps are enabled.
+"""
+
+import argparse
+import asyncio
+import logging
+import signal
+
+from src.workers import get_step_broker
+from src.workers.worker import AGENT_TYPES, run_worker
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def main(agent_types: list[str], concurrency: int, poll_interval: float):
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        # finish the running steps before exiting
+        loop.add_signal_handler(signum, stop.set)
+    await run_worker(
+        get_step_broker(),
+        agent_types=agent_types,
+        concurrency=concurrency,
+        poll_interval=poll_interval,
+        stop=stop,
+    )
+    logger.info("Step worker stopped")
+
+
+if __name__ == "__main__":
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="Run a DeerFlow step worker")
+    parser.add_argument(
+        "--agents",
+        nargs="+",
+        default=list(AGENT_TYPES),
+        choices=list(AGENT_TYPES),
+        help="Agent types to run (default: researcher coder)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Number of steps executed at the same time (default: 4)",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=1.0,
+        help="Seconds to wait when the queue is empty (default: 1.0)",
+    )
+
+    args = parser.parse_args()
+    asyncio.run(main(args.agents, args.concurrency, args.poll_interval))